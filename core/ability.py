@@ -0,0 +1,130 @@
+# ability.py
+# Shared, immutable ability records built while the data packs are parsed.
+import sys
+
+# Effect fields every ability carries, in effect vector order
+EFFECT_KEYS = (
+    'baseDamage',
+    'heal',
+    'speedBuff',
+    'speedDebuff',
+    'defenseBuff',
+    'defenseDebuff',
+    'strengthBuff',
+    'strengthDebuff',
+    'manaCost'
+)
+ABILITY_KEYS = ('name', 'description') + EFFECT_KEYS
+
+_EFFECT_INDEX = {key: i for i, key in enumerate(EFFECT_KEYS)}
+_ABILITY_KEY_SET = frozenset(ABILITY_KEYS)
+
+# Flyweight pools shared by every loaded pack
+_effect_pool = {}
+_ability_pool = {}
+
+
+class Ability:
+    """Immutable ability record with a shared effect vector
+
+    Supports read-only mapping access (ability['baseDamage']) so it can be
+    used anywhere the raw ability dictionary was used.
+    """
+    __slots__ = ('name', 'description', 'effects')
+
+    def __init__(self, name, description, effects):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'description', description)
+        object.__setattr__(self, 'effects', effects)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Ability records are immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("Ability records are immutable")
+
+    def __getitem__(self, key):
+        index = _EFFECT_INDEX.get(key)
+        if index is not None:
+            return self.effects[index]
+        if key == 'name':
+            return self.name
+        if key == 'description':
+            return self.description
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in _ABILITY_KEY_SET
+
+    def __iter__(self):
+        return iter(ABILITY_KEYS)
+
+    def __len__(self):
+        return len(ABILITY_KEYS)
+
+    def get(self, key, default=None):
+        """Get a field value, returning default for unknown keys"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Get the ability field names"""
+        return ABILITY_KEYS
+
+    def to_dict(self):
+        """Convert the ability back to dictionary format"""
+        data = {'name': self.name, 'description': self.description}
+        data.update(zip(EFFECT_KEYS, self.effects))
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, Ability):
+            return NotImplemented
+        return (self.name, self.description, self.effects) == (other.name, other.description, other.effects)
+
+    def __hash__(self):
+        return hash((self.name, self.description, self.effects))
+
+    def __reduce__(self):
+        return (make_ability, (self.name, self.description, self.effects))
+
+    def __repr__(self):
+        return f"Ability(name='{self.name}', effects={self.effects})"
+
+
+def make_ability(name, description, effects):
+    """Get the shared Ability record for the given fields"""
+    effects = _effect_pool.setdefault(tuple(effects), tuple(effects))
+    key = (name, description, effects)
+    ability = _ability_pool.get(key)
+    if ability is None:
+        ability = _ability_pool[key] = Ability(sys.intern(name), sys.intern(description), effects)
+    return ability
+
+
+def _well_formed(obj):
+    if not isinstance(obj['name'], str) or not isinstance(obj['description'], str):
+        return False
+    return all(type(obj[key]) in (int, float) for key in EFFECT_KEYS)
+
+
+def intern_object(obj):
+    """json object_hook interning keys and strings and collapsing abilities
+
+    Dictionaries with exactly the ability fields, text names and numeric
+    effects become shared Ability records; every other dictionary keeps its
+    shape with interned keys and string values, for pack_diff to report.
+    """
+    if len(obj) == len(ABILITY_KEYS) and _ABILITY_KEY_SET.issuperset(obj) and _well_formed(obj):
+        return make_ability(obj['name'], obj['description'], [obj[key] for key in EFFECT_KEYS])
+    return {
+        sys.intern(key): sys.intern(value) if isinstance(value, str) else value
+        for key, value in obj.items()
+    }
+
+
+def pool_sizes():
+    """Get the number of distinct effect vectors and ability records loaded"""
+    return {'effects': len(_effect_pool), 'abilities': len(_ability_pool)}
@@ -0,0 +1,407 @@
+# balance.py
+# Monster difficulty tuning: python -m <addon package>.core.balance
+#
+# gameWiki.txt gives monsters 10 stat points per level, the same budget a
+# player gets. This tool searches, per dungeon rank and monster tier, for the
+# multiplier on monster HP, Strength, Speed and Defense at which simulated
+# players win the target share of their fights (TUNING_TARGET_WIN_RATES, moved
+# by TUNING_TIER_WIN_RATE_OFFSETS), and writes the result into a copy of
+# monsters.json as a "tuning" block on every family.
+#
+# The copy (TUNED_MONSTERS_PATH) is a review artifact: the game never reads
+# it. Multipliers worth keeping are carried into monsters.json by hand.
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ..data import config
+from .combat import (
+    Battle, Combatant, PLAYER_TEAM, MONSTER_TEAM, ROLL_MIN, ROLL_MAX, REST_MANA, MAX_TURNS,
+    character_combatant_id, resolve_abilities
+)
+from .data_loader import load_packs, resolve_path
+from .effects import STAT_ORDER, HP, MP, SPEED, EffectTable, apply_effects_batch, compile_ability
+from .leveling import RANKS, rank_level_range
+from .pack_summary import scaled_stats
+from .settings import MONSTER_TIERS
+from .stat_allocation import STATS, STAT_POINT_VALUES, FocusPolicy
+from .turn_scheduler import TURN_LENGTH, MIN_SPEED
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# gameWiki.txt default stats, in STATS order (HP, Strength, Speed, Defense, MP)
+PLAYER_BASE_STATS = (10, 1, 1, 1, 10)
+# Stats the tuning multiplier scales; MP only gates abilities and stays as is
+SCALED_STATS = (HP, STAT_ORDER.index('Strength'), SPEED, STAT_ORDER.index('Defense'))
+
+# Packs of the current worker process, loaded once by _init_worker
+_worker_packs = None
+
+
+def player_stats(focus, level, focus_points=None):
+    """Get the stats of a player who put focus_points into one stat every level
+
+    Every level, the first included, grants POINTS_PER_LEVEL points.
+
+    Returns:
+        tuple: Stats in STAT_ORDER
+    """
+    if focus_points is None:
+        focus_points = config.TUNING_FOCUS_POINTS
+    points = FocusPolicy(focus, focus_points).allocate(level)
+    stats = {
+        stat: base + point * value * level
+        for stat, base, point, value in zip(STATS, PLAYER_BASE_STATS, points, STAT_POINT_VALUES)
+    }
+    return tuple(stats[stat] for stat in STAT_ORDER)
+
+
+def monster_stats(family, level, multiplier=1.0):
+    """Get the stats of a monster family at a level, scaled by a tuning multiplier
+
+    Returns:
+        tuple: Stats in STAT_ORDER
+    """
+    base = scaled_stats(family['stats'], level)
+    stats = [base[stat] for stat in STAT_ORDER]
+    for index in SCALED_STATS:
+        stats[index] = max(1, round(stats[index] * multiplier))
+    return tuple(stats)
+
+
+def target_win_rate(rank, tier):
+    """Get the player win rate a rank and monster tier are tuned for"""
+    rate = config.TUNING_TARGET_WIN_RATES[rank] + config.TUNING_TIER_WIN_RATE_OFFSETS[MONSTER_TIERS.index(tier)]
+    return min(1.0, max(0.0, rate))
+
+
+def missed_target(rank, tier, rate, reached):
+    """Check whether a solved search should be flagged for review
+
+    Args:
+        reached (bool): solve_multiplier's verdict; False when the target
+            lies outside TUNING_MULTIPLIER_RANGE
+    """
+    return not reached or abs(rate - target_win_rate(rank, tier)) > config.TUNING_WIN_RATE_TOLERANCE
+
+
+class Scenarios:
+    """A fixed sample of 1v1 fights, player against one monster, for a rank
+
+    Drawn once per search so that every multiplier is judged on the same
+    players, monsters and levels. The monster tier plays no part: monster
+    stats depend only on family and level, levels are drawn from the whole
+    rank range whatever the tier, and a tier only moves the target win rate
+    (target_win_rate). Tiers that never spawn in a rank are tuned all the same.
+    """
+
+    def __init__(self, class_data, monster_data, rank, count, seed, family_key=None):
+        rng = random.Random(seed)
+        # Classes still without a damaging ability can never win and would
+        # only drag every win rate down
+        classes = [
+            (weapon, stat)
+            for weapon, stat_classes in class_data.items()
+            for stat, class_info in stat_classes.items()
+            if any(ability['baseDamage'] for ability in class_info['abilities'].values())
+        ]
+        if not classes:
+            raise ValueError("No class has a damaging ability to simulate with")
+        if family_key is None:
+            families = [(category, index) for category, group in monster_data.items() for index in range(len(group))]
+        else:
+            families = [family_key]
+        weights = [monster_data[category][index].get('spawnWeight', 1) for category, index in families]
+        low, high = rank_level_range(rank)
+
+        self.players = []
+        self.monsters = []
+        for _ in range(count):
+            weapon, stat = rng.choice(classes)
+            category, index = rng.choices(families, weights)[0]
+            level = rng.randint(low, high)
+            self.players.append((player_stats(stat, level), resolve_abilities(character_combatant_id(weapon, stat), class_data, monster_data)))
+            self.monsters.append((level, monster_data[category][index]))
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.players)
+
+    def arrays(self):
+        """Get the fights as arrays for the vectorized simulator, built on first use
+
+        Returns:
+            tuple: (EffectTable, player stats (N, 5), table rows of each
+                side's abilities (N, 2, K) padded with -1, their mana costs
+                (N, 2, K) padded with infinity)
+        """
+        if self._arrays is None:
+            abilities = []
+            ability_ids = {}
+
+            def ids(ability_list):
+                result = []
+                for ability in ability_list:
+                    key = compile_ability(ability)
+                    if key not in ability_ids:
+                        ability_ids[key] = len(abilities)
+                        abilities.append(ability)
+                    result.append(ability_ids[key])
+                return result
+
+            rows = [(ids(player_abilities), ids(family['abilities'])) for (_, player_abilities), (_, family) in zip(self.players, self.monsters)]
+            width = max(1, max(len(side) for row in rows for side in row))
+            slots = numpy.full((len(rows), 2, width), -1, dtype=numpy.intp)
+            for i, row in enumerate(rows):
+                for team, side in enumerate(row):
+                    slots[i, team, :len(side)] = side
+            costs = numpy.array([compile_ability(ability).mana_cost for ability in abilities], dtype=numpy.float64)
+            mana = numpy.where(slots >= 0, costs[slots], numpy.inf)
+            self._arrays = (
+                EffectTable(abilities),
+                numpy.array([stats for stats, _ in self.players], dtype=numpy.int64),
+                slots,
+                mana
+            )
+        return self._arrays
+
+
+def _simulate_scalar(scenarios, multiplier, seed):
+    """Play every fight with Battle; exact but slow"""
+    wins = 0
+    for i, ((stats, abilities), (level, family)) in enumerate(zip(scenarios.players, scenarios.monsters)):
+        battle = Battle([
+            Combatant('player', PLAYER_TEAM, stats, abilities),
+            Combatant('monster', MONSTER_TEAM, monster_stats(family, level, multiplier), family['abilities'])
+        ], seed + i)
+        if battle.run() == PLAYER_TEAM:
+            wins += 1
+    return wins / len(scenarios)
+
+
+def _simulate_vectorized(scenarios, multiplier, seed):
+    """Play every fight at once, one turn of every unfinished fight per step
+
+    Follows Battle's rules: next-action times of TURN_LENGTH / speed with ties
+    going to the player, a uniformly chosen affordable ability or a rest, and
+    the rest of the wait rescaled when a speed changes.
+    """
+    table, players, slots, mana = scenarios.arrays()
+    count = len(scenarios)
+    stats = numpy.empty((count, 2, len(STAT_ORDER)), dtype=numpy.int64)
+    stats[:, PLAYER_TEAM] = players
+    stats[:, MONSTER_TEAM] = [monster_stats(family, level, multiplier) for level, family in scenarios.monsters]
+    max_hp = stats[:, :, HP].copy()
+    times = TURN_LENGTH / numpy.maximum(stats[:, :, SPEED], MIN_SPEED)
+    active = numpy.ones(count, dtype=bool)
+    wins = numpy.zeros(count, dtype=bool)
+    rng = numpy.random.default_rng(seed)
+
+    for _ in range(MAX_TURNS):
+        # Drawn for every fight each turn so a fight's draws do not depend on
+        # when the others finish
+        picks = rng.random(count)
+        rolls = rng.integers(ROLL_MIN, ROLL_MAX + 1, count)
+        rows = numpy.flatnonzero(active)
+        if not len(rows):
+            break
+
+        actors = (times[rows, MONSTER_TEAM] < times[rows, PLAYER_TEAM]).astype(numpy.intp)
+        now = times[rows, actors]
+        times[rows, actors] = now + TURN_LENGTH / numpy.maximum(stats[rows, actors, SPEED], MIN_SPEED)
+
+        affordable = mana[rows, actors] <= stats[rows, actors, MP][:, None]
+        choices = affordable.sum(axis=1)
+        resting = choices == 0
+        stats[rows[resting], actors[resting], MP] += REST_MANA
+
+        acting = ~resting
+        rows, actors, now = rows[acting], actors[acting], now[acting]
+        targets = 1 - actors
+        picked = (picks[rows] * choices[acting]).astype(numpy.intp)
+        slot = (affordable[acting].cumsum(axis=1) > picked[:, None]).argmax(axis=1)
+
+        casters = stats[rows, actors]
+        defenders = stats[rows, targets]
+        old_speeds = (casters[:, SPEED].copy(), defenders[:, SPEED].copy())
+        changed = apply_effects_batch(table, slots[rows, actors, slot], casters, max_hp[rows, actors], defenders, rolls[rows])
+        stats[rows, actors] = casters
+        stats[rows, targets] = defenders
+
+        for sides, side_stats, old_speed, speed_changed in zip((actors, targets), (casters, defenders), old_speeds, changed):
+            r, s, start = rows[speed_changed], sides[speed_changed], now[speed_changed]
+            scale = numpy.maximum(old_speed[speed_changed], MIN_SPEED) / numpy.maximum(side_stats[speed_changed, SPEED], MIN_SPEED)
+            times[r, s] = start + (times[r, s] - start) * scale
+
+        defeated = defenders[:, HP] <= 0
+        wins[rows[defeated]] = actors[defeated] == PLAYER_TEAM
+        active[rows[defeated]] = False
+
+    # Fights still running after MAX_TURNS are draws and count as losses
+    return float(wins.mean())
+
+
+def win_rate(scenarios, multiplier, seed=0):
+    """Get the share of the fights the player wins at a monster stat multiplier"""
+    if numpy is None:
+        return _simulate_scalar(scenarios, multiplier, seed)
+    return _simulate_vectorized(scenarios, multiplier, seed)
+
+
+def solve_multiplier(scenarios, target, iterations, seed=0, bounds=None):
+    """Bisect for the multiplier at which the player wins target of the fights
+
+    The win rate falls as monsters get stronger, so each step halves the
+    bracket (in log space) around the target. Every step reuses the same
+    fights and seed, which keeps the estimates monotonic enough to bisect.
+
+    Returns:
+        tuple: (multiplier, win rate at that multiplier, whether the target
+            was reached); when even a bound misses the target, that bound
+            is returned with reached False
+    """
+    low, high = bounds or config.TUNING_MULTIPLIER_RANGE
+    low_rate = win_rate(scenarios, low, seed)
+    if low_rate <= target:
+        return low, low_rate, low_rate == target
+    high_rate = win_rate(scenarios, high, seed)
+    if high_rate >= target:
+        return high, high_rate, high_rate == target
+
+    for _ in range(iterations):
+        middle = math.sqrt(low * high)
+        if win_rate(scenarios, middle, seed) > target:
+            low = middle
+        else:
+            high = middle
+    multiplier = round(math.sqrt(low * high), 3)
+    return multiplier, win_rate(scenarios, multiplier, seed), True
+
+
+def _init_worker():
+    global _worker_packs
+    _worker_packs = load_packs()
+
+
+def _solve_task(task):
+    """Solve one (rank, tier, family) search; runs in a worker process"""
+    rank, tier, family_key, fights, iterations, seed = task
+    class_data, monster_data = _worker_packs
+    scenarios = Scenarios(class_data, monster_data, rank, fights, seed, family_key)
+    return ((rank, tier, family_key),) + solve_multiplier(scenarios, target_win_rate(rank, tier), iterations, seed)
+
+
+def tune(monster_data, fights, iterations, workers=None, per_family=False, seed=0):
+    """Solve every rank and tier, in parallel across processes
+
+    Returns:
+        dict: (rank, tier, family key or None) -> (multiplier, win rate, reached)
+    """
+    family_keys = [None]
+    if per_family:
+        family_keys = [(category, index) for category, group in monster_data.items() for index in range(len(group))]
+    tasks = [
+        (rank, tier, family_key, fights, iterations, seed + i)
+        for i, (rank, tier, family_key) in enumerate(
+            (rank, tier, family_key) for rank in RANKS for tier in MONSTER_TIERS for family_key in family_keys
+        )
+    ]
+
+    results = {}
+    if workers == 1:
+        _init_worker()
+        for key, *result in map(_solve_task, tasks):
+            results[key] = tuple(result)
+        return results
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for key, *result in executor.map(_solve_task, tasks):
+            results[key] = tuple(result)
+    return results
+
+
+def apply_tuning(monster_data, results):
+    """Get a copy of the monster pack with a tuning block on every family
+
+    Returns:
+        dict: category -> list of plain family dictionaries
+    """
+    tuned = {}
+    for category, group in monster_data.items():
+        tuned[category] = []
+        for index, family in enumerate(group):
+            family = json.loads(json.dumps(family, default=lambda ability: ability.to_dict()))
+            tuning = {}
+            for (rank, tier, family_key), (multiplier, _, _) in results.items():
+                if family_key is None or family_key == (category, index):
+                    tuning.setdefault(rank, {})[tier] = multiplier
+            family['tuning'] = tuning
+            tuned[category].append(family)
+    return tuned
+
+
+def format_monster_pack(monster_data):
+    """Serialize a monster pack in monsters.json's layout, one family per line"""
+    lines = ['{']
+    categories = list(monster_data)
+    for i, category in enumerate(categories):
+        lines.append(f"  {json.dumps(category)}: [")
+        group = monster_data[category]
+        for j, family in enumerate(group):
+            lines.append("    " + json.dumps(family, separators=(',', ':'), ensure_ascii=False) + (',' if j < len(group) - 1 else ''))
+        lines.append("  ]" + (',' if i < len(categories) - 1 else ''))
+    lines.append('}')
+    return "\n".join(lines)
+
+
+def write_pack(monster_data, json_path):
+    """Write a monster pack atomically; the path is relative to the addon directory"""
+    path = resolve_path(json_path)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(format_monster_pack(monster_data))
+    os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune Anki Leveling monster stats to target win rates")
+    parser.add_argument('--fights', type=int, default=config.TUNING_FIGHTS, help="simulated fights per win rate estimate")
+    parser.add_argument('--iterations', type=int, default=config.TUNING_ITERATIONS, help="bisection steps per rank and tier")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--per-family', action='store_true', help="tune every monster family separately")
+    parser.add_argument('--seed', type=int, default=0, help="base seed of the simulated fights")
+    parser.add_argument('--output', default=config.TUNED_MONSTERS_PATH, help="tuned pack path for review, relative to the addon directory")
+    args = parser.parse_args()
+
+    _, monster_data = load_packs()
+    if numpy is None:
+        print("NumPy not available; using the exact (slow) battle simulator")
+    start = time.perf_counter()
+    results = tune(monster_data, args.fights, args.iterations, args.workers, args.per_family, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'rank':<6}{'tier':<7}{'family':<14}{'target':>8}{'multiplier':>12}{'win rate':>10}")
+    missed = 0
+    for (rank, tier, family_key), (multiplier, rate, reached) in results.items():
+        family = 'all' if family_key is None else f"{family_key[0]}:{family_key[1]}"
+        flag = ""
+        if missed_target(rank, tier, rate, reached):
+            missed += 1
+            flag = "  ! target out of range" if not reached else "  ! off target"
+        print(f"{rank:<6}{tier:<7}{family:<14}{target_win_rate(rank, tier):>8.0%}{multiplier:>12.3f}{rate:>10.1%}{flag}")
+
+    write_pack(apply_tuning(monster_data, results), args.output)
+    print(f"\nSolved {len(results)} searches in {elapsed:.1f} s; wrote {args.output} for review (the game does not read it)")
+    if missed:
+        print(f"Warning: {missed} search(es) missed their target by more than {config.TUNING_WIN_RATE_TOLERANCE:.0%}. "
+              f"Targets out of range need a wider TUNING_MULTIPLIER_RANGE or other monsters; off target ones more --fights")
+
+
+if __name__ == '__main__':
+    main()
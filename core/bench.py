@@ -0,0 +1,38 @@
+# bench.py
+# Headless benchmark of the game core: python -m <addon package>.core.bench
+import argparse
+import time
+
+from .character import Character
+from .combat import character_combatant_id, monster_combatant_id, PLAYER_TEAM, MONSTER_TEAM
+from .combat_replay import compute_pack_hash, record_battle
+from .data_loader import load_packs, read_json_data
+from ..data import config
+
+def timed_call(label, func, *args):
+    """Run func once and print how long it took"""
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<28}{(time.perf_counter() - start) * 1000:10.2f} ms")
+    return result
+
+def run_battles(count, class_data, monster_data):
+    pack_hash = compute_pack_hash(class_data, monster_data)
+    definitions = [
+        (character_combatant_id('Sword', 'HP'), PLAYER_TEAM, (300, 40, 20, 12, 15)),
+        (monster_combatant_id('HP', 0), MONSTER_TEAM, (120, 10, 20, 10, 30))
+    ]
+    return [record_battle(definitions, seed, class_data, monster_data, pack_hash) for seed in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Anki Leveling game core")
+    parser.add_argument('--battles', type=int, default=1000, help="number of simulated battles")
+    args = parser.parse_args()
+
+    class_data, monster_data = timed_call("load packs", load_packs)
+    character_data = timed_call("read characters", read_json_data, config.CHARACTERS_PATH)
+    timed_call("build characters x1000", lambda: [Character(data) for data in character_data * 500])
+    timed_call(f"simulate battles x{args.battles}", run_battles, args.battles, class_data, monster_data)
+
+if __name__ == '__main__':
+    main()
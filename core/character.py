@@ -1,6 +1,9 @@
+from . import perf
+
 class Character:
     """Represents a character in the Anki Leveling game"""
     
+    @perf.timed()
     def __init__(self, character_data):
         """Initialize a character from character data dictionary"""
         self.name = character_data.get('name', 'Unknown')
@@ -12,6 +15,7 @@ class Character:
         self.rank = character_data.get('rank', 'F')
         self.current_xp = character_data.get('currentXP', 0)
         self.dungeons = character_data.get('dungeons', {})
+        self.character_class = character_data.get('class', None)
         
         # Initialize stats with defaults if missing
         self.hp = self.stats.get('HP', 120)
@@ -24,10 +28,26 @@ class Character:
         """Get a specific stat value"""
         return self.stats.get(stat_name, 0)
     
+    def set_stats(self, hp, strength, speed, defense, mp):
+        """Replace all five stats"""
+        self.hp = hp
+        self.strength = strength
+        self.speed = speed
+        self.defense = defense
+        self.mp = mp
+        self.stats = {'HP': hp, 'Strength': strength, 'Speed': speed, 'Defense': defense, 'MP': mp}
+    
     def get_dungeon_record(self, rank):
         """Get dungeon pass/fail record for a specific rank"""
         return self.dungeons.get(rank, {'pass': 0, 'fail': 0})
     
+    def record_dungeon(self, rank, passed, day):
+        """Count a dungeon pass or fail and update the last adventure date"""
+        record = self.dungeons.setdefault(rank, {'pass': 0, 'fail': 0})
+        outcome = 'pass' if passed else 'fail'
+        record[outcome] = record.get(outcome, 0) + 1
+        self.date_last_adventure = f"{day.month}-{day.day}-{day.year}"
+    
     def get_total_dungeon_passes(self):
         """Get total number of dungeon passes across all ranks"""
         return sum(dungeon.get('pass', 0) for dungeon in self.dungeons.values())
@@ -43,12 +63,17 @@ class Character:
         return (total_passes / total_attempts * 100) if total_attempts > 0 else 0
     
     def to_dict(self):
-        """Convert character back to dictionary format"""
+        """Convert character back to dictionary format
+
+        The result shares no mutable state with the character, so it stays
+        as it is while the character keeps changing.
+        """
         return {
             'name': self.name,
             'dateJoined': self.date_joined,
             'dateLastAdventure': self.date_last_adventure,
             'weapon': self.weapon,
+            'class': self.character_class,
             'stats': {
                 'HP': self.hp,
                 'Strength': self.strength,
@@ -59,7 +84,7 @@ class Character:
             'level': self.level,
             'rank': self.rank,
             'currentXP': self.current_xp,
-            'dungeons': self.dungeons
+            'dungeons': {rank: dict(record) for rank, record in self.dungeons.items()}
         }
     
     def __str__(self):
@@ -0,0 +1,529 @@
+# character_journal.py
+# Versioned character changes for undo and sync. A change is stored as the
+# few fields it touched (old and new value) instead of a copy of the
+# character; each device appends its changes to its own JSON lines file in
+# the media folder and replays the other devices' files as deltas.
+import json
+import os
+import time
+import uuid
+from collections import deque
+
+from ..data import config
+from .character import Character
+from .idle_scheduler import run_steps
+from .leveling import level_for_total_xp, rank_for_level, total_xp
+from .stat_allocation import STAT_POINT_VALUES
+
+JOURNAL_VERSION = 1
+# Journal files live in the media folder so Anki syncs them; Check Media
+# leaves files starting with '_' alone
+JOURNAL_PREFIX = "_anki_leveling_journal_"
+JOURNAL_SUFFIX = ".jsonl"
+# Characters written per step of a checkpoint, and entries merged per step
+CHECKPOINT_CHUNK_SIZE = 200
+MERGE_CHUNK_SIZE = 200
+
+STAT_FIELDS = ('HP', 'Strength', 'Speed', 'Defense', 'MP')
+# Journal field -> Character attribute, for fields outside stats and dungeons
+_ATTRIBUTES = {
+    'level': 'level',
+    'currentXP': 'current_xp',
+    'rank': 'rank',
+    'class': 'character_class',
+    'dateLastAdventure': 'date_last_adventure'
+}
+
+
+def _stat_values(character):
+    return (character.hp, character.strength, character.speed, character.defense, character.mp)
+
+
+def character_fields(character):
+    """Get the journaled fields of a character as a flat dictionary
+
+    Stats are 'stats.<stat>' and dungeon counters 'dungeons.<rank>.<outcome>'.
+    """
+    fields = {field: getattr(character, attribute) for field, attribute in _ATTRIBUTES.items()}
+    for stat, value in zip(STAT_FIELDS, _stat_values(character)):
+        fields['stats.' + stat] = value
+    for rank, record in character.dungeons.items():
+        for outcome, count in record.items():
+            fields[f"dungeons.{rank}.{outcome}"] = count
+    return fields
+
+
+def set_field(character, field, value):
+    """Set one journaled field of a character"""
+    group, _, key = field.partition('.')
+    if group == 'stats':
+        values = dict(zip(STAT_FIELDS, _stat_values(character)))
+        values[key] = value
+        character.set_stats(*(values[stat] for stat in STAT_FIELDS))
+    elif group == 'dungeons':
+        rank, _, outcome = key.partition('.')
+        character.dungeons.setdefault(rank, {'pass': 0, 'fail': 0})[outcome] = value
+    else:
+        setattr(character, _ATTRIBUTES[field], value)
+
+
+def get_field(character, field):
+    """Get one journaled field of a character"""
+    group, _, key = field.partition('.')
+    if group == 'stats':
+        return _stat_values(character)[STAT_FIELDS.index(key)]
+    if group == 'dungeons':
+        rank, _, outcome = key.partition('.')
+        return character.dungeons.get(rank, {}).get(outcome, 0)
+    return getattr(character, _ATTRIBUTES[field])
+
+
+def _is_counter(old, new):
+    return type(old) is int and type(new) is int
+
+
+def apply_delta(character, ops, reverse=False):
+    """Apply a change's ops, or their reversal, on top of a character's current state
+
+    Numeric fields move by (new - old), so changes made elsewhere in the
+    meantime are kept; other fields are set outright.
+    """
+    for field, old, new in (reversed(ops) if reverse else ops):
+        if reverse:
+            old, new = new, old
+        if _is_counter(old, new):
+            set_field(character, field, get_field(character, field) + new - old)
+        else:
+            set_field(character, field, new)
+
+
+def merge_delta(character, ops, allocator=None, policy=None):
+    """Apply another device's change on top of a character's current state
+
+    Level and XP move together as total XP, so that changes from several
+    devices give the same result in any order. Stat and class changes of an
+    entry that changed the level came from its level ups; they are not
+    copied but re-derived from the merged level with allocator and policy
+    (or dropped when no allocator is given), so level ups made on two
+    devices are not paid twice.
+    """
+    changes = {field: (old, new) for field, old, new in ops}
+    old_level, new_level = changes.pop('level', (character.level, character.level))
+    old_xp, new_xp = changes.pop('currentXP', (0, 0))
+    changes.pop('rank', None)
+    if old_level != new_level:
+        changes.pop('class', None)
+        for stat in STAT_FIELDS:
+            changes.pop('stats.' + stat, None)
+    apply_delta(character, tuple((field, old, new) for field, (old, new) in changes.items()))
+
+    gained = total_xp(new_level, new_xp) - total_xp(old_level, old_xp)
+    level, character.current_xp = level_for_total_xp(max(0, total_xp(character.level, character.current_xp) + gained))
+    if allocator is None or level == character.level:
+        character.level = level
+    elif level > character.level:
+        allocator.level_up(character, level - character.level, policy)
+    else:
+        _level_down(character, level, allocator, policy)
+    character.rank = rank_for_level(character.level)
+
+
+def _level_down(character, level, allocator, policy):
+    """Take back the stat points of the levels above level, and the class they earned"""
+    values = list(_stat_values(character))
+    for lost_level in range(level + 1, character.level + 1):
+        for i, points in enumerate(policy.allocate(lost_level)):
+            values[i] -= points * STAT_POINT_VALUES[i]
+    character.set_stats(*(max(0, value) for value in values))
+    character.level = level
+    character_class = allocator.class_for_stats(character)
+    if character_class is not None:
+        character.character_class = character_class
+
+
+class JournalEntry:
+    """One change of one character"""
+    __slots__ = ('seq', 'timestamp', 'label', 'ref', 'name', 'ops')
+
+    def __init__(self, seq, timestamp, label, ref, name, ops):
+        self.seq = seq
+        self.timestamp = timestamp
+        # What caused the change, e.g. 'review' or 'undo'
+        self.label = label
+        # Caller reference, e.g. the revlog id of a review
+        self.ref = ref
+        self.name = name
+        # ((field, old, new), ...)
+        self.ops = ops
+
+    def to_list(self):
+        return [self.seq, self.timestamp, self.label, self.ref, self.name, [list(op) for op in self.ops]]
+
+    @classmethod
+    def from_list(cls, data):
+        seq, timestamp, label, ref, name, ops = data
+        return cls(seq, timestamp, label, ref, name, tuple(tuple(op) for op in ops))
+
+
+class _Change:
+    """Context manager diffing a character's fields around a block"""
+    __slots__ = ('journal', 'character', 'label', 'ref', 'undoable', 'before', 'entry')
+
+    def __init__(self, journal, character, label, ref, undoable):
+        self.journal = journal
+        self.character = character
+        self.label = label
+        self.ref = ref
+        self.undoable = undoable
+        self.before = None
+        self.entry = None
+
+    def __enter__(self):
+        self.before = character_fields(self.character)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.entry = self.journal.record(self.character, self.before, self.label, self.ref, self.undoable)
+        return False
+
+
+def read_journal(path):
+    """Read a journal file
+
+    Returns:
+        tuple: (header dict, [JournalEntry])
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    header = json.loads(lines[0])
+    entries = []
+    for line in lines[1:]:
+        try:
+            entries.append(JournalEntry.from_list(json.loads(line)))
+        except ValueError:
+            # A line cut short by a crash or a sync in progress
+            break
+    return header, entries
+
+
+class CharacterJournal:
+    """Operation log of a registry's character changes
+
+    Local changes go on an undo stack (newest first, O(1) to undo) and are
+    appended to this device's journal file on flush(). Every
+    JOURNAL_CHECKPOINT_INTERVAL entries the file is rewritten as a full roster
+    checkpoint plus the most recent entries, which bounds its size while still
+    letting other devices replay the entries they missed.
+    """
+
+    def __init__(self, registry, state_file, allocator=None, policy=None):
+        """Create a closed journal
+
+        Args:
+            registry (CharacterRegistry): Roster the changes apply to
+            state_file (str): File in each profile folder holding this
+                device's id and the entries merged from other devices
+            allocator (StatAllocator): Re-derives the stats of levels gained
+                through merged entries
+            policy: Stat allocation policy for those levels
+        """
+        self.registry = registry
+        self.state_file = state_file
+        self.allocator = allocator
+        self.policy = policy
+        self.state_path = None
+        self.media_folder = None
+        self.device_id = None
+        self.seq = 0
+        # device id -> last entry seq merged from it
+        self.seen = {}
+        self.undo_stack = deque(maxlen=config.JOURNAL_UNDO_DEPTH)
+        self.recent = deque(maxlen=config.JOURNAL_CHECKPOINT_INTERVAL)
+        self.pending = []
+        # Entries appended to the journal file since its checkpoint
+        self.file_entries = 0
+
+    @property
+    def is_open(self):
+        return self.media_folder is not None
+
+    @property
+    def journal_path(self):
+        return os.path.join(self.media_folder, f"{JOURNAL_PREFIX}{self.device_id}{JOURNAL_SUFFIX}")
+
+    def open(self, profile_folder, media_folder):
+        """Load this device's journal state for a profile"""
+        self.close()
+        self.state_path = os.path.join(profile_folder, self.state_file)
+        state = {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            # Missing or cut short: this device starts over under a new id
+            pass
+        self.device_id = state.get('device') or uuid.uuid4().hex[:12]
+        self.seen = state.get('seen', {})
+        self.media_folder = media_folder
+        self.seq = 0
+        self.file_entries = 0
+
+        if not os.path.exists(self.journal_path):
+            return
+        try:
+            header, entries = read_journal(self.journal_path)
+            checkpoint = header['checkpoint']
+        except (OSError, ValueError, IndexError, KeyError, TypeError):
+            # Empty or cut short by a crash. The entries in it are lost, so a
+            # new journal starts from the roster as loaded, under a new id:
+            # other devices have seen the old id's seqs, not the new ones
+            self.device_id = uuid.uuid4().hex[:12]
+            run_steps(self._checkpoint_steps())
+            self._write_state()
+            return
+        self.seq = entries[-1].seq if entries else checkpoint
+        self.recent.extend(entries)
+        self.file_entries = sum(1 for entry in entries if entry.seq > checkpoint)
+
+    def close(self):
+        """Flush and forget the open profile's journal"""
+        if not self.is_open:
+            return
+        try:
+            self.flush()
+        finally:
+            self.media_folder = None
+            self.state_path = None
+            self.undo_stack.clear()
+            self.recent.clear()
+            self.pending = []
+
+    def change(self, character, label, ref=None, undoable=True):
+        """Context manager journaling what a block does to a character
+
+        The recorded JournalEntry (None if nothing changed) is available as
+        the context's entry attribute afterwards.
+        """
+        return _Change(self, character, label, ref, undoable)
+
+    def record(self, character, before, label, ref=None, undoable=True):
+        """Journal the difference between earlier fields and the character now
+
+        Returns:
+            JournalEntry: The entry, or None if no field changed
+        """
+        after = character_fields(character)
+        ops = tuple(
+            (field, before.get(field, 0 if field.startswith('dungeons.') else None), value)
+            for field, value in after.items() if before.get(field) != value
+        )
+        if not ops:
+            return None
+        self.seq += 1
+        entry = JournalEntry(self.seq, int(time.time()), label, ref, character.name, ops)
+        if undoable:
+            self.undo_stack.append(entry)
+        self.recent.append(entry)
+        self.pending.append(entry)
+        self.registry.notify(character)
+        return entry
+
+    def last_entry(self):
+        """Get the newest undoable entry without removing it"""
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def undo(self):
+        """Revert the newest undoable entry
+
+        The reversal is journaled as an 'undo' entry so devices that already
+        merged the original change revert it too.
+
+        Returns:
+            JournalEntry: The reverted entry, or None if there was none
+        """
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        character = self.registry.get_character(entry.name)
+        if character is None:
+            return entry
+        before = character_fields(character)
+        apply_delta(character, entry.ops, reverse=True)
+        self.record(character, before, 'undo', entry.seq, undoable=False)
+        return entry
+
+    def flush(self):
+        """Append pending entries to this device's journal file, checkpointing when due"""
+        run_steps(self.flush_steps())
+
+    def flush_steps(self):
+        """Generator form of flush() for the idle scheduler
+
+        Appending is one step; a due checkpoint writes a chunk of characters
+        per step.
+        """
+        if not self.is_open:
+            return
+        if self.pending:
+            if self.file_entries + len(self.pending) > config.JOURNAL_CHECKPOINT_INTERVAL or not os.path.exists(self.journal_path):
+                if not (yield from self._checkpoint_steps()):
+                    return
+            else:
+                with open(self.journal_path, 'a', encoding='utf-8') as f:
+                    for entry in self.pending:
+                        f.write(json.dumps(entry.to_list(), separators=(',', ':')) + "\n")
+                self.file_entries += len(self.pending)
+                self.pending = []
+        self._write_state()
+
+    def _checkpoint_steps(self):
+        """Rewrite the journal file as the roster now plus the recent entries
+
+        The header line is written a chunk of characters per step. A change
+        journaled in between would leave the checkpoint behind its own seq,
+        so the checkpoint then starts over.
+
+        Returns:
+            bool: True once written, False if the journal closed first
+        """
+        path = self.journal_path
+        temp_path = path + ".tmp"
+        while True:
+            seq = self.seq
+            characters = list(self.registry.characters)
+            header = {'version': JOURNAL_VERSION, 'device': self.device_id, 'checkpoint': seq}
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    # The header is one JSON object ending in the roster
+                    f.write(json.dumps(header, separators=(',', ':'))[:-1] + ',"characters":[')
+                    for start in range(0, len(characters), CHECKPOINT_CHUNK_SIZE):
+                        records = (character.to_dict() for character in characters[start:start + CHECKPOINT_CHUNK_SIZE])
+                        f.write(("," if start else "") + ",".join(json.dumps(record, separators=(',', ':')) for record in records))
+                        yield
+                        if not self.is_open or self.journal_path != path:
+                            return False
+                        if self.seq != seq:
+                            break
+                    else:
+                        f.write("]}\n")
+                        for entry in self.recent:
+                            f.write(json.dumps(entry.to_list(), separators=(',', ':')) + "\n")
+                        f.close()
+                        os.replace(temp_path, path)
+                        break
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        # The recent entries copied after the header are replay history for
+        # other devices; they do not count toward the next checkpoint
+        self.file_entries = 0
+        self.pending = []
+        return True
+
+    def _write_state(self):
+        self._write_json(self.state_path, {'version': JOURNAL_VERSION, 'device': self.device_id, 'seen': self.seen})
+
+    def _write_json(self, path, data):
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def journal_files(self):
+        """Get the journal files other devices synced into the media folder"""
+        own = os.path.basename(self.journal_path)
+        return [
+            entry.path for entry in os.scandir(self.media_folder)
+            if entry.name.startswith(JOURNAL_PREFIX) and entry.name.endswith(JOURNAL_SUFFIX) and entry.name != own
+        ]
+
+    def merge(self):
+        """Replay the entries other devices made since the last merge
+
+        Returns:
+            int: Number of entries applied
+        """
+        return run_steps(self.merge_steps())
+
+    def merge_steps(self):
+        """Generator form of merge() for the idle scheduler
+
+        Each step reads one device's file or applies a chunk of its entries.
+
+        Returns:
+            int: Number of entries applied
+        """
+        if not self.is_open:
+            return 0
+        media_folder = self.media_folder
+        applied = 0
+        for path in self.journal_files():
+            try:
+                header, entries = read_journal(path)
+            except (OSError, ValueError, IndexError):
+                continue
+            for applied_now in self.merge_entries_steps(header, entries):
+                applied += applied_now
+                yield
+                if self.media_folder != media_folder:
+                    return applied
+        if applied:
+            yield from self.flush_steps()
+        return applied
+
+    def merge_entries(self, header, entries):
+        """Apply one device's entries that this device has not seen yet"""
+        return sum(self.merge_entries_steps(header, entries))
+
+    def merge_entries_steps(self, header, entries):
+        """Generator applying one device's unseen entries a chunk at a time
+
+        Yields the number of entries each chunk applied; what was applied is
+        marked seen after every chunk, so a merge cut short resumes there.
+        """
+        device = header['device']
+        seen = self.seen.get(device, 0)
+        first = entries[0].seq if entries else header['checkpoint'] + 1
+        if seen < min(first - 1, header['checkpoint']):
+            # Entries were compacted away before we saw them: fall back to the
+            # checkpoint, keeping whichever side got further
+            records = header['characters']
+            for start in range(0, len(records), MERGE_CHUNK_SIZE):
+                for record in records[start:start + MERGE_CHUNK_SIZE]:
+                    self._merge_record(record)
+                yield 0
+            self.seen[device] = seen = header['checkpoint']
+            yield 1
+
+        entries = [entry for entry in entries if entry.seq > seen]
+        for start in range(0, len(entries), MERGE_CHUNK_SIZE):
+            applied = 0
+            chunk = entries[start:start + MERGE_CHUNK_SIZE]
+            for entry in chunk:
+                character = self.registry.get_character(entry.name)
+                if character is None:
+                    continue
+                merge_delta(character, entry.ops, self.allocator, self.policy)
+                self.registry.notify(character)
+                applied += 1
+            self.seen[device] = chunk[-1].seq
+            yield applied
+
+    def _merge_record(self, record):
+        remote = Character(record)
+        local = self.registry.get_character(remote.name)
+        if local is None:
+            self.registry.add_character(remote)
+            return
+        if total_xp(remote.level, remote.current_xp) > total_xp(local.level, local.current_xp):
+            local.level = remote.level
+            local.current_xp = remote.current_xp
+            local.rank = remote.rank
+            local.character_class = remote.character_class
+            local.set_stats(remote.hp, remote.strength, remote.speed, remote.defense, remote.mp)
+        for rank, remote_record in remote.dungeons.items():
+            local_record = local.dungeons.setdefault(rank, {'pass': 0, 'fail': 0})
+            for outcome, count in remote_record.items():
+                local_record[outcome] = max(local_record.get(outcome, 0), count)
+        self.registry.notify(local)
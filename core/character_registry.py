@@ -0,0 +1,176 @@
+# character_registry.py
+# Per-profile character rosters, loaded only while their Anki profile is open.
+import json
+import os
+
+from .character import Character
+from .idle_scheduler import run_steps
+
+# Characters serialised per step by save_steps()
+SAVE_CHUNK_SIZE = 200
+
+
+def encode_record(record):
+    """Encode one character record as a line of the roster file
+
+    The roster is a JSON array with one character per line, so it can be
+    written a chunk at a time.
+    """
+    return json.dumps(record, separators=(',', ':'))
+
+
+class CharacterRegistry:
+    """Holds the character roster of the currently open Anki profile"""
+
+    def __init__(self, file_name, legacy_path=None):
+        """Create an empty registry
+
+        Args:
+            file_name (str): Roster file name inside each profile folder
+            legacy_path (str): Shared roster used to seed profiles that have none yet
+        """
+        self.file_name = file_name
+        self.legacy_path = legacy_path
+        self.profile_folder = None
+        self.characters = []
+        self.listeners = []
+        # Counts notifications, so callers can tell whether the roster
+        # changed since they last looked
+        self.version = 0
+
+    @property
+    def is_open(self):
+        return self.profile_folder is not None
+
+    @property
+    def roster_path(self):
+        """Get the roster file path for the open profile"""
+        if self.profile_folder is None:
+            return None
+        return os.path.join(self.profile_folder, self.file_name)
+
+    def open_profile(self, profile_folder):
+        """Load the roster for a profile, replacing any previously loaded roster"""
+        if self.is_open:
+            self.close_profile()
+
+        path = os.path.join(profile_folder, self.file_name)
+        if os.path.exists(path):
+            source_path = path
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            # First open of this profile: start from the shared add-on roster
+            source_path = self.legacy_path
+        else:
+            source_path = None
+
+        characters = []
+        if source_path is not None:
+            with open(source_path, 'r', encoding='utf-8') as f:
+                character_data = json.load(f)
+            characters = [Character(char_data) for char_data in character_data]
+
+        # Only take ownership of the profile once its roster loaded cleanly,
+        # so a bad file is never overwritten by an empty roster on close
+        self.profile_folder = profile_folder
+        self.characters = characters
+        self.notify(None)
+
+        if source_path != path:
+            self.save()
+
+    def close_profile(self):
+        """Save and unload the roster of the open profile"""
+        if not self.is_open:
+            return
+        try:
+            self.save()
+        finally:
+            self.profile_folder = None
+            self.characters = []
+            self.notify(None)
+
+    def save(self):
+        """Write the roster to the open profile's folder"""
+        path = self.roster_path
+        if path is None:
+            return
+        lines = [encode_record(character.to_dict()) for character in self.characters]
+        run_steps(self.write_steps([lines], ".tmp"))
+
+    def save_steps(self, chunk_size=SAVE_CHUNK_SIZE):
+        """Generator saving the roster a chunk of characters per step
+
+        Each step converts and encodes one chunk and appends it to a
+        temporary file, which replaces the roster once complete. For the
+        idle scheduler; the save is abandoned if the profile closes in
+        between, since close_profile() saves anyway.
+        """
+        characters = list(self.characters)
+        return self.write_steps(
+            [encode_record(character.to_dict()) for character in characters[start:start + chunk_size]]
+            for start in range(0, len(characters), chunk_size)
+        )
+
+    def write_steps(self, chunks, temp_suffix=".partial"):
+        """Generator writing encoded records (see encode_record) as the roster file, a chunk per step
+
+        Args:
+            chunks: Iterable of lists of encoded records, produced lazily
+            temp_suffix (str): Suffix of the file written before it replaces
+                the roster; synchronous saves use their own so they never
+                truncate the file of a save still in progress
+        """
+        path = self.roster_path
+        if path is None:
+            return
+        temp_path = path + temp_suffix
+        separator = "\n"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write("[")
+                for lines in chunks:
+                    if lines:
+                        f.write(separator + ",\n".join(lines))
+                        separator = ",\n"
+                    yield
+                    if self.roster_path != path:
+                        return
+                f.write("\n]\n")
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def replace_characters(self, characters):
+        """Swap in a new roster for the open profile"""
+        self.characters = characters
+        self.notify(None)
+
+    def add_character(self, character):
+        """Add a character to the open profile's roster"""
+        self.characters.append(character)
+        self.notify(character)
+
+    def add_listener(self, listener):
+        """Register a callback(registry, character); character is None when the whole roster changed"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, character):
+        """Tell listeners that a character (or the whole roster, for None) changed"""
+        self.version += 1
+        for listener in self.listeners:
+            listener(self, character)
+
+    def get_character(self, name):
+        """Get a character of the open profile by name"""
+        for character in self.characters:
+            if character.name == name:
+                return character
+        return None
+
+    def __len__(self):
+        return len(self.characters)
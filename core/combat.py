@@ -0,0 +1,215 @@
+# combat.py
+# Deterministic turn based combat between characters and monsters.
+import random
+
+from .combat_state import CombatState, PERMANENT
+from .effects import HP, MP, STRENGTH, SPEED, DEFENSE, compile_ability
+from .turn_scheduler import TurnScheduler
+
+PLAYER_TEAM = 0
+MONSTER_TEAM = 1
+
+# Damage rolls are a percentage of the computed damage
+ROLL_MIN = 85
+ROLL_MAX = 115
+# Ability index used when an actor cannot afford any ability
+REST_ABILITY = 255
+REST_MANA = 5
+MAX_TURNS = 500
+
+CLASS_ABILITY_ORDER = ('basicAttack', 'magicAttack', 'basicDefense', 'magicDefense')
+
+
+def character_combatant_id(weapon, stat):
+    """Build the combatant id of a player class"""
+    return f"c:{weapon}:{stat}"
+
+
+def monster_combatant_id(category, index):
+    """Build the combatant id of a monster family"""
+    return f"m:{category}:{index}"
+
+
+def resolve_abilities(combatant_id, class_data, monster_data):
+    """Get the ability list for a combatant id from the loaded data packs"""
+    kind, group, key = combatant_id.split(':', 2)
+    if kind == 'c':
+        abilities = class_data[group][key]['abilities']
+        return [abilities[ability_type] for ability_type in CLASS_ABILITY_ORDER if ability_type in abilities]
+    if kind == 'm':
+        return list(monster_data[group][int(key)]['abilities'])
+    raise ValueError(f"Unknown combatant id {combatant_id!r}")
+
+
+class Combatant:
+    """A participant in a battle
+
+    Before a battle binds it, a combatant holds its starting stats; once
+    bound, its stats are a row of the battle's CombatState.
+    """
+    __slots__ = ('combatant_id', 'team', 'abilities', 'effects', 'max_hp', 'stats', 'state', 'entity')
+
+    def __init__(self, combatant_id, team, stats, abilities):
+        """Create a combatant
+
+        Args:
+            combatant_id (str): Id the abilities were resolved from
+            team (int): PLAYER_TEAM or MONSTER_TEAM
+            stats (tuple): Starting stats in STAT_ORDER
+            abilities (list): Ability records or dictionaries
+        """
+        self.combatant_id = combatant_id
+        self.team = team
+        self.abilities = abilities
+        self.effects = [compile_ability(ability) for ability in abilities]
+        self.stats = tuple(stats)
+        self.max_hp = self.stats[HP]
+        self.state = None
+        self.entity = None
+
+    def bind(self, state):
+        """Add this combatant to a combat state and read its stats from there"""
+        self.state = state
+        self.entity = state.add(self.team, self.stats, self.max_hp)
+        return self.entity
+
+    def stat(self, stat):
+        if self.state is None:
+            return self.stats[stat]
+        return self.state.columns[stat][self.entity]
+
+    @property
+    def hp(self):
+        return self.stat(HP)
+
+    @property
+    def mp(self):
+        return self.stat(MP)
+
+    @property
+    def strength(self):
+        return self.stat(STRENGTH)
+
+    @property
+    def speed(self):
+        return self.stat(SPEED)
+
+    @property
+    def defense(self):
+        return self.stat(DEFENSE)
+
+    @property
+    def alive(self):
+        return self.stat(HP) > 0
+
+    def get_stats(self):
+        """Get the current stats in STAT_ORDER"""
+        if self.state is None:
+            return self.stats
+        return tuple(self.state.row(self.entity))
+
+
+class Battle:
+    """A seeded battle; the same seed and combatants always play out identically
+
+    Any number of players and monsters may take part. Their stats live in one
+    CombatState where each combatant's entity id is its index in combatants.
+    Buffs and debuffs last the whole battle unless buff_turns is given; timed
+    buffs count down at the end of each of their owner's turns, including
+    the turn a self-buff was cast in. Replays are recorded with permanent
+    buffs.
+    """
+
+    def __init__(self, combatants, seed, buff_turns=PERMANENT, vector_min=None):
+        """Set up a battle
+
+        Args:
+            combatants (list): Combatants; players and monsters in any number
+            seed (int): Seed of every choice and roll
+            buff_turns (int): Turns of its owner a buff lasts, or PERMANENT
+            vector_min (int): Batch size from which the state uses NumPy
+                (default: CombatState's)
+        """
+        self.combatants = combatants
+        self.seed = seed
+        self.buff_turns = buff_turns
+        self.rng = random.Random(seed)
+        self.state = CombatState() if vector_min is None else CombatState(vector_min)
+        self.scheduler = TurnScheduler()
+        self.events = []
+        self.winner = None
+
+        for combatant in combatants:
+            entity = combatant.bind(self.state)
+            self.scheduler.add(entity, combatant.speed)
+
+    def living(self, team):
+        return self.state.living(team)
+
+    def choose_action(self, actor_index):
+        """Pick an ability, target and damage roll for the acting combatant"""
+        actor = self.combatants[actor_index]
+        mp = self.state.columns[MP][actor_index]
+        affordable = [i for i, effect in enumerate(actor.effects) if effect.mana_cost <= mp]
+        ability_index = self.rng.choice(affordable) if affordable else REST_ABILITY
+        enemies = self.living(MONSTER_TEAM if actor.team == PLAYER_TEAM else PLAYER_TEAM)
+        target_index = self.rng.choice(enemies)
+        roll = self.rng.randint(ROLL_MIN, ROLL_MAX)
+        return ability_index, target_index, roll
+
+    def apply_action(self, actor_index, ability_index, target_index, roll):
+        """Resolve an ability against a target"""
+        state = self.state
+        actor = self.combatants[actor_index]
+
+        if ability_index == REST_ABILITY:
+            state.set(actor_index, MP, state.get(actor_index, MP) + REST_MANA)
+            return
+
+        actor_speed_changed, target_speed_changed = state.apply_effect(
+            actor_index, target_index, actor.effects[ability_index], roll, self.buff_turns
+        )
+        if actor_speed_changed:
+            self.scheduler.set_speed(actor_index, state.get(actor_index, SPEED))
+        if target_speed_changed:
+            self.scheduler.set_speed(target_index, state.get(target_index, SPEED))
+
+        if state.get(target_index, HP) <= 0:
+            self.scheduler.remove(target_index)
+
+    def take_turn(self):
+        """Play one turn and return its (actor, ability, target, roll) event"""
+        actor_index = self.scheduler.next_turn()
+        event = (actor_index,) + self.choose_action(actor_index)
+        self.apply_action(*event)
+        self.expire_buffs(actor_index)
+        self.events.append(event)
+        return event
+
+    def expire_buffs(self, actor_index):
+        """Count down the actor's timed buffs after its turn, reverting expired ones"""
+        for entity in self.state.tick_buffs(actor_index):
+            if self.state.get(entity, HP) > 0:
+                self.scheduler.set_speed(entity, self.state.get(entity, SPEED))
+
+    def run(self, max_turns=MAX_TURNS):
+        """Play until one team is defeated or max_turns is reached
+
+        Returns:
+            int: Winning team, or None on a draw
+        """
+        while True:
+            if not self.state.has_living(PLAYER_TEAM):
+                self.winner = MONSTER_TEAM
+                break
+            if not self.state.has_living(MONSTER_TEAM):
+                self.winner = PLAYER_TEAM
+                break
+            if len(self.events) >= max_turns:
+                break
+            self.take_turn()
+        return self.winner
+
+    def end_state(self):
+        """Get every combatant's current stats in STAT_ORDER"""
+        return [combatant.get_stats() for combatant in self.combatants]
@@ -0,0 +1,189 @@
+# combat_replay.py
+# Compact binary battle logs that can be re-simulated and verified.
+import hashlib
+import json
+import lzma
+import struct
+from array import array
+
+from .combat import Battle, Combatant, resolve_abilities, PLAYER_TEAM, MONSTER_TEAM
+from .effects import STAT_ORDER
+
+REPLAY_MAGIC = b'ALRP'
+REPLAY_VERSION = 1
+
+# magic, version, seed, pack hash, combatant count, turn count, winner (255 = draw)
+_HEADER = struct.Struct('<4sBQ8sBIB')
+# team, id length, then the utf-8 id and its starting stats
+_COMBATANT = struct.Struct('<BB')
+_STATS = struct.Struct('<' + 'i' * len(STAT_ORDER))
+# Each turn is four bytes: actor, ability, target, roll
+_TURN_WIDTH = 4
+_DRAW = 255
+_RECORD_LENGTH = struct.Struct('<I')
+
+
+def compute_pack_hash(class_data, monster_data):
+    """Get a short hash identifying the loaded data packs"""
+    def encode(value):
+        return value.to_dict()
+    payload = json.dumps([class_data, monster_data], sort_keys=True, default=encode)
+    return hashlib.sha1(payload.encode('utf-8')).digest()[:8]
+
+
+class ReplayLog:
+    """Seed, combatants, per-turn events and end state of one battle"""
+    __slots__ = ('seed', 'pack_hash', 'combatants', 'turns', 'winner', 'end_state')
+
+    def __init__(self, seed, pack_hash, combatants, turns, winner, end_state):
+        """Create a replay log
+
+        Args:
+            seed (int): Battle RNG seed
+            pack_hash (bytes): compute_pack_hash() of the packs the battle used
+            combatants (list): (combatant_id, team, stats) per combatant
+            turns (array): Flat 'B' array of (actor, ability, target, roll) events
+            winner (int): Winning team, or None on a draw
+            end_state (list): Final stats in STAT_ORDER per combatant
+        """
+        self.seed = seed
+        self.pack_hash = pack_hash
+        self.combatants = combatants
+        self.turns = turns
+        self.winner = winner
+        self.end_state = end_state
+
+    @property
+    def turn_count(self):
+        return len(self.turns) // _TURN_WIDTH
+
+    def iter_turns(self):
+        """Yield (actor, ability, target, roll) for each turn"""
+        turns = self.turns
+        for i in range(0, len(turns), _TURN_WIDTH):
+            yield tuple(turns[i:i + _TURN_WIDTH])
+
+    def encode(self):
+        """Pack the log into bytes"""
+        winner = _DRAW if self.winner is None else self.winner
+        parts = [_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.pack_hash,
+                              len(self.combatants), self.turn_count, winner)]
+        for combatant_id, team, stats in self.combatants:
+            encoded_id = combatant_id.encode('utf-8')
+            parts.append(_COMBATANT.pack(team, len(encoded_id)))
+            parts.append(encoded_id)
+            parts.append(_STATS.pack(*stats))
+        parts.append(self.turns.tobytes())
+        for stats in self.end_state:
+            parts.append(_STATS.pack(*stats))
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, data, offset=0):
+        """Unpack a log from bytes
+
+        Returns:
+            tuple: (ReplayLog, offset just past the log)
+        """
+        magic, version, seed, pack_hash, combatant_count, turn_count, winner = _HEADER.unpack_from(data, offset)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("Not an Anki Leveling replay")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        offset += _HEADER.size
+
+        combatants = []
+        for _ in range(combatant_count):
+            team, id_length = _COMBATANT.unpack_from(data, offset)
+            offset += _COMBATANT.size
+            combatant_id = bytes(data[offset:offset + id_length]).decode('utf-8')
+            offset += id_length
+            stats = _STATS.unpack_from(data, offset)
+            offset += _STATS.size
+            combatants.append((combatant_id, team, stats))
+
+        turns = array('B')
+        turns.frombytes(bytes(data[offset:offset + turn_count * _TURN_WIDTH]))
+        offset += turn_count * _TURN_WIDTH
+
+        end_state = []
+        for _ in range(combatant_count):
+            end_state.append(_STATS.unpack_from(data, offset))
+            offset += _STATS.size
+
+        log = cls(seed, pack_hash, combatants, turns, None if winner == _DRAW else winner, end_state)
+        return log, offset
+
+
+def build_combatants(definitions, class_data, monster_data):
+    """Create fresh combatants from (combatant_id, team, stats) definitions"""
+    return [
+        Combatant(combatant_id, team, stats, resolve_abilities(combatant_id, class_data, monster_data))
+        for combatant_id, team, stats in definitions
+    ]
+
+
+def record_battle(definitions, seed, class_data, monster_data, pack_hash=None):
+    """Play a battle and record it
+
+    Args:
+        definitions (list): (combatant_id, team, stats) per combatant
+        seed (int): Battle RNG seed
+        pack_hash (bytes): Precomputed compute_pack_hash(), computed if omitted
+
+    Returns:
+        ReplayLog: The recorded battle
+    """
+    if pack_hash is None:
+        pack_hash = compute_pack_hash(class_data, monster_data)
+    battle = Battle(build_combatants(definitions, class_data, monster_data), seed)
+    winner = battle.run()
+
+    turns = array('B')
+    for event in battle.events:
+        turns.extend(event)
+    return ReplayLog(seed, pack_hash, [tuple(d) for d in definitions], turns, winner, battle.end_state())
+
+
+def verify_replay(log, class_data, monster_data):
+    """Re-simulate a replay and compare it with the recording
+
+    Returns:
+        tuple: (ok, message) where message describes the first mismatch
+    """
+    if log.pack_hash != compute_pack_hash(class_data, monster_data):
+        return False, "Replay was recorded with a different data pack"
+
+    battle = Battle(build_combatants(log.combatants, class_data, monster_data), log.seed)
+    for turn, recorded in enumerate(log.iter_turns()):
+        if not battle.living(PLAYER_TEAM) or not battle.living(MONSTER_TEAM):
+            return False, f"Battle ended before recorded turn {turn}"
+        event = battle.take_turn()
+        if event != recorded:
+            return False, f"Turn {turn} differs: recorded {recorded}, simulated {event}"
+
+    if battle.run(max_turns=log.turn_count) != log.winner:
+        return False, "Winner differs from recording"
+    if [tuple(stats) for stats in battle.end_state()] != [tuple(stats) for stats in log.end_state]:
+        return False, "End state differs from recording"
+    return True, "Replay verified"
+
+
+def write_archive(path, logs):
+    """Write many replay logs to one lzma compressed file"""
+    with lzma.open(path, 'wb') as f:
+        for log in logs:
+            data = log.encode()
+            f.write(_RECORD_LENGTH.pack(len(data)))
+            f.write(data)
+
+
+def read_archive(path):
+    """Yield the replay logs stored in an archive"""
+    with lzma.open(path, 'rb') as f:
+        while True:
+            length = f.read(_RECORD_LENGTH.size)
+            if not length:
+                break
+            data = f.read(_RECORD_LENGTH.unpack(length)[0])
+            yield ReplayLog.decode(data)[0]
@@ -0,0 +1,285 @@
+# combat_state.py
+# Structure-of-arrays combat state: every combatant is an entity row, every
+# stat a column, and timed buffs live in a table of their own. Systems such
+# as damage, healing and buff expiry work over whole columns.
+from array import array
+
+from .effects import STAT_ORDER, HP, MP, STRENGTH, SPEED, DEFENSE, hit_damage
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Duration of a buff that lasts until the battle ends
+PERMANENT = -1
+# Lowest value each stat can be pushed to (STAT_ORDER); Speed floors at 1
+STAT_FLOORS = (0, 0, 0, 1, 0)
+# Stats abilities buff and debuff
+BUFF_STATS = (STRENGTH, DEFENSE, SPEED)
+# Batches smaller than this are cheaper to run as a Python loop than through NumPy
+VECTOR_MIN = 32
+
+
+def _view(column):
+    """NumPy view sharing a column's memory; must be dropped before the column grows"""
+    return numpy.frombuffer(column, dtype=numpy.int64)
+
+
+class CombatState:
+    """Stats of every combatant in a battle, one column per stat
+
+    Entity ids are row indices; rows of removed entities are reused. Buffs
+    with a duration are rows of a separate table (entity, stat, amount,
+    turns left) and are reverted when their owner's turns run out.
+    """
+
+    def __init__(self, vector_min=VECTOR_MIN):
+        """Create an empty state
+
+        Args:
+            vector_min (int): Smallest batch the column systems hand to NumPy
+        """
+        self.vector_min = vector_min
+        self.columns = tuple(array('q') for _ in STAT_ORDER)
+        self.max_hp = array('q')
+        self.team = array('b')
+        self.in_use = array('b')
+        self.free = []
+        self.count = 0
+        # Entity ids per team, in id order
+        self.members = {}
+
+        self.buff_entity = array('q')
+        self.buff_stat = array('b')
+        self.buff_amount = array('q')
+        self.buff_turns = array('q')
+
+    def __len__(self):
+        return self.count
+
+    def add(self, team, stats, max_hp=None):
+        """Add an entity with starting stats in STAT_ORDER
+
+        Returns:
+            int: The entity id
+        """
+        if max_hp is None:
+            max_hp = stats[HP]
+        if self.free:
+            entity = self.free.pop()
+            for column, value in zip(self.columns, stats):
+                column[entity] = value
+            self.max_hp[entity] = max_hp
+            self.team[entity] = team
+            self.in_use[entity] = 1
+        else:
+            entity = len(self.in_use)
+            for column, value in zip(self.columns, stats):
+                column.append(value)
+            self.max_hp.append(max_hp)
+            self.team.append(team)
+            self.in_use.append(1)
+        self.count += 1
+        members = self.members.setdefault(team, [])
+        members.append(entity)
+        members.sort()
+        return entity
+
+    def remove(self, entity):
+        """Drop an entity and its buffs; its id may be reused"""
+        if not self.in_use[entity]:
+            return
+        self.in_use[entity] = 0
+        self.count -= 1
+        self.members[self.team[entity]].remove(entity)
+        self.free.append(entity)
+        self._drop_buffs([i for i, owner in enumerate(self.buff_entity) if owner == entity])
+
+    def get(self, entity, stat):
+        return self.columns[stat][entity]
+
+    def set(self, entity, stat, value):
+        self.columns[stat][entity] = value
+
+    def row(self, entity):
+        """Get an entity's stats in STAT_ORDER as a new list"""
+        return [column[entity] for column in self.columns]
+
+    def set_row(self, entity, stats):
+        for column, value in zip(self.columns, stats):
+            column[entity] = value
+
+    def entities(self, team=None):
+        """Get the ids in use, optionally of one team, in id order"""
+        if team is None:
+            in_use = self.in_use
+            return [entity for entity in range(len(in_use)) if in_use[entity]]
+        return list(self.members.get(team, ()))
+
+    def living(self, team):
+        """Get the ids of a team's entities with HP left"""
+        hp = self.columns[HP]
+        return [entity for entity in self.members.get(team, ()) if hp[entity] > 0]
+
+    def has_living(self, team):
+        """Check whether any entity of a team has HP left"""
+        hp = self.columns[HP]
+        for entity in self.members.get(team, ()):
+            if hp[entity] > 0:
+                return True
+        return False
+
+    def apply_effect(self, caster, target, effect, roll, buff_turns=PERMANENT):
+        """Resolve a compiled ability of one entity against another
+
+        These are the game's ability rules; effects.apply_effects_batch is
+        their NumPy form for many independent fights. Damage is rolled from
+        the stats before the ability changes any, then the caster's own
+        effects apply, then the target's.
+
+        Args:
+            buff_turns (int): How many of its own turns each buff or debuff
+                lasts, or PERMANENT
+
+        Returns:
+            tuple: (caster speed changed, target speed changed)
+        """
+        self_delta = effect.self_delta
+        target_delta = effect.target_delta
+        if effect.base_damage:
+            damage = hit_damage(effect.base_damage, self.columns[STRENGTH][caster], self.columns[DEFENSE][target], roll)
+        else:
+            damage = 0
+
+        self.heal((caster,), (self_delta[HP],))
+        self.columns[MP][caster] += self_delta[MP]
+        self.damage((target,), (damage,))
+
+        for stat in BUFF_STATS:
+            if self_delta[stat]:
+                self.add_buff(caster, stat, self_delta[stat], buff_turns)
+        # A defeated target keeps its speed
+        target_alive = self.columns[HP][target] > 0
+        for stat in BUFF_STATS:
+            if target_delta[stat] and (target_alive or stat != SPEED):
+                self.add_buff(target, stat, target_delta[stat], buff_turns)
+        return self_delta[SPEED] != 0, target_delta[SPEED] != 0 and target_alive
+
+    def damage(self, entities, amounts):
+        """Take HP from distinct entities at once, flooring at 0
+
+        Returns:
+            list: Entities this brought to 0 HP
+        """
+        hp = self.columns[HP]
+        if numpy is not None and len(entities) >= self.vector_min:
+            view = _view(hp)
+            index = numpy.asarray(entities, dtype=numpy.intp)
+            before = view[index]
+            after = numpy.maximum(0, before - numpy.asarray(amounts, dtype=numpy.int64))
+            view[index] = after
+            defeated = index[(before > 0) & (after == 0)].tolist()
+            del view
+            return defeated
+
+        defeated = []
+        for entity, amount in zip(entities, amounts):
+            before = hp[entity]
+            hp[entity] = max(0, before - amount)
+            if before > 0 and hp[entity] == 0:
+                defeated.append(entity)
+        return defeated
+
+    def heal(self, entities, amounts):
+        """Restore HP of distinct entities at once, capped at their max HP"""
+        hp = self.columns[HP]
+        max_hp = self.max_hp
+        if numpy is not None and len(entities) >= self.vector_min:
+            view = _view(hp)
+            index = numpy.asarray(entities, dtype=numpy.intp)
+            view[index] = numpy.minimum(_view(max_hp)[index], view[index] + numpy.asarray(amounts, dtype=numpy.int64))
+            del view
+            return
+        for entity, amount in zip(entities, amounts):
+            hp[entity] = min(max_hp[entity], hp[entity] + amount)
+
+    def add_buff(self, entity, stat, amount, turns=PERMANENT):
+        """Change a stat, recording it for reversal after turns of the entity's own turns
+
+        The change is clamped to the stat's floor and only the part actually
+        applied is reverted later.
+
+        Returns:
+            int: The amount applied
+
+        Raises:
+            ValueError: If turns is neither PERMANENT nor at least 1
+        """
+        if turns != PERMANENT and turns < 1:
+            raise ValueError(f"A buff lasts PERMANENT or at least 1 turn, got {turns}")
+        column = self.columns[stat]
+        before = column[entity]
+        column[entity] = max(STAT_FLOORS[stat], before + amount)
+        applied = column[entity] - before
+        if turns != PERMANENT and applied:
+            self.buff_entity.append(entity)
+            self.buff_stat.append(stat)
+            self.buff_amount.append(applied)
+            self.buff_turns.append(turns)
+        return applied
+
+    def buffs(self, entity):
+        """Get (stat, amount, turns left) of an entity's timed buffs"""
+        return [
+            (self.buff_stat[i], self.buff_amount[i], self.buff_turns[i])
+            for i, owner in enumerate(self.buff_entity) if owner == entity
+        ]
+
+    def tick_buffs(self, entity=None):
+        """Count down timed buffs by one turn and revert the ones that run out
+
+        Args:
+            entity (int): Only count down this entity's buffs (after its
+                turn); None counts down every buff (e.g. once per round)
+
+        Returns:
+            set: Entities whose Speed changed, for the turn scheduler
+        """
+        if not self.buff_turns:
+            return set()
+        if numpy is not None and len(self.buff_turns) >= self.vector_min:
+            turns = _view(self.buff_turns)
+            selected = slice(None) if entity is None else _view(self.buff_entity) == entity
+            turns[selected] -= 1
+            expired = numpy.flatnonzero(turns == 0).tolist()
+            del turns
+        else:
+            expired = []
+            for i, owner in enumerate(self.buff_entity):
+                if entity is None or owner == entity:
+                    self.buff_turns[i] -= 1
+                    if self.buff_turns[i] == 0:
+                        expired.append(i)
+
+        speed_changed = set()
+        for i in expired:
+            owner, stat = self.buff_entity[i], self.buff_stat[i]
+            if not self.in_use[owner]:
+                continue
+            column = self.columns[stat]
+            before = column[owner]
+            column[owner] = max(STAT_FLOORS[stat], before - self.buff_amount[i])
+            if stat == SPEED and column[owner] != before:
+                speed_changed.add(owner)
+        self._drop_buffs(expired)
+        return speed_changed
+
+    def _drop_buffs(self, rows):
+        """Remove buff table rows, keeping the others in order"""
+        if not rows:
+            return
+        dropped = set(rows)
+        for name in ('buff_entity', 'buff_stat', 'buff_amount', 'buff_turns'):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (value for i, value in enumerate(column) if i not in dropped)))
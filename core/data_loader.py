@@ -0,0 +1,44 @@
+# data_loader.py
+# Reading the add-on's JSON data packs without any Anki/Qt dependency.
+import json
+import os
+
+from ..data import config
+from . import perf
+from .ability import intern_object
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def get_addon_dir():
+    """Get the directory where this addon is located"""
+    return ADDON_DIR
+
+def resolve_path(json_path):
+    """Get the absolute path of a file given relative to the addon directory"""
+    return os.path.join(ADDON_DIR, json_path)
+
+@perf.timed()
+def read_json_data(json_path):
+    """Read a JSON data file, interning its strings and ability records
+
+    Args:
+        json_path (str): Path to the JSON file relative to addon directory
+
+    Returns:
+        dict/list: The loaded JSON data
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not valid JSON
+    """
+    with open(resolve_path(json_path), 'r', encoding='utf-8') as f:
+        # Intern keys/strings and share identical ability records
+        return json.load(f, object_hook=intern_object)
+
+def load_packs():
+    """Load the class and monster data packs
+
+    Returns:
+        tuple: (class_data, monster_data)
+    """
+    return read_json_data(config.CLASSES_PATH), read_json_data(config.MONSTERS_PATH)
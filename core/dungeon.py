@@ -0,0 +1,19 @@
+# dungeon.py
+# Dungeon layout rules from gameWiki.txt.
+from .leveling import RANKS, rank_level_range
+
+def monster_count(rank):
+    """Get the number of monsters in a dungeon: an n-th rank dungeon has n monsters"""
+    return RANKS.index(rank) + 1
+
+def monster_level_range(rank):
+    """Get the (lowest, highest) monster level for a dungeon rank"""
+    return rank_level_range(rank)
+
+def monster_xp(level):
+    """Get the XP a monster gives, equal to its level"""
+    return level
+
+def monster_base_stat_total(level):
+    """Get a monster's base stat total: 10 points per level"""
+    return 10 * level
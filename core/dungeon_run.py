@@ -0,0 +1,72 @@
+# dungeon_run.py
+# One dungeon attempt: a character against every monster of a dungeon, in one battle.
+import random
+import time
+
+from .combat import (
+    Battle, Combatant, PLAYER_TEAM, MONSTER_TEAM, character_combatant_id, monster_combatant_id, resolve_abilities
+)
+from .dungeon import monster_level_range, monster_xp
+from .effects import HP, STAT_ORDER
+from .pack_summary import scaled_stats
+from .stat_allocation import leading_stat
+
+
+class DungeonResult:
+    """Outcome of one dungeon attempt"""
+    __slots__ = ('rank', 'passed', 'duration', 'monsters_defeated', 'xp')
+
+    def __init__(self, rank, passed, duration, monsters_defeated, xp):
+        self.rank = rank
+        self.passed = passed
+        self.duration = duration
+        self.monsters_defeated = monsters_defeated
+        # XP of the defeated monsters, earned whether or not the dungeon was cleared
+        self.xp = xp
+
+
+def character_stats(character):
+    """Get a character's stats in STAT_ORDER"""
+    stats = {'HP': character.hp, 'MP': character.mp, 'Strength': character.strength, 'Speed': character.speed, 'Defense': character.defense}
+    return tuple(stats[stat] for stat in STAT_ORDER)
+
+
+def run_dungeon(character, rank, encounter, class_data, monster_data, rng=random):
+    """Play one dungeon
+
+    Every monster spawns at a random level of the rank's range and the
+    character fights them all in one battle.
+
+    Args:
+        character (Character): The character entering; it is not changed
+        rank (str): Dungeon rank letter
+        encounter (list): (category, family index, tier) per monster, e.g.
+            from SpawnTables.draw_encounter()
+        rng: Source of the monster levels and the battle seed
+
+    Returns:
+        DungeonResult: The outcome, for RunHistoryStore.record()
+
+    Raises:
+        ValueError: If the class data has no abilities for the character
+    """
+    start = time.perf_counter()
+    stat = leading_stat(character)
+    if stat not in class_data.get(character.weapon, {}):
+        raise ValueError(f"{character.name} has no {character.weapon} class for {stat}")
+    player_id = character_combatant_id(character.weapon, stat)
+    combatants = [Combatant(player_id, PLAYER_TEAM, character_stats(character), resolve_abilities(player_id, class_data, monster_data))]
+
+    low, high = monster_level_range(rank)
+    levels = []
+    for category, index, _ in encounter:
+        level = rng.randint(low, high)
+        base = scaled_stats(monster_data[category][index]['stats'], level)
+        monster_id = monster_combatant_id(category, index)
+        combatants.append(Combatant(monster_id, MONSTER_TEAM, tuple(base[stat] for stat in STAT_ORDER), resolve_abilities(monster_id, class_data, monster_data)))
+        levels.append(level)
+
+    battle = Battle(combatants, rng.getrandbits(32))
+    passed = battle.run() == PLAYER_TEAM
+    defeated = [level for level, stats in zip(levels, battle.end_state()[1:]) if stats[HP] <= 0]
+    return DungeonResult(rank, passed, time.perf_counter() - start, len(defeated), sum(monster_xp(level) for level in defeated))
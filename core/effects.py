@@ -0,0 +1,123 @@
+# effects.py
+# Table driven ability resolution: each ability is compiled once into fixed
+# layout self/target delta vectors that are applied to stat vectors.
+from .ability import EFFECT_KEYS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Stat vector layout shared by combatants, replays and the batch kernel
+STAT_ORDER = ('HP', 'MP', 'Strength', 'Speed', 'Defense')
+HP, MP, STRENGTH, SPEED, DEFENSE = range(len(STAT_ORDER))
+
+# How each effect field (rows, EFFECT_KEYS order) moves the caster's and the
+# target's stats (columns, STAT_ORDER). baseDamage is scaled per hit instead.
+_E = {key: i for i, key in enumerate(EFFECT_KEYS)}
+SELF_MATRIX = (
+    # HP  MP  Str Spd Def
+    (0, 0, 0, 0, 0),    # baseDamage
+    (1, 0, 0, 0, 0),    # heal
+    (0, 0, 0, 1, 0),    # speedBuff
+    (0, 0, 0, 0, 0),    # speedDebuff
+    (0, 0, 0, 0, 1),    # defenseBuff
+    (0, 0, 0, 0, 0),    # defenseDebuff
+    (0, 0, 1, 0, 0),    # strengthBuff
+    (0, 0, 0, 0, 0),    # strengthDebuff
+    (0, -1, 0, 0, 0)    # manaCost
+)
+TARGET_MATRIX = (
+    (0, 0, 0, 0, 0),    # baseDamage
+    (0, 0, 0, 0, 0),    # heal
+    (0, 0, 0, 0, 0),    # speedBuff
+    (0, 0, 0, -1, 0),   # speedDebuff
+    (0, 0, 0, 0, 0),    # defenseBuff
+    (0, 0, 0, 0, -1),   # defenseDebuff
+    (0, 0, 0, 0, 0),    # strengthBuff
+    (0, 0, -1, 0, 0),   # strengthDebuff
+    (0, 0, 0, 0, 0)     # manaCost
+)
+
+_compiled = {}
+
+
+class CompiledEffect:
+    """An ability's effects as caster and target delta vectors"""
+    __slots__ = ('self_delta', 'target_delta', 'base_damage', 'mana_cost')
+
+    def __init__(self, self_delta, target_delta, base_damage, mana_cost):
+        self.self_delta = self_delta
+        self.target_delta = target_delta
+        self.base_damage = base_damage
+        self.mana_cost = mana_cost
+
+
+def _project(effects, matrix):
+    return tuple(sum(effects[row] * matrix[row][col] for row in range(len(effects))) for col in range(len(STAT_ORDER)))
+
+
+def compile_effects(effects):
+    """Compile an effect vector (EFFECT_KEYS order); identical vectors share one result"""
+    compiled = _compiled.get(effects)
+    if compiled is None:
+        compiled = _compiled[effects] = CompiledEffect(
+            _project(effects, SELF_MATRIX),
+            _project(effects, TARGET_MATRIX),
+            effects[_E['baseDamage']],
+            effects[_E['manaCost']]
+        )
+    return compiled
+
+
+def compile_ability(ability):
+    """Compile an Ability record or ability dictionary"""
+    effects = getattr(ability, 'effects', None)
+    if effects is None:
+        effects = tuple(ability[key] for key in EFFECT_KEYS)
+    return compile_effects(effects)
+
+
+def hit_damage(base_damage, strength, defense, roll):
+    """Damage of one hit: (base + strength - defense / 2) scaled by a percentage roll, at least 1"""
+    return max(1, (base_damage + strength - defense // 2) * roll // 100)
+
+
+class EffectTable:
+    """Compiled effects of many abilities as arrays for the batch kernel"""
+
+    def __init__(self, abilities):
+        if numpy is None:
+            raise ImportError("The batch effect kernel requires NumPy")
+        compiled = [compile_ability(ability) for ability in abilities]
+        self.self_deltas = numpy.array([effect.self_delta for effect in compiled], dtype=numpy.int64).reshape(-1, len(STAT_ORDER))
+        self.target_deltas = numpy.array([effect.target_delta for effect in compiled], dtype=numpy.int64).reshape(-1, len(STAT_ORDER))
+        self.base_damage = numpy.array([effect.base_damage for effect in compiled], dtype=numpy.int64)
+
+
+def apply_effects_batch(table, ability_indices, casters, caster_max_hp, targets, rolls):
+    """Apply one ability per row to (N, 5) caster and target stat arrays in place
+
+    Produces exactly the same stats as CombatState.apply_effect row by row.
+    """
+    self_deltas = table.self_deltas[ability_indices]
+    target_deltas = table.target_deltas[ability_indices]
+    base_damage = table.base_damage[ability_indices]
+
+    damage = numpy.maximum(1, (base_damage + casters[:, STRENGTH] - targets[:, DEFENSE] // 2) * rolls // 100)
+    damage = numpy.where(base_damage != 0, damage, 0)
+
+    casters[:, HP] = numpy.minimum(caster_max_hp, casters[:, HP] + self_deltas[:, HP])
+    casters[:, MP] += self_deltas[:, MP]
+    casters[:, STRENGTH] = numpy.maximum(0, casters[:, STRENGTH] + self_deltas[:, STRENGTH])
+    casters[:, DEFENSE] = numpy.maximum(0, casters[:, DEFENSE] + self_deltas[:, DEFENSE])
+
+    targets[:, HP] = numpy.maximum(0, targets[:, HP] - damage)
+    targets[:, STRENGTH] = numpy.maximum(0, targets[:, STRENGTH] + target_deltas[:, STRENGTH])
+    targets[:, DEFENSE] = numpy.maximum(0, targets[:, DEFENSE] + target_deltas[:, DEFENSE])
+
+    caster_speed = self_deltas[:, SPEED] != 0
+    casters[:, SPEED] = numpy.where(caster_speed, numpy.maximum(1, casters[:, SPEED] + self_deltas[:, SPEED]), casters[:, SPEED])
+    target_speed = (target_deltas[:, SPEED] != 0) & (targets[:, HP] > 0)
+    targets[:, SPEED] = numpy.where(target_speed, numpy.maximum(1, targets[:, SPEED] + target_deltas[:, SPEED]), targets[:, SPEED])
+    return caster_speed, target_speed
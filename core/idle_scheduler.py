@@ -0,0 +1,160 @@
+# idle_scheduler.py
+# Cooperative scheduler for game maintenance: jobs are generators advanced a
+# step at a time within short time slices, and wait while the user reviews.
+import heapq
+import itertools
+import time
+
+from ..data import config
+
+# Job priorities; lower runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Anki main window states during which the user is answering cards
+BUSY_STATES = ('review',)
+
+
+class _Job:
+    __slots__ = ('name', 'priority', 'order', 'steps', 'cancelled')
+
+    def __init__(self, name, priority, order, steps):
+        self.name = name
+        self.priority = priority
+        self.order = order
+        self.steps = steps
+        self.cancelled = False
+
+
+def _single_step(func):
+    # A plain callable is one step; only for work that is always short
+    func()
+    yield
+
+
+def run_steps(steps):
+    """Run a job's steps to the end at once, e.g. when a profile closes
+
+    Returns:
+        The generator's return value
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+class IdleScheduler:
+    """Priority queue of generator jobs run in time-boxed slices
+
+    Each job is a generator; every next() is one step and should take well
+    under a slice. Jobs are keyed by name, so submitting a name that is
+    already queued replaces it (useful for "save soon" style work).
+
+    While the user is reviewing, only PRIORITY_HIGH jobs run. Everything else
+    waits until the review screen is left, or until there has been no review
+    activity for IDLE_REVIEW_PAUSE_MS.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.heap = []
+        self.jobs = {}
+        self.order = itertools.count()
+        self.state = None
+        self.last_activity = None
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def submit(self, name, job, priority=PRIORITY_NORMAL):
+        """Queue a job, replacing a queued job of the same name
+
+        Args:
+            name (str): Identifies the job
+            job: A generator, or a callable run as a single unsliced step
+            priority (int): PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        self.cancel(name)
+        steps = job if hasattr(job, '__next__') else _single_step(job)
+        entry = _Job(name, priority, next(self.order), steps)
+        self.jobs[name] = entry
+        heapq.heappush(self.heap, (priority, entry.order, entry))
+
+    def cancel(self, name):
+        """Drop a queued job; returns True if there was one"""
+        entry = self.jobs.pop(name, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+        try:
+            entry.steps.close()
+        except ValueError:
+            # A job replacing itself is still executing; it is dropped after this step
+            pass
+        return True
+
+    def set_state(self, state):
+        """Record the main window state (Anki's state_did_change hook)"""
+        self.state = state
+        self.last_activity = self.clock()
+
+    def note_activity(self):
+        """Record review activity (question/answer shown, card answered)"""
+        self.last_activity = self.clock()
+
+    def allowed_priority(self):
+        """Get the least urgent priority allowed to run right now"""
+        if self.state not in BUSY_STATES:
+            return PRIORITY_LOW
+        if self.last_activity is not None and (self.clock() - self.last_activity) * 1000 >= config.IDLE_REVIEW_PAUSE_MS:
+            return PRIORITY_LOW
+        return PRIORITY_HIGH
+
+    def has_runnable(self):
+        """Return True if some queued job may run now"""
+        self._drop_cancelled()
+        return bool(self.heap) and self.heap[0][0] <= self.allowed_priority()
+
+    def _finish(self, entry):
+        entry.cancelled = True
+        if self.jobs.get(entry.name) is entry:
+            del self.jobs[entry.name]
+
+    def _drop_cancelled(self):
+        while self.heap and self.heap[0][2].cancelled:
+            heapq.heappop(self.heap)
+
+    def run_slice(self, budget_ms=None):
+        """Advance runnable jobs, most urgent first, until the budget is spent
+
+        Args:
+            budget_ms (float): Slice length, IDLE_SLICE_MS by default
+
+        Returns:
+            int: Number of steps taken
+        """
+        if budget_ms is None:
+            budget_ms = config.IDLE_SLICE_MS
+        deadline = self.clock() + budget_ms / 1000
+        allowed = self.allowed_priority()
+        steps = 0
+        while True:
+            self._drop_cancelled()
+            if not self.heap or self.heap[0][0] > allowed:
+                break
+            entry = self.heap[0][2]
+            try:
+                next(entry.steps)
+            except StopIteration:
+                self._finish(entry)
+            except Exception:
+                # A failing job must not wedge the queue
+                self._finish(entry)
+                raise
+            steps += 1
+            if self.clock() >= deadline:
+                break
+        return steps
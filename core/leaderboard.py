@@ -0,0 +1,236 @@
+# leaderboard.py
+# Incrementally maintained leaderboards per metric and per rank.
+import heapq
+from bisect import bisect_left, insort
+from itertools import islice
+
+from .idle_scheduler import run_steps
+from .leveling import RANKS, total_xp
+
+# Board key for the roster-wide board of a metric
+ALL_RANKS = None
+# Target size of each chunk of a board
+CHUNK_SIZE = 512
+# Characters scored, and board entries merged, per step of a sliced rebuild
+REBUILD_CHUNK_SIZE = 200
+REBUILD_MERGE_SIZE = 2000
+
+# metric -> (display name, score function); higher scores rank first
+METRICS = {
+    'level': ("Level", lambda character: character.level),
+    'xp': ("Total XP", lambda character: total_xp(character.level, character.current_xp)),
+    'success_rate': ("Dungeon Success Rate", lambda character: character.get_success_rate())
+}
+
+
+class _SortedList:
+    """Sorted list stored as chunks so inserts and removals move at most a chunk"""
+    __slots__ = ('chunks', 'maxes', 'size')
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.chunks = []
+        self.maxes = []
+        self.size = 0
+
+    def reset(self, items):
+        """Replace the contents with already sorted items"""
+        self.chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+        self.size = len(items)
+
+    def add(self, item):
+        self.size += 1
+        if not self.chunks:
+            self.chunks.append([item])
+            self.maxes.append(item)
+            return
+
+        index = bisect_left(self.maxes, item)
+        if index == len(self.maxes):
+            index -= 1
+            self.chunks[index].append(item)
+            self.maxes[index] = item
+        else:
+            insort(self.chunks[index], item)
+
+        chunk = self.chunks[index]
+        if len(chunk) > 2 * CHUNK_SIZE:
+            self.chunks[index:index + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            self.maxes[index:index + 1] = [chunk[CHUNK_SIZE - 1], chunk[-1]]
+
+    def remove(self, item):
+        """Remove an item if present"""
+        index = bisect_left(self.maxes, item)
+        if index == len(self.maxes):
+            return
+        chunk = self.chunks[index]
+        position = bisect_left(chunk, item)
+        if position == len(chunk) or chunk[position] != item:
+            return
+
+        del chunk[position]
+        self.size -= 1
+        if not chunk:
+            del self.chunks[index]
+            del self.maxes[index]
+        elif position == len(chunk):
+            self.maxes[index] = chunk[-1]
+
+    def index(self, item):
+        """Get the position of an item that is present"""
+        index = bisect_left(self.maxes, item)
+        return sum(len(chunk) for chunk in self.chunks[:index]) + bisect_left(self.chunks[index], item)
+
+    def head(self, count):
+        """Get the first count items"""
+        items = []
+        for chunk in self.chunks:
+            if len(items) >= count:
+                break
+            items.extend(chunk[:count - len(items)])
+        return items
+
+
+class Leaderboard:
+    """Sorted boards per (metric, rank) kept up to date one character at a time
+
+    Each board holds (-score, name) entries in a chunked sorted list, so an
+    update is a binary search plus an insert/remove within one chunk and
+    reading the top K entries touches only the first chunks. Names identify
+    characters, matching the registry.
+    """
+
+    def __init__(self, characters=(), schedule=None):
+        """Create boards for a roster
+
+        Args:
+            schedule (callable): schedule(name, steps) queues a generator job,
+                used to rebuild in slices when the whole roster is replaced;
+                without it the rebuild runs at once
+        """
+        self.boards = {(metric, rank): _SortedList() for metric in METRICS for rank in RANKS + (ALL_RANKS,)}
+        # name -> {metric: (board entry, rank)} for O(log n) removal
+        self.entries = {}
+        self.schedule = schedule
+        # name -> character (None once removed) changed during a sliced rebuild
+        self.changed_during_rebuild = None
+        self.rebuild(characters)
+
+    def rebuild(self, characters):
+        """Rebuild every board from a full roster"""
+        run_steps(self.rebuild_steps(characters))
+
+    def rebuild_steps(self, characters):
+        """Generator rebuilding every board from a full roster a chunk per step
+
+        Each chunk of characters is scored into sorted runs, which are then
+        merged REBUILD_MERGE_SIZE entries per step. The current boards keep
+        answering until the new ones replace them; characters updated or
+        removed in the meantime are applied again afterwards.
+        """
+        changed = self.changed_during_rebuild = {}
+        try:
+            entries = {}
+            runs = {key: [] for key in self.boards}
+            for start in range(0, len(characters), REBUILD_CHUNK_SIZE):
+                grouped = {}
+                for character in characters[start:start + REBUILD_CHUNK_SIZE]:
+                    character_entries = {}
+                    for metric, (_, score) in METRICS.items():
+                        entry = (-score(character), character.name)
+                        character_entries[metric] = (entry, character.rank)
+                        grouped.setdefault((metric, character.rank), []).append(entry)
+                        grouped.setdefault((metric, ALL_RANKS), []).append(entry)
+                    entries[character.name] = character_entries
+                for key, run in grouped.items():
+                    if key in runs:
+                        run.sort()
+                        runs[key].append(run)
+                yield
+
+            boards = {}
+            for key, key_runs in runs.items():
+                merged = heapq.merge(*key_runs)
+                items = []
+                while True:
+                    batch = list(islice(merged, REBUILD_MERGE_SIZE))
+                    items.extend(batch)
+                    if len(batch) < REBUILD_MERGE_SIZE:
+                        break
+                    yield
+                boards[key] = _SortedList()
+                boards[key].reset(items)
+
+            self.boards = boards
+            self.entries = entries
+        finally:
+            if self.changed_during_rebuild is changed:
+                self.changed_during_rebuild = None
+        for name, character in changed.items():
+            if character is None:
+                self.remove(name)
+            else:
+                self.update(character)
+
+    def _remove_entry(self, metric, entry, rank):
+        for key in ((metric, rank), (metric, ALL_RANKS)):
+            board = self.boards.get(key)
+            if board is not None:
+                board.remove(entry)
+
+    def update(self, character):
+        """Re-score one character after it changed"""
+        if self.changed_during_rebuild is not None:
+            self.changed_during_rebuild[character.name] = character
+        old_entries = self.entries.get(character.name, {})
+        entries = {}
+        for metric, (_, score) in METRICS.items():
+            entry = (-score(character), character.name)
+            old = old_entries.get(metric)
+            if old == (entry, character.rank):
+                entries[metric] = old
+                continue
+            if old is not None:
+                self._remove_entry(metric, *old)
+            for key in ((metric, character.rank), (metric, ALL_RANKS)):
+                if key in self.boards:
+                    self.boards[key].add(entry)
+            entries[metric] = (entry, character.rank)
+        self.entries[character.name] = entries
+
+    def remove(self, name):
+        """Drop a character from every board"""
+        if self.changed_during_rebuild is not None:
+            self.changed_during_rebuild[name] = None
+        for metric, old in self.entries.pop(name, {}).items():
+            self._remove_entry(metric, *old)
+
+    def top(self, metric, count, rank=ALL_RANKS):
+        """Get the best (name, score) pairs of a board"""
+        return [(name, -negative_score) for negative_score, name in self.boards[(metric, rank)].head(count)]
+
+    def position(self, metric, name, rank=ALL_RANKS):
+        """Get a character's 1-based position on a board, or None if absent"""
+        old = self.entries.get(name, {}).get(metric)
+        if old is None:
+            return None
+        entry, character_rank = old
+        if rank is not ALL_RANKS and rank != character_rank:
+            return None
+        return self.boards[(metric, rank)].index(entry) + 1
+
+    def on_roster_changed(self, registry, character):
+        """Registry listener: update one character, or rebuild when the roster was replaced"""
+        if character is None:
+            if self.schedule is None:
+                self.rebuild(registry.characters)
+            else:
+                self.schedule("rebuild_leaderboard", self.rebuild_steps(list(registry.characters)))
+        else:
+            self.update(character)
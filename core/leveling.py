@@ -0,0 +1,57 @@
+# leveling.py
+# Experience curve and rank thresholds from gameWiki.txt.
+import math
+from bisect import bisect_right
+
+MAX_LEVEL = 99
+RANKS = ('F', 'E', 'D', 'C', 'B', 'A', 'S')
+# Lowest level of each rank
+RANK_MIN_LEVELS = (1, 5, 10, 20, 40, 60, 90)
+
+# XP needed for level x is ceil(99th root of 999990 ^ x + 10); the rounding
+# drops float noise so level 99 lands exactly on 1,000,000
+_XP_BASE = 999990 ** (1 / MAX_LEVEL)
+XP_TABLE = (0,) + tuple(math.ceil(round(_XP_BASE ** level + 10, 6)) for level in range(1, MAX_LEVEL + 1))
+
+# Total XP earned on reaching each level
+CUMULATIVE_XP_TABLE = tuple(sum(XP_TABLE[1:level]) for level in range(MAX_LEVEL + 1))
+
+def xp_for_level(level):
+    """Get the XP needed to complete a level"""
+    return XP_TABLE[max(1, min(level, MAX_LEVEL))]
+
+def total_xp(level, current_xp):
+    """Get all XP a character has earned from level 1"""
+    return CUMULATIVE_XP_TABLE[max(1, min(level, MAX_LEVEL))] + current_xp
+
+def level_for_total_xp(xp):
+    """Split all XP earned from level 1 into (level, current XP)"""
+    level = max(1, min(bisect_right(CUMULATIVE_XP_TABLE, xp) - 1, MAX_LEVEL))
+    return level, xp - CUMULATIVE_XP_TABLE[level]
+
+def rank_for_level(level):
+    """Get the rank letter for a level"""
+    rank = RANKS[0]
+    for rank_name, min_level in zip(RANKS, RANK_MIN_LEVELS):
+        if level >= min_level:
+            rank = rank_name
+    return rank
+
+def rank_level_range(rank):
+    """Get the (lowest, highest) level of a rank"""
+    index = RANKS.index(rank)
+    high = RANK_MIN_LEVELS[index + 1] - 1 if index + 1 < len(RANKS) else MAX_LEVEL
+    return RANK_MIN_LEVELS[index], high
+
+def apply_xp(level, current_xp, gained_xp):
+    """Add XP and roll over completed levels
+
+    Returns:
+        tuple: (new level, remaining XP, levels gained)
+    """
+    current_xp += gained_xp
+    start_level = level
+    while level < MAX_LEVEL and current_xp >= xp_for_level(level):
+        current_xp -= xp_for_level(level)
+        level += 1
+    return level, current_xp, level - start_level
@@ -0,0 +1,134 @@
+# localization.py
+# Per-locale string tables for data pack text. Packs are parsed once in their
+# source language; displayed names and descriptions are looked up by their
+# source text, so switching language only loads one small table.
+import hashlib
+import json
+import os
+import sys
+
+from ..data import config
+from . import perf
+from .data_loader import resolve_path
+
+# Locale whose strings are the data pack text itself
+SOURCE_LOCALE = "en"
+
+
+class StringTable:
+    """Translations of one locale, indexed by source text
+
+    Text without a translation is shown as is.
+    """
+
+    def __init__(self, locale, strings, fingerprint=""):
+        """Create a table
+
+        Args:
+            locale (str): Locale code, e.g. "de"
+            strings (dict): Source text to translated text
+            fingerprint (str): Hash of the table contents, for cache keys
+        """
+        self.locale = locale
+        self.strings = strings
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.strings)
+
+    def get(self, text):
+        """Get the translation of a source string"""
+        return self.strings.get(text, text)
+
+    def cache_key(self):
+        """Identify the table in render cache keys"""
+        return f"{self.locale}:{self.fingerprint}"
+
+
+def locale_path(locale):
+    return os.path.join(config.LOCALES_PATH, f"{locale}.json")
+
+
+def available_locales():
+    """Get the locale codes that have a string table file"""
+    folder = resolve_path(config.LOCALES_PATH)
+    if not os.path.isdir(folder):
+        return [SOURCE_LOCALE]
+    locales = {name[:-5] for name in os.listdir(folder) if name.endswith('.json')}
+    locales.add(SOURCE_LOCALE)
+    return sorted(locales)
+
+
+@perf.timed()
+def read_string_table(locale):
+    """Read a locale's string table file
+
+    The file is a JSON object with a "strings" object mapping source text to
+    its translation. The source locale needs no file.
+
+    Raises:
+        FileNotFoundError: If a locale other than the source one has no file
+        ValueError: If the file is not valid JSON or has no strings object
+    """
+    try:
+        with open(resolve_path(locale_path(locale)), 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        if locale == SOURCE_LOCALE:
+            return StringTable(locale, {})
+        raise
+
+    data = json.loads(raw.decode('utf-8'))
+    strings = data.get('strings') if isinstance(data, dict) else None
+    if not isinstance(strings, dict):
+        raise ValueError(f"{locale_path(locale)} has no strings object")
+    # Pack strings are interned by the loader, so interned keys hash and
+    # compare against them at pointer speed
+    strings = {
+        sys.intern(source): translated
+        for source, translated in strings.items()
+        if isinstance(source, str) and isinstance(translated, str) and translated
+    }
+    return StringTable(locale, strings, hashlib.sha1(raw).hexdigest())
+
+
+# Tables read this session, by requested locale, so switching back is free
+_tables = {}
+_current_locale = None
+
+
+def set_locale(locale):
+    """Make a locale current, reading its table on first use
+
+    Falls back to the source locale when the table cannot be read.
+
+    Returns:
+        StringTable: The table now in use
+    """
+    global _current_locale
+    if locale not in _tables:
+        try:
+            _tables[locale] = read_string_table(locale)
+        except (OSError, ValueError):
+            _tables[locale] = StringTable(SOURCE_LOCALE, {})
+    _current_locale = locale
+    return _tables[locale]
+
+
+def get_strings():
+    """Get the string table of the configured locale"""
+    if _current_locale != config.LOCALE:
+        return set_locale(config.LOCALE)
+    return _tables[_current_locale]
+
+
+def reload():
+    """Forget every read table, e.g. after the locale files changed"""
+    global _current_locale
+    _tables.clear()
+    _current_locale = None
+
+
+def tr(text):
+    """Translate data pack text into the configured locale"""
+    return get_strings().get(text)
@@ -0,0 +1,185 @@
+# memory.py
+# Memory diagnostics: tracemalloc snapshots around data loading and viewer
+# lifetimes, with retained sizes grouped by add-on subsystem.
+# Off unless MEMORY_DIAGNOSTICS_ENABLED; when off track() is a single flag check.
+import os
+import tracemalloc
+
+from .data_loader import ADDON_DIR
+
+# Frames kept per allocation so it can be attributed to add-on code that
+# called into the standard library
+TRACEBACK_FRAMES = 25
+# Add-on folder -> subsystem name; allocations outside them count as 'other'
+SUBSYSTEMS = {
+    'core': 'core',
+    'source': 'viewers',
+    'data': 'data'
+}
+
+_enabled = False
+_records = []
+
+
+class MemoryRecord:
+    """Memory retained across one tracked block"""
+    __slots__ = ('label', 'size', 'count', 'subsystems', 'notes')
+
+    def __init__(self, label, size, count, subsystems):
+        self.label = label
+        self.size = size
+        self.count = count
+        # subsystem -> (bytes, blocks) still allocated after the block
+        self.subsystems = subsystems
+        # Extra measurements attached by the caller, e.g. live dialog counts
+        self.notes = {}
+
+    def to_dict(self):
+        return {
+            'label': self.label,
+            'bytes': self.size,
+            'blocks': self.count,
+            'subsystems': {name: {'bytes': size, 'blocks': count} for name, (size, count) in self.subsystems.items()},
+            'notes': dict(self.notes)
+        }
+
+
+class _NullTrack:
+    """Shared no-op context manager used while diagnostics are disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TRACK = _NullTrack()
+
+
+class _Track:
+    """Context manager snapshotting the heap before and after a block"""
+    __slots__ = ('label', 'before', 'record')
+
+    def __init__(self, label):
+        self.label = label
+        self.before = None
+        self.record = None
+
+    def __enter__(self):
+        self.before = tracemalloc.take_snapshot()
+        # Filled in on exit; callers may attach notes to it afterwards
+        self.record = MemoryRecord(self.label, 0, 0, {})
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        size, count, subsystems = compare(self.before, tracemalloc.take_snapshot())
+        self.record.size = size
+        self.record.count = count
+        self.record.subsystems = subsystems
+        _records.append(self.record)
+        self.before = None
+        return False
+
+
+def is_enabled():
+    """Return True if allocations are being traced"""
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Start or stop tracing allocations"""
+    global _enabled
+    _enabled = bool(enabled)
+    if _enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEBACK_FRAMES)
+    elif not _enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def subsystem_of(traceback):
+    """Get the subsystem of the innermost add-on frame of an allocation"""
+    for frame in reversed(traceback):
+        relative = os.path.relpath(frame.filename, ADDON_DIR)
+        if relative.startswith('..'):
+            continue
+        return SUBSYSTEMS.get(relative.split(os.sep, 1)[0], 'other')
+    return 'other'
+
+
+def compare(before, after):
+    """Get the memory allocated between two snapshots and not yet freed
+
+    Returns:
+        tuple: (bytes, blocks, {subsystem: (bytes, blocks)})
+    """
+    # Our own bookkeeping would otherwise show up in every report
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    before = before.filter_traces(ignore)
+    after = after.filter_traces(ignore)
+
+    size = count = 0
+    subsystems = {}
+    for diff in after.compare_to(before, 'traceback'):
+        if not diff.size_diff and not diff.count_diff:
+            continue
+        name = subsystem_of(diff.traceback)
+        sub_size, sub_count = subsystems.get(name, (0, 0))
+        subsystems[name] = (sub_size + diff.size_diff, sub_count + diff.count_diff)
+        size += diff.size_diff
+        count += diff.count_diff
+    return size, count, dict(sorted(subsystems.items(), key=lambda item: -item[1][0]))
+
+
+def track(label):
+    """Context manager recording the memory a block leaves allocated
+
+    Yields the MemoryRecord (None while disabled) so callers can add notes.
+    """
+    if not _enabled:
+        return _NULL_TRACK
+    return _Track(label)
+
+
+def records():
+    """Get every record taken since the last reset"""
+    return list(_records)
+
+
+def reset():
+    """Forget recorded blocks"""
+    _records.clear()
+
+
+def traced_memory():
+    """Get (current, peak) bytes allocated while tracing, or (0, 0) when off"""
+    if not tracemalloc.is_tracing():
+        return 0, 0
+    return tracemalloc.get_traced_memory()
+
+
+def format_size(size):
+    """Format a signed byte count for display"""
+    sign = '-' if size < 0 else '+'
+    size = abs(size)
+    if size < 1024:
+        return f"{sign}{size} B"
+    if size < 1024 * 1024:
+        return f"{sign}{size / 1024:.1f} KiB"
+    return f"{sign}{size / 1024 / 1024:.1f} MiB"
+
+
+def format_report():
+    """Describe every record as text, largest subsystems first"""
+    current, peak = traced_memory()
+    lines = [f"Traced: {current / 1024 / 1024:.1f} MiB now, {peak / 1024 / 1024:.1f} MiB peak"]
+    for record in _records:
+        lines.append("")
+        lines.append(f"{record.label}: {format_size(record.size)} in {record.count:+d} blocks")
+        for name, (size, count) in record.subsystems.items():
+            lines.append(f"    {name:<10}{format_size(size):>14}{count:>+10d} blocks")
+        for name, value in record.notes.items():
+            lines.append(f"    {name}: {value}")
+    return "\n".join(lines)
+
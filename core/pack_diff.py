@@ -0,0 +1,470 @@
+# pack_diff.py
+# Lint and diff two versions of a data pack: python -m <addon package>.core.pack_diff OLD.json NEW.json
+#
+# Lists added, removed and changed classes, monster families and abilities,
+# and how each class's and monster category's damage, heal and buff budgets
+# and each monster tier's power move. Sections of the packs are split into
+# chunks and diffed in parallel worker processes. Exits with status 1 when
+# the new pack has lint problems.
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .ability import ABILITY_KEYS, EFFECT_KEYS, Ability, intern_object
+from .pack_summary import power_score, scaled_stats, tier_levels
+from .settings import MONSTER_TIERS
+from .stat_allocation import STATS
+
+CLASS_PACK = 'classes'
+MONSTER_PACK = 'monsters'
+# Entries per worker task; large sections are split into several tasks
+CHUNK_SIZE = 2000
+# Changes listed in the text report before it only counts them
+REPORT_LIMIT = 200
+
+BUDGETS = ('damage', 'heal', 'buff', 'debuff', 'mana')
+_BUFF_KEYS = ('speedBuff', 'defenseBuff', 'strengthBuff')
+_DEBUFF_KEYS = ('speedDebuff', 'defenseDebuff', 'strengthDebuff')
+# Buffs may be negative (a self-debuff as the price of an ability) and a
+# negative mana cost restores mana; these may not
+_NON_NEGATIVE_KEYS = ('baseDamage', 'heal') + _DEBUFF_KEYS
+
+# Shared Ability records repeat across a pack, so their budget and lint
+# results are computed once per effect vector
+_effect_budgets = {}
+_effect_problems = {}
+
+
+def _mapping(value):
+    """Get a JSON object field, or an empty one when the pack has something else there"""
+    return value if isinstance(value, dict) else {}
+
+
+def _number(value):
+    """Get a numeric field for budgets and power scores; lint reports any other value"""
+    return value if type(value) in (int, float) else 0
+
+
+def _is_ability(ability):
+    return type(ability) is Ability or isinstance(ability, dict)
+
+
+def _ability_name(ability):
+    name = ability.get('name')
+    return name if isinstance(name, str) else '?'
+
+
+def read_pack(path):
+    """Read a pack file given relative to the working directory"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f, object_hook=intern_object)
+
+
+def pack_kind(data):
+    """Tell a classes.json pack from a monsters.json pack by its shape"""
+    if not isinstance(data, dict) or not data:
+        raise ValueError("A data pack must be a non-empty JSON object")
+    sections = list(data.values())
+    if all(isinstance(section, list) for section in sections):
+        return MONSTER_PACK
+    if all(isinstance(section, dict) for section in sections):
+        return CLASS_PACK
+    raise ValueError("Not a classes.json or monsters.json data pack")
+
+
+def section_entries(kind, section):
+    """Key a section's entries by a stable identity
+
+    Classes are keyed by stat; monster families by base name, since list
+    positions shift whenever a family is inserted.
+    """
+    if kind == CLASS_PACK:
+        return dict(section)
+    entries = {}
+    for family in section:
+        name = _mapping(family).get('name')
+        name = _mapping(name).get('base')
+        if not isinstance(name, str):
+            name = '?'
+        key = name
+        copy = 1
+        while key in entries:
+            copy += 1
+            key = f"{name}#{copy}"
+        entries[key] = family
+    return entries
+
+
+def entry_abilities(kind, entry):
+    """Key an entry's abilities: class abilities by slot, monster abilities by name"""
+    abilities = entry.get('abilities')
+    if kind == CLASS_PACK:
+        return {slot: ability for slot, ability in _mapping(abilities).items() if _is_ability(ability)}
+    keyed = {}
+    if isinstance(abilities, list):
+        for ability in abilities:
+            if _is_ability(ability):
+                keyed.setdefault(_ability_name(ability), ability)
+    return keyed
+
+
+def _budget(ability):
+    return (
+        _number(ability.get('baseDamage', 0)),
+        _number(ability.get('heal', 0)),
+        sum(_number(ability.get(key, 0)) for key in _BUFF_KEYS),
+        sum(_number(ability.get(key, 0)) for key in _DEBUFF_KEYS),
+        _number(ability.get('manaCost', 0))
+    )
+
+
+def ability_budget(ability):
+    """Get one ability's damage, heal, buff, debuff and mana cost, in BUDGETS order"""
+    if type(ability) is not Ability:
+        return _budget(ability)
+    budget = _effect_budgets.get(ability.effects)
+    if budget is None:
+        budget = _effect_budgets[ability.effects] = _budget(ability)
+    return budget
+
+
+def effect_budget(abilities):
+    """Sum ability_budget() over abilities"""
+    totals = [0] * len(BUDGETS)
+    for ability in abilities:
+        for i, value in enumerate(ability_budget(ability)):
+            totals[i] += value
+    return totals
+
+
+def _effect_lint(ability):
+    problems = []
+    for key in EFFECT_KEYS:
+        value = ability.get(key, 0)
+        if type(value) is not int:
+            problems.append(f"{key} is not an integer")
+        elif value < 0 and key in _NON_NEGATIVE_KEYS:
+            problems.append(f"{key} is negative")
+    return tuple(problems)
+
+
+def lint_ability(ability, where):
+    """Get the problems of one ability"""
+    if type(ability) is Ability:
+        # Records are only built from dictionaries with every ability key
+        problems = _effect_problems.get(ability.effects)
+        if problems is None:
+            problems = _effect_problems[ability.effects] = _effect_lint(ability)
+        return [f"{where}: {problem}" for problem in problems]
+    if not isinstance(ability, dict):
+        return [f"{where}: not an object"]
+    problems = []
+    for key in ('name', 'description'):
+        if key in ability and not isinstance(ability[key], str):
+            problems.append(f"{where}: {key} is not text")
+    missing = [key for key in ABILITY_KEYS if key not in ability]
+    if missing:
+        problems.append(f"{where}: missing {', '.join(missing)}")
+    problems.extend(f"{where}: {problem}" for problem in _effect_lint(ability))
+    return problems
+
+
+def lint_entry(kind, where, entry):
+    """Get the problems of one class or monster family"""
+    if not isinstance(entry, dict):
+        return [f"{where}: not an object"]
+    problems = []
+    abilities = entry.get('abilities')
+    if kind == CLASS_PACK:
+        if not entry.get('class') or not isinstance(entry['class'], str):
+            problems.append(f"{where}: missing class name")
+        if not isinstance(abilities, dict) or not abilities:
+            return problems + [f"{where}: no abilities"]
+        items = abilities.items()
+    else:
+        names = _mapping(entry.get('name'))
+        missing = [tier for tier in ('base',) + MONSTER_TIERS if not names.get(tier) or not isinstance(names[tier], str)]
+        if missing:
+            problems.append(f"{where}: missing names for {', '.join(missing)}")
+        stats = entry.get('stats')
+        if not isinstance(stats, dict):
+            problems.append(f"{where}: stats is not an object")
+        else:
+            missing = [stat for stat in STATS if stat not in stats]
+            if missing:
+                problems.append(f"{where}: missing stats {', '.join(missing)}")
+            invalid = [stat for stat in STATS if stat in stats and type(stats[stat]) not in (int, float)]
+            if invalid:
+                problems.append(f"{where}: stats {', '.join(invalid)} are not numbers")
+        if not isinstance(abilities, list) or not abilities:
+            return problems + [f"{where}: no abilities"]
+        seen = set()
+        for ability in abilities:
+            if not _is_ability(ability):
+                continue
+            name = _ability_name(ability)
+            if name in seen:
+                problems.append(f"{where}: duplicate ability {name}")
+            seen.add(name)
+        items = ((_ability_name(ability) if _is_ability(ability) else '?', ability) for ability in abilities)
+    for key, ability in items:
+        problems.extend(lint_ability(ability, f"{where}/{key}"))
+    return problems
+
+
+def diff_fields(old, new, keys):
+    """Get 'key old -> new' for every differing key"""
+    return [f"{key} {old.get(key)} -> {new.get(key)}" for key in keys if old.get(key) != new.get(key)]
+
+
+def diff_entry(kind, old, new):
+    """Describe how one class or monster family changed
+
+    Returns:
+        list: Change descriptions, empty if the entries are equal
+    """
+    if old == new:
+        return []
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return ["replaced"]
+    changes = []
+    if kind == CLASS_PACK:
+        changes.extend(diff_fields(old, new, ('class',)))
+    else:
+        old_names, new_names = _mapping(old.get('name')), _mapping(new.get('name'))
+        changes.extend(f"name.{change}" for change in diff_fields(old_names, new_names, MONSTER_TIERS))
+        old_stats, new_stats = _mapping(old.get('stats')), _mapping(new.get('stats'))
+        changes.extend(f"stats.{change}" for change in diff_fields(old_stats, new_stats, STATS))
+        changes.extend(diff_fields(old, new, ('spawnWeight',)))
+
+    old_abilities = entry_abilities(kind, old)
+    new_abilities = entry_abilities(kind, new)
+    for key, ability in new_abilities.items():
+        previous = old_abilities.get(key)
+        if previous is None:
+            changes.append(f"+{key}")
+        elif previous != ability:
+            changes.append(f"~{key} ({'; '.join(diff_fields(previous, ability, ABILITY_KEYS))})")
+    changes.extend(f"-{key}" for key in old_abilities if key not in new_abilities)
+    return changes
+
+
+def diff_chunk(task):
+    """Diff one chunk of a section; runs in a worker process
+
+    Returns:
+        tuple: (changes as (kind of change, section, key, details),
+            lint problems of the new entries,
+            {(group, side): budget list}, {(tier, side): [power sum, families]})
+    """
+    kind, section, keys, old_entries, new_entries, levels = task
+    changes = []
+    problems = []
+    budgets = {}
+    powers = {}
+    for key in keys:
+        old = old_entries.get(key)
+        new = new_entries.get(key)
+        details = []
+        if old is None:
+            changes.append(('added', section, key, details))
+        elif new is None:
+            changes.append(('removed', section, key, details))
+        else:
+            details = diff_entry(kind, old, new)
+            if details:
+                changes.append(('changed', section, key, details))
+        if new is not None:
+            problems.extend(lint_entry(kind, f"{section}/{key}", new))
+
+        # An unchanged entry is summarised once and counted on both sides
+        if old is not None and new is not None and not details:
+            sides = ((('old', 'new'), new),)
+        else:
+            sides = ((('old',), old), (('new',), new))
+        group = f"{section}/{key}" if kind == CLASS_PACK else section
+        for side_names, entry in sides:
+            if not isinstance(entry, dict):
+                continue
+            abilities = list(entry_abilities(kind, entry).values())
+            budget = effect_budget(abilities)
+            tier_powers = {}
+            stats = entry.get('stats')
+            # Families with malformed stats are left out of the tier power means
+            if kind == MONSTER_PACK and isinstance(stats, dict) and all(type(stats.get(stat, 0)) in (int, float) for stat in STATS):
+                hitting = [ability for ability in abilities if type(ability.get('baseDamage')) in (int, float)]
+                tier_powers = {tier: power_score(scaled_stats(stats, level), hitting) for tier, level in levels.items()}
+            for side in side_names:
+                totals = budgets.setdefault((group, side), [0] * len(BUDGETS))
+                for i, value in enumerate(budget):
+                    totals[i] += value
+                for tier, score in tier_powers.items():
+                    power = powers.setdefault((tier, side), [0.0, 0])
+                    power[0] += score
+                    power[1] += 1
+    return changes, problems, budgets, powers
+
+
+def chunk_tasks(kind, old_data, new_data, chunk_size=CHUNK_SIZE):
+    """Split both packs into (kind, section, keys, old, new, tier levels) tasks"""
+    levels = {tier: level for tier, level in tier_levels().items() if level is not None}
+    tasks = []
+    for section in list(old_data) + [section for section in new_data if section not in old_data]:
+        old_entries = section_entries(kind, old_data.get(section, {} if kind == CLASS_PACK else []))
+        new_entries = section_entries(kind, new_data.get(section, {} if kind == CLASS_PACK else []))
+        keys = list(old_entries) + [key for key in new_entries if key not in old_entries]
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            tasks.append((
+                kind, section, chunk,
+                {key: old_entries[key] for key in chunk if key in old_entries},
+                {key: new_entries[key] for key in chunk if key in new_entries},
+                levels
+            ))
+    return tasks
+
+
+class PackDiff:
+    """Merged result of every chunk of a pack diff"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.changes = []
+        self.problems = []
+        # (group, 'old' or 'new') -> BUDGETS totals
+        self.budgets = {}
+        # (tier, 'old' or 'new') -> [power sum, families]
+        self.powers = {}
+
+    def add(self, result):
+        changes, problems, budgets, powers = result
+        self.changes.extend(changes)
+        self.problems.extend(problems)
+        for key, totals in budgets.items():
+            merged = self.budgets.setdefault(key, [0] * len(BUDGETS))
+            for i, value in enumerate(totals):
+                merged[i] += value
+        for key, (power, count) in powers.items():
+            merged = self.powers.setdefault(key, [0.0, 0])
+            merged[0] += power
+            merged[1] += count
+
+    def budget_deltas(self):
+        """Get (group, old totals, new totals) for groups whose budget moved"""
+        groups = list(dict.fromkeys(group for group, _ in self.budgets))
+        deltas = []
+        for group in groups:
+            old = self.budgets.get((group, 'old'), [0] * len(BUDGETS))
+            new = self.budgets.get((group, 'new'), [0] * len(BUDGETS))
+            if old != new:
+                deltas.append((group, old, new))
+        return deltas
+
+    def tier_deltas(self):
+        """Get (tier, old mean power, new mean power) per monster tier"""
+        deltas = []
+        for tier in MONSTER_TIERS:
+            old_power, old_count = self.powers.get((tier, 'old'), (0.0, 0))
+            new_power, new_count = self.powers.get((tier, 'new'), (0.0, 0))
+            if old_count or new_count:
+                deltas.append((tier, old_power / old_count if old_count else 0.0, new_power / new_count if new_count else 0.0))
+        return deltas
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'changes': [{'change': change, 'section': section, 'key': key, 'details': details} for change, section, key, details in self.changes],
+            'budgets': [{'group': group, 'old': dict(zip(BUDGETS, old)), 'new': dict(zip(BUDGETS, new))} for group, old, new in self.budget_deltas()],
+            'tiers': [{'tier': tier, 'old': round(old, 1), 'new': round(new, 1)} for tier, old, new in self.tier_deltas()],
+            'problems': self.problems
+        }
+
+
+def diff_packs(old_data, new_data, workers=None, chunk_size=CHUNK_SIZE):
+    """Diff two versions of a pack, in parallel across processes
+
+    Returns:
+        PackDiff: The merged result
+    """
+    kind = pack_kind(old_data)
+    if pack_kind(new_data) != kind:
+        raise ValueError("Cannot diff a classes pack against a monsters pack")
+    tasks = chunk_tasks(kind, old_data, new_data, chunk_size)
+    result = PackDiff(kind)
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            result.add(diff_chunk(task))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_result in executor.map(diff_chunk, tasks):
+            result.add(chunk_result)
+    return result
+
+
+def format_report(diff, limit=REPORT_LIMIT):
+    """Describe a diff as text"""
+    symbols = {'added': '+', 'removed': '-', 'changed': '~'}
+    counts = {change: 0 for change in symbols}
+    for change, _, _, _ in diff.changes:
+        counts[change] += 1
+
+    lines = [f"{diff.kind}: {counts['added']} added, {counts['removed']} removed, {counts['changed']} changed"]
+    for change, section, key, details in diff.changes[:limit]:
+        line = f"  {symbols[change]} {section}/{key}"
+        if details:
+            line += ": " + ", ".join(details)
+        lines.append(line)
+    if len(diff.changes) > limit:
+        lines.append(f"  ... {len(diff.changes) - limit} more")
+
+    budget_deltas = diff.budget_deltas()
+    if budget_deltas:
+        lines.append("")
+        lines.append(f"{'budget':<32}" + "".join(f"{name:>20}" for name in BUDGETS))
+        for group, old, new in budget_deltas:
+            lines.append(f"{group:<32}" + "".join(f"{f'{a} -> {b}':>20}" for a, b in zip(old, new)))
+
+    tier_deltas = diff.tier_deltas()
+    if tier_deltas and any(old != new for _, old, new in tier_deltas):
+        lines.append("")
+        lines.append(f"{'tier':<10}{'mean power':>24}")
+        for tier, old, new in tier_deltas:
+            lines.append(f"{tier:<10}{f'{old:.1f} -> {new:.1f}':>24}{new - old:>+10.1f}")
+
+    lines.append("")
+    if diff.problems:
+        lines.append(f"{len(diff.problems)} lint problems in the new pack:")
+        lines.extend(f"  {problem}" for problem in diff.problems[:limit])
+        if len(diff.problems) > limit:
+            lines.append(f"  ... {len(diff.problems) - limit} more")
+    else:
+        lines.append("No lint problems in the new pack")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lint and diff two versions of an Anki Leveling data pack")
+    parser.add_argument('old', help="old classes.json or monsters.json")
+    parser.add_argument('new', help="new version of the same pack")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="entries per worker task")
+    parser.add_argument('--limit', type=int, default=REPORT_LIMIT, help="changes and problems listed in the report")
+    parser.add_argument('--json', action='store_true', help="print the diff as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    diff = diff_packs(read_pack(args.old), read_pack(args.new), args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(diff.to_dict(), indent=2))
+    else:
+        print(format_report(diff, args.limit))
+        print(f"\nDiffed in {elapsed:.2f} s")
+    if diff.problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
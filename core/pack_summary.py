@@ -0,0 +1,195 @@
+# pack_summary.py
+# Per-class ability totals and per-monster tier power scores, computed once
+# per data-pack hash and cached on disk.
+import json
+import os
+
+from ..data import config
+from .ability import EFFECT_KEYS
+from .combat_replay import compute_pack_hash
+from .dungeon import monster_base_stat_total
+from .leveling import RANKS, rank_level_range
+from .settings import MONSTER_TIERS
+from .stat_allocation import STATS, STAT_POINT_VALUES
+
+# Bump when a formula below changes so stale cache files are ignored
+SUMMARY_VERSION = 2
+# Hit size the defense part of a power score is measured against
+REFERENCE_HIT = 40
+
+_UTILITY_KEYS = tuple(key for key in EFFECT_KEYS if key not in ('baseDamage', 'heal', 'manaCost'))
+
+
+def ability_totals(abilities):
+    """Sum what a set of abilities does
+
+    Returns:
+        dict: abilities, damage, heal, utility (absolute buff/debuff points) and mana
+    """
+    totals = {'abilities': 0, 'damage': 0, 'heal': 0, 'utility': 0, 'mana': 0}
+    for ability in abilities:
+        totals['abilities'] += 1
+        totals['damage'] += ability['baseDamage']
+        totals['heal'] += ability['heal']
+        totals['utility'] += sum(abs(ability[key]) for key in _UTILITY_KEYS)
+        totals['mana'] += ability['manaCost']
+    return totals
+
+
+def tier_levels(tier_weights=None):
+    """Get the expected level each monster tier spawns at
+
+    Each rank's mid level is weighted by how often the tier spawns there.
+    """
+    tier_weights = tier_weights or config.MONSTER_TIER_SPAWN_WEIGHTS
+    levels = {}
+    for i, tier in enumerate(MONSTER_TIERS):
+        weighted = total = 0
+        for rank in RANKS:
+            weights = tier_weights.get(rank, ())
+            weight = weights[i] if i < len(weights) else 0
+            low, high = rank_level_range(rank)
+            weighted += weight * (low + high) / 2
+            total += weight
+        levels[tier] = round(weighted / total) if total else None
+    return levels
+
+
+def scaled_stats(stats, level):
+    """Spread a level's base stat total over a monster's stat distribution
+
+    Returns:
+        dict: Stat name -> value, in the monster's proportions
+    """
+    points = [stats.get(stat, 0) / value for stat, value in zip(STATS, STAT_POINT_VALUES)]
+    total_points = sum(points) or 1
+    budget = monster_base_stat_total(level)
+    return {
+        stat: max(1, round(budget * point / total_points * value))
+        for stat, point, value in zip(STATS, points, STAT_POINT_VALUES)
+    }
+
+
+def power_score(stats, abilities):
+    """Rank a stat block by durability times damage output
+
+    A heuristic for sorting and comparison: sqrt(effective HP x damage rate),
+    where defense stretches HP against a REFERENCE_HIT sized hit and the damage
+    rate is the mean damaging hit times speed.
+    """
+    hits = [ability['baseDamage'] + stats['Strength'] for ability in abilities if ability['baseDamage']]
+    damage_rate = (sum(hits) / len(hits) if hits else 0) * stats['Speed']
+    effective_hp = stats['HP'] * REFERENCE_HIT / max(1, REFERENCE_HIT - stats['Defense'] // 2)
+    return round((effective_hp * damage_rate) ** 0.5, 1)
+
+
+def focus_stat(stats):
+    """Get the stat with the most allocated points"""
+    return max(STATS, key=lambda stat: stats.get(stat, 0) / STAT_POINT_VALUES[STATS.index(stat)])
+
+
+class PackSummary:
+    """Summaries of every class and monster family of a pair of data packs"""
+
+    def __init__(self, pack_hash, tier_levels, classes, monsters):
+        self.pack_hash = pack_hash
+        # tier -> expected spawn level the power scores were computed at
+        self.tier_levels = tier_levels
+        # (weapon, stat) -> {'class': name, 'focus': stat, **ability_totals}
+        self.classes = classes
+        # (category, index) -> {'names': {...}, 'focus': stat, 'stats': {tier: {stat: value}},
+        #                        'power': {tier: score}, **ability_totals}
+        self.monsters = monsters
+
+    def class_summary(self, weapon, stat):
+        return self.classes.get((weapon, stat))
+
+    def monster_summary(self, category, index):
+        return self.monsters.get((category, index))
+
+    def to_dict(self):
+        return {
+            'version': SUMMARY_VERSION,
+            'packHash': self.pack_hash,
+            'tierLevels': self.tier_levels,
+            'classes': [[weapon, stat, summary] for (weapon, stat), summary in self.classes.items()],
+            'monsters': [[category, index, summary] for (category, index), summary in self.monsters.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['packHash'],
+            data['tierLevels'],
+            {(weapon, stat): summary for weapon, stat, summary in data['classes']},
+            {(category, index): summary for category, index, summary in data['monsters']}
+        )
+
+
+def summarize_packs(class_data, monster_data, pack_hash=None):
+    """Compute the summary of a pair of data packs"""
+    if pack_hash is None:
+        pack_hash = compute_pack_hash(class_data, monster_data).hex()
+
+    classes = {}
+    for weapon, stat_classes in class_data.items():
+        for stat, class_info in stat_classes.items():
+            summary = ability_totals(class_info['abilities'].values())
+            summary['class'] = class_info['class']
+            summary['focus'] = stat
+            classes[(weapon, stat)] = summary
+
+    levels = tier_levels()
+    monsters = {}
+    for category, families in monster_data.items():
+        for index, family in enumerate(families):
+            summary = ability_totals(family['abilities'])
+            summary['names'] = dict(family['name'])
+            summary['focus'] = focus_stat(family['stats'])
+            summary['stats'] = {
+                tier: scaled_stats(family['stats'], level)
+                for tier, level in levels.items() if level is not None
+            }
+            summary['power'] = {
+                tier: power_score(stats, family['abilities'])
+                for tier, stats in summary['stats'].items()
+            }
+            monsters[(category, index)] = summary
+    return PackSummary(pack_hash, levels, classes, monsters)
+
+
+def summary_path(cache_dir, pack_hash):
+    return os.path.join(cache_dir, f"summary-v{SUMMARY_VERSION}-{pack_hash}.json")
+
+
+def load_summary(class_data, monster_data, cache_dir):
+    """Get the summary of the data packs, computing and caching it on a miss
+
+    Only the summary of the current packs is kept; files for other pack
+    hashes or summary versions are removed when a new one is written.
+    """
+    pack_hash = compute_pack_hash(class_data, monster_data).hex()
+    path = summary_path(cache_dir, pack_hash)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            summary = PackSummary.from_dict(json.load(f))
+        # Power scores also depend on the configured tier spawn weights
+        if summary.tier_levels == tier_levels():
+            return summary
+    except (OSError, ValueError, KeyError):
+        pass
+
+    summary = summarize_packs(class_data, monster_data, pack_hash)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(summary.to_dict(), f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        for entry in os.scandir(cache_dir):
+            if entry.name.startswith('summary-') and entry.path != path:
+                os.remove(entry.path)
+    except OSError:
+        # The cache is best effort; the computed summary is still usable
+        pass
+    return summary
@@ -0,0 +1,158 @@
+# perf.py
+# Lightweight instrumentation for hot paths (timers, counters, histograms).
+# Disabled by default; when disabled every entry point is a single flag check.
+import json
+import time
+from functools import wraps
+
+from ..data import config
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open ended)
+BUCKET_BOUNDS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_enabled = config.PERF_ENABLED
+_spans = {}
+_counters = {}
+
+
+class _SpanStats:
+    """Aggregated timings for a single named span"""
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, elapsed_ms):
+        """Record one timing in milliseconds"""
+        self.count += 1
+        self.total += elapsed_ms
+        if self.min is None or elapsed_ms < self.min:
+            self.min = elapsed_ms
+        if elapsed_ms > self.max:
+            self.max = elapsed_ms
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self):
+        """Convert span stats to a JSON friendly dictionary"""
+        return {
+            'count': self.count,
+            'totalMs': self.total,
+            'meanMs': self.total / self.count if self.count else 0,
+            'minMs': self.min or 0,
+            'maxMs': self.max,
+            'buckets': self.buckets[:]
+        }
+
+
+class _NullSpan:
+    """Shared no-op context manager used while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Context manager timing a block of code"""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+def is_enabled():
+    """Return True if instrumentation is currently recording"""
+    return _enabled
+
+
+def set_enabled(enabled):
+    """Turn recording on or off at runtime"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def record(name, elapsed_ms):
+    """Record an externally measured timing for a span"""
+    stats = _spans.get(name)
+    if stats is None:
+        stats = _spans[name] = _SpanStats()
+    stats.add(elapsed_ms)
+
+
+def span(name):
+    """Context manager timing the enclosed block under the given span name"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name=None):
+    """Decorator timing every call of the wrapped function
+
+    Args:
+        name (str): Span name, defaults to the function's qualified name
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def count(name, amount=1):
+    """Increment a named counter"""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def reset():
+    """Clear all recorded spans and counters"""
+    _spans.clear()
+    _counters.clear()
+
+
+def snapshot():
+    """Return the recorded spans and counters as a dictionary"""
+    return {
+        'bucketBoundsMs': list(BUCKET_BOUNDS_MS),
+        'spans': {name: stats.to_dict() for name, stats in sorted(_spans.items())},
+        'counters': dict(sorted(_counters.items()))
+    }
+
+
+def export_json(path):
+    """Write the current snapshot to a JSON file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, indent=4)
@@ -0,0 +1,274 @@
+# quests.py
+# Quests and achievements ("reach level 40", "clear 10 C-rank dungeons")
+# indexed by the character field they watch. Each field keeps its quest
+# targets sorted, so a character change costs one comparison per field, plus
+# a binary search when a value rose, no matter how many quests exist.
+import json
+import os
+import time
+from bisect import bisect_right
+
+from .idle_scheduler import run_steps
+from .leveling import RANKS, total_xp
+
+# Completions appended and characters evaluated per idle step
+FLUSH_CHUNK_SIZE = 500
+EVALUATE_CHUNK_SIZE = 200
+
+# Quest field -> value function; every field is a number that only goes up
+# in normal play
+FIELDS = {
+    'xp': lambda character: total_xp(character.level, character.current_xp),
+    'level': lambda character: character.level,
+    'rank': lambda character: RANKS.index(character.rank) if character.rank in RANKS else 0,
+    'passes': lambda character: character.get_total_dungeon_passes()
+}
+for _rank in RANKS:
+    FIELDS[f'passes:{_rank}'] = lambda character, rank=_rank: character.get_dungeon_record(rank).get('pass', 0)
+
+
+class Quest:
+    """A quest completed once a character's field value reaches the target"""
+    __slots__ = ('quest_id', 'name', 'description', 'field', 'target')
+
+    def __init__(self, quest_id, name, description, field, target):
+        self.quest_id = quest_id
+        self.name = name
+        self.description = description
+        self.field = field
+        self.target = target
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a quest from its quests.json definition
+
+        Rank targets may be given as the rank letter.
+
+        Raises:
+            ValueError: If the definition is incomplete or watches an unknown field
+        """
+        quest_id = data.get('id')
+        field = data.get('field')
+        target = data.get('target')
+        if not quest_id or not isinstance(quest_id, str):
+            raise ValueError(f"Quest without an id: {data!r}")
+        if field not in FIELDS:
+            raise ValueError(f"Quest {quest_id} watches unknown field {field!r}")
+        if field == 'rank' and target in RANKS:
+            target = RANKS.index(target)
+        if not isinstance(target, (int, float)) or isinstance(target, bool):
+            raise ValueError(f"Quest {quest_id} needs a numeric target, got {target!r}")
+        return cls(quest_id, data.get('name', quest_id), data.get('description', ""), field, target)
+
+    def __repr__(self):
+        return f"Quest(id='{self.quest_id}', field='{self.field}', target={self.target})"
+
+
+class QuestBook:
+    """Quest definitions indexed by field
+
+    For each field, quests are sorted by target so the quests a value change
+    from old to new completes are the slice of targets in (old, new].
+    """
+
+    def __init__(self, quests):
+        """Index quests
+
+        Raises:
+            ValueError: If two quests share an id
+        """
+        self.quests = {}
+        for quest in quests:
+            if quest.quest_id in self.quests:
+                raise ValueError(f"Duplicate quest id {quest.quest_id}")
+            self.quests[quest.quest_id] = quest
+
+        # field -> (sorted targets, quests in the same order)
+        self.indexes = {}
+        for field in FIELDS:
+            field_quests = sorted((quest for quest in self.quests.values() if quest.field == field), key=lambda quest: quest.target)
+            if field_quests:
+                self.indexes[field] = ([quest.target for quest in field_quests], field_quests)
+
+    @classmethod
+    def from_list(cls, definitions):
+        return cls([Quest.from_dict(data) for data in definitions])
+
+    def __len__(self):
+        return len(self.quests)
+
+    def get(self, quest_id):
+        return self.quests.get(quest_id)
+
+    def reached(self, field, old_value, new_value):
+        """Get the quests of a field whose target lies in (old_value, new_value]
+
+        An old_value of None means nothing was reached before.
+        """
+        index = self.indexes.get(field)
+        if index is None:
+            return []
+        targets, quests = index
+        start = 0 if old_value is None else bisect_right(targets, old_value)
+        return quests[start:bisect_right(targets, new_value)]
+
+
+class QuestTracker:
+    """Quest completion of a registry's characters, per Anki profile
+
+    Completion is permanent: an undone review does not take a quest back.
+    For each character the tracker remembers the highest value seen per
+    field, so a change only looks at fields whose value rose. Completions are
+    appended to a JSON lines file in the profile folder on flush(); nothing
+    is written for changes that complete no quest.
+    """
+
+    def __init__(self, book, file_name, schedule=None):
+        """Create a closed tracker
+
+        Args:
+            book (QuestBook): Quest definitions
+            file_name (str): Completion log name inside each profile folder
+            schedule (callable): schedule(name, steps) queues a generator job,
+                used to re-check a replaced roster in slices; without it the
+                roster is re-checked at once
+        """
+        self.book = book
+        self.file_name = file_name
+        self.schedule = schedule
+        self.path = None
+        # name -> {field: highest value seen}
+        self.best = {}
+        # name -> {quest id: completion timestamp}
+        self.completed = {}
+        self.pending = []
+        self.listeners = []
+
+    @property
+    def is_open(self):
+        return self.path is not None
+
+    def open_profile(self, profile_folder, characters):
+        """Read a profile's completions and catch up with its roster"""
+        self.close_profile()
+        self.path = os.path.join(profile_folder, self.file_name)
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        name, quest_id, timestamp = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+                    self.completed.setdefault(name, {})[quest_id] = timestamp
+        # Catching up is not news: listeners only hear about later changes
+        self.evaluate_all(characters, notify=False)
+
+    def close_profile(self):
+        """Flush and forget the open profile's progress"""
+        if not self.is_open:
+            return
+        try:
+            self.flush()
+        finally:
+            self.path = None
+            self.best.clear()
+            self.completed.clear()
+            self.pending = []
+
+    def add_listener(self, listener):
+        """Register a callback(tracker, character, quests) for newly completed quests"""
+        self.listeners.append(listener)
+
+    def evaluate(self, character, notify=True):
+        """Complete the quests a character's last change reached
+
+        Args:
+            character (Character): The changed character
+            notify (bool): Tell listeners about newly completed quests
+
+        Returns:
+            list: Quests completed by this call
+        """
+        best = self.best.setdefault(character.name, {})
+        completed = self.completed.setdefault(character.name, {})
+        newly_completed = []
+        for field in self.book.indexes:
+            value = FIELDS[field](character)
+            old_value = best.get(field)
+            if old_value is not None and value <= old_value:
+                continue
+            best[field] = value
+            for quest in self.book.reached(field, old_value, value):
+                if quest.quest_id not in completed:
+                    newly_completed.append(quest)
+
+        if not newly_completed:
+            return newly_completed
+        timestamp = int(time.time())
+        for quest in newly_completed:
+            completed[quest.quest_id] = timestamp
+            self.pending.append((character.name, quest.quest_id, timestamp))
+        if notify:
+            for listener in self.listeners:
+                listener(self, character, newly_completed)
+        return newly_completed
+
+    def evaluate_all(self, characters, notify=True):
+        """Re-check whole characters, e.g. after the roster or the quest book changed"""
+        for character in characters:
+            self.best.pop(character.name, None)
+            self.evaluate(character, notify)
+
+    def evaluate_steps(self, characters):
+        """Generator form of evaluate_all() for the idle scheduler, a chunk of characters per step"""
+        path = self.path
+        for start in range(0, len(characters), EVALUATE_CHUNK_SIZE):
+            if self.path != path:
+                return
+            self.evaluate_all(characters[start:start + EVALUATE_CHUNK_SIZE])
+            yield
+
+    def on_roster_changed(self, registry, character):
+        """Registry listener: check the changed character, or the whole roster"""
+        if not self.is_open:
+            return
+        if character is None:
+            if self.schedule is None:
+                self.evaluate_all(registry.characters)
+            else:
+                self.schedule("evaluate_quests", self.evaluate_steps(list(registry.characters)))
+        else:
+            self.evaluate(character)
+
+    def flush(self):
+        """Append completions not yet written to the profile's log"""
+        run_steps(self.flush_steps())
+
+    def flush_steps(self):
+        """Generator form of flush() for the idle scheduler, a chunk of completions per step"""
+        path = self.path
+        if path is None:
+            return
+        while self.path == path and self.pending:
+            records = self.pending[:FLUSH_CHUNK_SIZE]
+            with open(path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')) + "\n")
+            del self.pending[:len(records)]
+            yield
+
+    def is_completed(self, name, quest_id):
+        return quest_id in self.completed.get(name, {})
+
+    def completed_quests(self, name):
+        """Get (quest, timestamp) of a character's completed quests, newest first
+
+        Completions of quests no longer defined are left out.
+        """
+        quests = [(self.book.get(quest_id), timestamp) for quest_id, timestamp in self.completed.get(name, {}).items()]
+        return sorted(((quest, timestamp) for quest, timestamp in quests if quest is not None), key=lambda item: -item[1])
+
+    def progress(self, character, quest):
+        """Get (current value, target) of a quest for a character"""
+        return FIELDS[quest.field](character), quest.target
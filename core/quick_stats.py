@@ -0,0 +1,89 @@
+# quick_stats.py
+# Compact level/rank/XP summary of the active character for Anki's deck
+# browser, rendered once per character change and served from a cached string.
+import html
+
+from ..data import config
+from .leveling import MAX_LEVEL, xp_for_level
+
+# Deck browser link command that opens the character viewer
+OPEN_COMMAND = "ankiLeveling:characters"
+
+
+class QuickStatsSnapshot:
+    """The few character fields the widget shows"""
+    __slots__ = ('name', 'level', 'rank', 'current_xp', 'needed_xp')
+
+    def __init__(self, character):
+        self.name = character.name
+        self.level = character.level
+        self.rank = character.rank
+        self.current_xp = character.current_xp
+        self.needed_xp = None if character.level >= MAX_LEVEL else xp_for_level(character.level)
+
+    @property
+    def progress(self):
+        """Fraction of the current level's XP earned, 1.0 at max level"""
+        if not self.needed_xp:
+            return 1.0
+        return max(0.0, min(1.0, self.current_xp / self.needed_xp))
+
+
+def render_html(snapshot):
+    """Render a snapshot as a small HTML block (empty for no character)"""
+    if snapshot is None:
+        return ""
+    if snapshot.needed_xp is None:
+        xp_text = "Max level"
+    else:
+        xp_text = f"{snapshot.current_xp:,} / {snapshot.needed_xp:,} XP"
+    return (
+        f'<div style="margin: 12px auto; max-width: 360px; padding: 8px 12px; border: 1px solid {config.WEAPONS_BORDER_COLOR_0}; '
+        f'border-radius: 6px; font-size: {config.FONT_SIZE_SMALL}; cursor: pointer;" '
+        f'onclick="pycmd(\'{OPEN_COMMAND}\'); return false;" title="View Characters">'
+        f'<b>{html.escape(snapshot.name)}</b> &middot; Level {snapshot.level} &middot; Rank {html.escape(snapshot.rank)}'
+        f'<div style="margin-top: 6px; height: 6px; background: #e0e0e0; border-radius: 3px;">'
+        f'<div style="width: {snapshot.progress * 100:.1f}%; height: 100%; background: {config.WEAPONS_BACKGROUND_COLOR_0}; border-radius: 3px;"></div>'
+        f'</div>'
+        f'<div style="margin-top: 2px; text-align: right;">{xp_text}</div>'
+        f'</div>'
+    )
+
+
+class QuickStats:
+    """Cached quick-stats HTML for the active character of a registry
+
+    The active character is the one named QUICK_STATS_CHARACTER, or the first
+    of the roster when that is empty or not found. The HTML is rebuilt only
+    after a registry notification about that character or the whole roster.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.character_name = None
+        self.cached_html = None
+        registry.add_listener(self.on_roster_changed)
+
+    def active_character(self):
+        characters = self.registry.characters
+        if config.QUICK_STATS_CHARACTER:
+            character = self.registry.get_character(config.QUICK_STATS_CHARACTER)
+            if character is not None:
+                return character
+        return characters[0] if characters else None
+
+    def on_roster_changed(self, registry, character):
+        """Registry listener: drop the cached HTML if the shown character changed"""
+        if character is None or character.name == self.character_name:
+            self.invalidate()
+
+    def invalidate(self):
+        self.cached_html = None
+
+    def html(self):
+        """Get the widget HTML, rendering it only after an invalidation"""
+        if self.cached_html is None:
+            character = self.active_character()
+            self.character_name = None if character is None else character.name
+            self.cached_html = render_html(None if character is None else QuickStatsSnapshot(character))
+        return self.cached_html
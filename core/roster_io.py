@@ -0,0 +1,177 @@
+# roster_io.py
+# Streaming export/import of character rosters (JSON, JSON Lines, gzip/xz).
+import gzip
+import io
+import json
+import lzma
+import os
+
+from .character import Character
+from .character_registry import encode_record
+
+# Records between progress reports and cancellation checks
+REPORT_EVERY = 500
+
+ROSTER_FORMATS = (
+    ('.jsonl.gz', "Compressed JSON Lines"),
+    ('.jsonl.xz', "XZ Compressed JSON Lines"),
+    ('.jsonl', "JSON Lines"),
+    ('.json', "JSON")
+)
+
+
+class OperationCancelled(Exception):
+    """Raised when the user cancels an export or import"""
+
+
+def roster_format(path):
+    """Get the roster format extension of a path"""
+    lowered = path.lower()
+    for extension, _ in ROSTER_FORMATS:
+        if lowered.endswith(extension):
+            return extension
+    raise ValueError(f"Unsupported roster file: {os.path.basename(path)}")
+
+
+def _open_stream(raw, extension, mode):
+    """Wrap a binary file in the (de)compressor for its format, in text mode"""
+    if extension.endswith('.gz'):
+        return gzip.open(raw, mode + 't', encoding='utf-8')
+    if extension.endswith('.xz'):
+        return lzma.open(raw, mode + 't', encoding='utf-8')
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+def _check(index, total, progress, should_cancel):
+    if should_cancel is not None and should_cancel():
+        raise OperationCancelled()
+    if progress is not None:
+        progress(index, total)
+
+
+def export_roster(records, path, progress=None, should_cancel=None):
+    """Write character records to a roster file one record at a time
+
+    The file is written next to its destination and only moved into place
+    once complete, so a cancelled export never leaves a partial file.
+
+    Args:
+        records (list): Character.to_dict() records to export, taken by the
+            caller so the write never reads characters that are still changing
+        path (str): Destination; the format comes from its extension
+        progress (callable): Called with (done, total) every REPORT_EVERY records
+        should_cancel (callable): Returns True to abort the export
+
+    Returns:
+        int: Number of characters written
+    """
+    extension = roster_format(path)
+    total = len(records)
+    temp_path = path + ".partial"
+    try:
+        with open(temp_path, 'wb') as raw, _open_stream(raw, extension, 'w') as f:
+            if extension == '.json':
+                f.write('[\n')
+            for index, data in enumerate(records):
+                if index % REPORT_EVERY == 0:
+                    _check(index, total, progress, should_cancel)
+                record = json.dumps(data, separators=(',', ':'))
+                if extension == '.json':
+                    f.write(record if index == 0 else ',\n' + record)
+                else:
+                    f.write(record + '\n')
+            if extension == '.json':
+                f.write('\n]\n')
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    if progress is not None:
+        progress(total, total)
+    return total
+
+
+def import_roster(path, progress=None, should_cancel=None):
+    """Read characters from a roster file
+
+    JSON Lines files are streamed; progress is reported in bytes read from
+    disk since the record count is unknown up front.
+
+    Returns:
+        list: The imported characters
+    """
+    extension = roster_format(path)
+    characters = []
+
+    if extension == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        total = len(records)
+        for index, record in enumerate(records):
+            if index % REPORT_EVERY == 0:
+                _check(index, total, progress, should_cancel)
+            characters.append(Character(record))
+        if progress is not None:
+            progress(total, total)
+        return characters
+
+    size = os.path.getsize(path)
+    with open(path, 'rb') as raw, _open_stream(raw, extension, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if line_number % REPORT_EVERY == 0:
+                _check(raw.tell(), size, progress, should_cancel)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                characters.append(Character(json.loads(line)))
+            except ValueError as e:
+                raise ValueError(f"Line {line_number}: {e}") from e
+    if progress is not None:
+        progress(size, size)
+    return characters
+
+
+def merge_rosters(existing, imported):
+    """Merge imported characters into a roster, replacing same-named characters
+
+    Returns:
+        tuple: (merged list, number added, number replaced)
+    """
+    positions = {character.name: i for i, character in enumerate(existing)}
+    merged = list(existing)
+    added = replaced = 0
+    for character in imported:
+        position = positions.get(character.name)
+        if position is None:
+            positions[character.name] = len(merged)
+            merged.append(character)
+            added += 1
+        else:
+            merged[position] = character
+            replaced += 1
+    return merged, added, replaced
+
+
+def merge_records(roster, records, imported):
+    """Merge imported characters into a roster and encode the result for the roster file
+
+    Runs off the main thread: the roster's characters are only used by
+    identity and name, and their content comes from records taken before.
+
+    Args:
+        roster (list): The profile's characters
+        records (list): to_dict() records of roster, in the same order
+        imported (list): Characters read from a roster file
+
+    Returns:
+        tuple: (merged list, its encoded records (see encode_record), number
+            added, number replaced)
+    """
+    merged, added, replaced = merge_rosters(roster, imported)
+    lines = [
+        encode_record(records[i] if i < len(roster) and character is roster[i] else character.to_dict())
+        for i, character in enumerate(merged)
+    ]
+    return merged, lines, added, replaced
@@ -0,0 +1,240 @@
+# run_history.py
+# Per-character dungeon run history stored as compact columns with daily rollups.
+import hashlib
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from .idle_scheduler import run_steps
+from .leveling import RANKS
+
+HISTORY_MAGIC = b'ALRH'
+HISTORY_VERSION = 1
+# magic, version, run count
+_HEADER = struct.Struct('<4sBI')
+
+# Column name -> array typecode; 16 bytes per run
+COLUMNS = (
+    ('timestamps', 'd'),
+    ('ranks', 'B'),
+    ('outcomes', 'B'),
+    ('durations', 'f'),
+    ('monsters', 'H')
+)
+
+FAIL = 0
+PASS = 1
+
+
+def day_of(timestamp):
+    """Get the local calendar day (date ordinal) of a timestamp"""
+    return datetime.fromtimestamp(timestamp).date().toordinal()
+
+
+class RunHistory:
+    """Every dungeon attempt of one character, kept sorted by timestamp"""
+
+    def __init__(self):
+        for name, typecode in COLUMNS:
+            setattr(self, name, array(typecode))
+        # day ordinal -> array of (passes, fails) per rank, RANKS order
+        self.daily = {}
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _rollup(self, index):
+        day = day_of(self.timestamps[index])
+        counts = self.daily.get(day)
+        if counts is None:
+            counts = self.daily[day] = array('I', [0] * (2 * len(RANKS)))
+        counts[2 * self.ranks[index] + (0 if self.outcomes[index] == PASS else 1)] += 1
+
+    def record(self, timestamp, rank, passed, duration, monsters_defeated):
+        """Add one dungeon attempt
+
+        Args:
+            timestamp (float): Unix time the run finished
+            rank (str): Dungeon rank letter
+            passed (bool): Whether the dungeon was cleared
+            duration (float): Run length in seconds
+            monsters_defeated (int): Monsters beaten during the run
+        """
+        row = (timestamp, RANKS.index(rank), PASS if passed else FAIL, duration, monsters_defeated)
+        # Runs almost always arrive in order; fall back to a sorted insert
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            index = len(self.timestamps)
+            for (name, _), value in zip(COLUMNS, row):
+                getattr(self, name).append(value)
+        else:
+            index = bisect_right(self.timestamps, timestamp)
+            for (name, _), value in zip(COLUMNS, row):
+                getattr(self, name).insert(index, value)
+        self._rollup(index)
+        self.dirty = True
+
+    def range_indices(self, start, end):
+        """Get the (first, last + 1) run indices with start <= timestamp < end"""
+        return bisect_left(self.timestamps, start), bisect_left(self.timestamps, end)
+
+    def runs_between(self, start, end):
+        """Get (timestamp, rank, passed, duration, monsters) rows in a time range"""
+        first, last = self.range_indices(start, end)
+        return [
+            (self.timestamps[i], RANKS[self.ranks[i]], self.outcomes[i] == PASS, self.durations[i], self.monsters[i])
+            for i in range(first, last)
+        ]
+
+    def daily_totals(self, first_day, last_day, rank=None):
+        """Get (day ordinal, passes, fails) for each day in an inclusive range
+
+        Args:
+            rank (str): Only count this rank, or every rank when None
+        """
+        totals = []
+        for day in range(first_day, last_day + 1):
+            counts = self.daily.get(day)
+            if counts is None:
+                totals.append((day, 0, 0))
+            elif rank is None:
+                totals.append((day, sum(counts[0::2]), sum(counts[1::2])))
+            else:
+                offset = 2 * RANKS.index(rank)
+                totals.append((day, counts[offset], counts[offset + 1]))
+        return totals
+
+    def recent_daily_totals(self, days, rank=None):
+        """Get daily totals for the last days days, ending today"""
+        today = date.today().toordinal()
+        return self.daily_totals(today - days + 1, today, rank)
+
+    def encode(self):
+        """Pack the columns into bytes"""
+        parts = [_HEADER.pack(HISTORY_MAGIC, HISTORY_VERSION, len(self))]
+        parts.extend(getattr(self, name).tobytes() for name, _ in COLUMNS)
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, data):
+        """Unpack columns written by encode() and rebuild the daily rollups"""
+        if len(data) < _HEADER.size:
+            raise ValueError("Run history is cut short")
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != HISTORY_MAGIC:
+            raise ValueError("Not an Anki Leveling run history")
+        if version != HISTORY_VERSION:
+            raise ValueError(f"Unsupported run history version {version}")
+
+        history = cls()
+        if len(data) != _HEADER.size + count * sum(getattr(history, name).itemsize for name, _ in COLUMNS):
+            raise ValueError(f"Run history does not hold the {count} runs its header lists")
+        offset = _HEADER.size
+        for name, typecode in COLUMNS:
+            column = getattr(history, name)
+            length = count * column.itemsize
+            column.frombytes(data[offset:offset + length])
+            offset += length
+        for index in range(count):
+            history._rollup(index)
+        return history
+
+
+class RunHistoryStore:
+    """Run histories of one profile's characters, loaded on first use"""
+
+    def __init__(self, folder_name, journal):
+        """Create a closed store
+
+        Args:
+            folder_name (str): Folder inside each profile holding the history files
+            journal (CharacterJournal): Journal the cumulative dungeon records
+                are changed through, so registry listeners and other devices
+                see them
+        """
+        self.folder_name = folder_name
+        self.journal = journal
+        self.folder = None
+        self.histories = {}
+
+    def open_profile(self, profile_folder):
+        self.close_profile()
+        self.folder = os.path.join(profile_folder, self.folder_name)
+
+    def close_profile(self):
+        """Write pending changes and forget the loaded histories"""
+        if self.folder is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.folder = None
+            self.histories = {}
+
+    def history_path(self, name):
+        # Character names may contain characters that aren't valid in file names
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.folder, f"{digest}.runs")
+
+    def get(self, name):
+        """Get a character's history, loading it from disk the first time
+
+        A history file that cannot be read is renamed and the character
+        starts a new history.
+        """
+        history = self.histories.get(name)
+        if history is not None:
+            return history
+
+        history = RunHistory()
+        if self.folder is not None:
+            path = self.history_path(name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                try:
+                    history = RunHistory.decode(data)
+                except ValueError:
+                    # Cut short by a crash, or from a newer add-on: set it
+                    # aside rather than overwrite it with new runs
+                    os.replace(path, path + ".unreadable")
+        self.histories[name] = history
+        return history
+
+    def record(self, character, rank, passed, duration, monsters_defeated, timestamp=None):
+        """Record a dungeon attempt in the history and the character's cumulative record
+
+        The cumulative record changes through the journal, which notifies the
+        registry. Review undo does not take a dungeon result back.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.get(character.name).record(timestamp, rank, passed, duration, monsters_defeated)
+        with self.journal.change(character, 'dungeon', undoable=False):
+            character.record_dungeon(rank, passed, datetime.fromtimestamp(timestamp).date())
+
+    def flush(self):
+        """Write every history changed since it was loaded"""
+        run_steps(self.flush_steps())
+
+    def flush_steps(self):
+        """Generator form of flush() for the idle scheduler, one history file per step"""
+        folder = self.folder
+        if folder is None:
+            return
+        os.makedirs(folder, exist_ok=True)
+        for name, history in list(self.histories.items()):
+            if self.folder != folder:
+                return
+            if not history.dirty:
+                continue
+            path = self.history_path(name)
+            temp_path = path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(history.encode())
+            os.replace(temp_path, path)
+            history.dirty = False
+            yield
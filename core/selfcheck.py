@@ -0,0 +1,582 @@
+# selfcheck.py
+# Headless consistency checks of the game core: python -m <addon package>.core.selfcheck
+#
+# Each check exercises a core subsystem against an invariant it must keep.
+# Exits with status 1 when any check fails.
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from .ability import intern_object
+from .character import Character
+from .character_journal import CharacterJournal, merge_delta, read_journal
+from .character_registry import CharacterRegistry
+from .combat import Battle, Combatant, PLAYER_TEAM, MONSTER_TEAM, character_combatant_id, monster_combatant_id, resolve_abilities
+from .combat_state import CombatState, PERMANENT, VECTOR_MIN, numpy
+from .data_loader import load_packs
+from .dungeon_run import run_dungeon
+from .idle_scheduler import run_steps
+from .effects import EffectTable, apply_effects_batch, compile_ability
+from .leaderboard import Leaderboard, METRICS, ALL_RANKS
+from .leveling import RANKS, total_xp
+from .localization import SOURCE_LOCALE, get_strings, reload, tr
+from .pack_diff import diff_packs
+from .roster_io import merge_records
+from .run_history import RunHistory, RunHistoryStore
+from .spawn_tables import SpawnTables
+from .settings import apply_overrides, get_tables
+from .stat_allocation import BalancedPolicy, FocusPolicy, StatAllocator, STAT_POINT_VALUES
+from ..data import config
+
+CHECKS = []
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def check(func):
+    """Register a check; it raises CheckFailed (via expect) when broken and
+    may return a note, e.g. why it was skipped"""
+    CHECKS.append(func)
+    return func
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+class _Device:
+    """A profile folder with its own registry and journal sharing one media folder"""
+
+    def __init__(self, root, name, media_folder, characters, journal_class=CharacterJournal):
+        profile_folder = os.path.join(root, name)
+        os.makedirs(profile_folder)
+        self.registry = CharacterRegistry('roster.json')
+        self.registry.open_profile(profile_folder)
+        self.registry.replace_characters([Character(data) for data in characters])
+        self.policy = BalancedPolicy()
+        self.allocator = StatAllocator({})
+        self.journal = journal_class(self.registry, 'journal.json', self.allocator, self.policy)
+        self.journal.open(profile_folder, media_folder)
+
+    def award_xp(self, name, xp):
+        character = self.registry.get_character(name)
+        with self.journal.change(character, 'review'):
+            self.allocator.award_xp(character, xp, self.policy)
+
+
+@check
+def journal_checkpoint_interval():
+    """N single-entry flushes rewrite the journal about N / interval times"""
+    checkpoints = []
+
+    class CountingJournal(CharacterJournal):
+        def _checkpoint_steps(self):
+            checkpoints.append(self.seq)
+            return (yield from super()._checkpoint_steps())
+
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        device = _Device(root, 'a', media_folder, [{'name': 'A'}], CountingJournal)
+        flushes = config.JOURNAL_CHECKPOINT_INTERVAL * 2 + config.JOURNAL_CHECKPOINT_INTERVAL // 2
+        for _ in range(flushes):
+            device.award_xp('A', 1)
+            device.journal.flush()
+        # The first flush creates the file with a checkpoint
+        expected = 1 + flushes // config.JOURNAL_CHECKPOINT_INTERVAL
+        expect(len(checkpoints) <= expected, f"{flushes} flushes wrote {len(checkpoints)} checkpoints, expected at most {expected}")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def journal_merge_levels():
+    """Merging level ups from two devices gives the same character on both, with stats of the merged level"""
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        start = [{'name': 'A'}]
+        first = _Device(root, 'a', media_folder, start)
+        second = _Device(root, 'b', media_folder, start)
+        base = first.registry.get_character('A').to_dict()['stats']
+        for _ in range(400):
+            first.award_xp('A', 50)
+        for _ in range(300):
+            second.award_xp('A', 50)
+        # An undone review is merged as its reversal
+        second.award_xp('A', 5000)
+        second.journal.undo()
+        first.journal.flush()
+        second.journal.flush()
+        first.journal.merge()
+        second.journal.merge()
+
+        a = first.registry.get_character('A')
+        b = second.registry.get_character('A')
+        expect(a.to_dict() == b.to_dict(), f"devices disagree after merging: {a.to_dict()} != {b.to_dict()}")
+        expect(total_xp(a.level, a.current_xp) == (400 + 300) * 50, f"merged XP is {total_xp(a.level, a.current_xp)}")
+        points = first.policy.allocate(a.level)
+        for stat, scale, gained in zip(('HP', 'Strength', 'Speed', 'Defense', 'MP'), STAT_POINT_VALUES, points):
+            value = a.to_dict()['stats'][stat]
+            expected = base[stat] + gained * scale * (a.level - 1)
+            expect(value == expected, f"{stat} is {value} at level {a.level}, expected {expected}")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def journal_level_down_class():
+    """A merged level down re-derives the class its lost levels had earned"""
+    class_data, _ = load_packs()
+    allocator = StatAllocator(class_data)
+    policy = FocusPolicy('Strength')
+    character = Character({'name': 'A', 'weapon': 'Sword'})
+    start_class = allocator.class_for_stats(character)
+    allocator.level_up(character, 30, policy)
+    expect(character.character_class != start_class, "focusing Strength did not change the class")
+    merge_delta(character, (('level', character.level, 1),), allocator, policy)
+    expect(character.level == 1, f"merged level is {character.level}, expected 1")
+    expect(character.character_class == start_class, f"class is {character.character_class} after the level down, expected {start_class}")
+
+
+@check
+def journal_open_recovers():
+    """An empty own journal file starts a new journal from the roster instead of failing to open"""
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        device = _Device(root, 'a', media_folder, [{'name': 'A'}, {'name': 'B'}])
+        device.award_xp('A', 50)
+        old_path = device.journal.journal_path
+        device.journal.close()
+        open(old_path, 'w').close()
+
+        device.journal.open(os.path.join(root, 'a'), media_folder)
+        expect(device.journal.journal_path != old_path, "the new journal reuses the broken journal's device id")
+        header, entries = read_journal(device.journal.journal_path)
+        expect(len(header['characters']) == 2 and not entries, "the new journal does not start from the roster")
+        device.award_xp('B', 50)
+        device.journal.flush()
+        expect(len(read_journal(device.journal.journal_path)[1]) == 1, "a change after the recovery was not journaled")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def dungeon_records():
+    """A recorded dungeon reaches registry listeners and other devices but not review undo"""
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        first = _Device(root, 'a', media_folder, [{'name': 'A'}])
+        second = _Device(root, 'b', media_folder, [{'name': 'A'}])
+        notified = []
+        first.registry.add_listener(lambda registry, character: notified.append(character))
+        store = RunHistoryStore('runs', first.journal)
+        store.open_profile(os.path.join(root, 'a'))
+
+        first.award_xp('A', 10)
+        character = first.registry.get_character('A')
+        notified.clear()
+        store.record(character, 'C', True, 300, 12)
+        expect(notified == [character], "recording a dungeon did not notify the registry")
+        expect(first.journal.last_entry().label == 'review', "the dungeon result is on the undo stack")
+        first.journal.undo()
+        expect(character.get_dungeon_record('C').get('pass') == 1, "review undo took the dungeon pass back")
+
+        first.journal.flush()
+        second.journal.merge()
+        merged = second.registry.get_character('A').get_dungeon_record('C').get('pass')
+        expect(merged == 1, f"the other device has {merged} C passes after merging")
+        store.close_profile()
+        store.open_profile(os.path.join(root, 'a'))
+        expect(len(store.get('A')) == 1, "the run was not written to the history file")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def dungeon_runs_recorded():
+    """A played dungeon lands in the run history, and cut short history files are rejected"""
+    class_data, monster_data = load_packs()
+    tables = SpawnTables(monster_data)
+    rng = random.Random(7)
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        device = _Device(root, 'a', media_folder, [{'name': 'A', 'weapon': 'Sword'}])
+        character = device.registry.get_character('A')
+        store = RunHistoryStore('runs', device.journal)
+        store.open_profile(os.path.join(root, 'a'))
+        for rank in ('F', 'E'):
+            result = run_dungeon(character, rank, tables.draw_encounter(rank, rng), class_data, monster_data, rng)
+            expect(0 <= result.monsters_defeated <= RANKS.index(rank) + 1, f"{result.monsters_defeated} monsters defeated in a {rank} dungeon")
+            store.record(character, result.rank, result.passed, result.duration, result.monsters_defeated)
+        history = store.get('A')
+        expect(len(history) == 2, f"the history holds {len(history)} runs, expected 2")
+
+        data = history.encode()
+        try:
+            RunHistory.decode(data[:-3])
+        except ValueError:
+            pass
+        else:
+            raise CheckFailed("a cut short history was decoded")
+        store.flush()
+        path = store.history_path('A')
+        with open(path, 'wb') as f:
+            f.write(data[:-3])
+        store.histories.clear()
+        expect(len(store.get('A')) == 0 and os.path.exists(path + ".unreadable"), "the cut short history file was not set aside")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def spawn_tables_update():
+    """A reloaded pack rebuilds only the categories that changed, and unnamed tiers never spawn"""
+    _, monster_data = load_packs()
+    tables = SpawnTables(monster_data)
+    reloaded = {category: [dict(family, name=dict(family['name'])) for family in families] for category, families in monster_data.items()}
+    expect(not tables.update(reloaded), "reloading an unchanged pack rebuilt tables")
+
+    family = reloaded['HP'][0]
+    family['spawnWeight'] = 5
+    del family['name']['tier1']
+    rebuilt = tables.update(reloaded)
+    expect({category for _, category in rebuilt} == {'HP', None}, f"expected only HP and the cross-category tables, rebuilt {sorted(rebuilt, key=str)}")
+    drawn = set(tables.draw_many('F', 2000, seed=1, category='HP'))
+    expect(('HP', 0, 'tier1') not in drawn, "a tier without a name was drawn")
+
+    weights = dict(config.MONSTER_TIER_SPAWN_WEIGHTS, F=(50, 50, 0))
+    expect(len(tables.update(reloaded, weights)) == len(RANKS) * (len(reloaded) + 1), "new tier weights did not rebuild every table")
+
+
+def _count_steps(steps, between=None):
+    """Run a job's steps, calling between() after the first; returns the number of steps"""
+    count = 0
+    for _ in steps:
+        count += 1
+        if count == 1 and between is not None:
+            between()
+    return count
+
+
+@check
+def idle_jobs_sliced():
+    """Idle jobs on a large roster take many steps, and a cut short or overtaken job leaves no damage"""
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        characters = [{'name': f"C{i}", 'dungeons': {'F': {'pass': i, 'fail': 0}}} for i in range(1000)]
+        first = _Device(root, 'a', media_folder, characters)
+        second = _Device(root, 'b', media_folder, characters)
+        registry = first.registry
+
+        steps = _count_steps(registry.save_steps())
+        with open(registry.roster_path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        expect(steps > 1, f"saving 1000 characters took {steps} step")
+        expect(saved == [character.to_dict() for character in registry.characters], "the sliced save differs from the roster")
+
+        cut_short = registry.save_steps()
+        next(cut_short)
+        cut_short.close()
+        leftovers = [name for name in os.listdir(os.path.join(root, 'a')) if name.endswith(('.partial', '.tmp'))]
+        expect(not leftovers, f"a cancelled save left {leftovers}")
+
+        # A change journaled during a sliced checkpoint restarts it
+        for _ in range(config.JOURNAL_CHECKPOINT_INTERVAL + 1):
+            first.award_xp('C1', 1)
+        steps = _count_steps(first.journal.flush_steps(), lambda: first.award_xp('C2', 500))
+        header, _ = read_journal(first.journal.journal_path)
+        expect(steps > 1, f"a checkpoint of 1000 characters took {steps} step")
+        expect(header['checkpoint'] == first.journal.seq, f"checkpoint {header['checkpoint']} is behind seq {first.journal.seq}")
+        expect(len(header['characters']) == 1000, f"the checkpoint holds {len(header['characters'])} characters")
+
+        for i in range(1000):
+            first.award_xp(f"C{i}", 1)
+        first.journal.flush()
+        steps = _count_steps(second.journal.merge_steps())
+        expect(steps > 1, f"merging 1000 entries took {steps} step")
+        a = [character.to_dict() for character in first.registry.characters]
+        b = [character.to_dict() for character in second.registry.characters]
+        expect(a == b, "devices disagree after a sliced merge")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def roster_import_in_slices():
+    """An import merged off the main thread swaps in the same roster, file and leaderboard as a direct merge"""
+    root = tempfile.mkdtemp()
+    try:
+        media_folder = os.path.join(root, 'media')
+        os.makedirs(media_folder)
+        rng = random.Random(35)
+        existing = [{'name': f"C{i}", 'level': rng.randint(1, 60), 'dungeons': {'F': {'pass': rng.randint(0, 9), 'fail': 1}}} for i in range(1500)]
+        device = _Device(root, 'a', media_folder, existing)
+        registry = device.registry
+        jobs = []
+        leaderboard = Leaderboard(registry.characters, schedule=lambda name, steps: jobs.append(steps))
+        registry.add_listener(leaderboard.on_roster_changed)
+
+        roster = list(registry.characters)
+        records = [character.to_dict() for character in roster]
+        imported = [Character({'name': f"C{i}", 'level': rng.randint(1, 60)}) for i in range(1000, 2500)]
+        merged, lines, added, replaced = merge_records(roster, records, imported)
+        expect((added, replaced) == (1000, 500), f"merge counted {added} added and {replaced} replaced")
+
+        registry.replace_characters(merged)
+        run_steps(registry.write_steps(lines[start:start + 200] for start in range(0, len(lines), 200)))
+        with open(registry.roster_path, 'r', encoding='utf-8') as f:
+            expect(json.load(f) == [character.to_dict() for character in merged], "the written roster differs from the merged one")
+
+        expect(len(jobs) == 1, f"replacing the roster queued {len(jobs)} leaderboard jobs")
+        steps = _count_steps(jobs[0], lambda: device.award_xp('C3', 10 ** 6))
+        expect(steps > 1, f"the leaderboard rebuild took {steps} step")
+        expected = Leaderboard(registry.characters)
+        for metric in METRICS:
+            for rank in RANKS + (ALL_RANKS,):
+                expect(leaderboard.top(metric, 50, rank) == expected.top(metric, 50, rank), f"the {metric} {rank} board differs after a sliced rebuild")
+        expect(leaderboard.position('xp', 'C3') == 1, "a character changed during the rebuild lost its update")
+    finally:
+        shutil.rmtree(root)
+
+
+@check
+def data_key_overrides():
+    """Stat and weapon names stay usable as data pack keys; display-only names can change"""
+    try:
+        errors = apply_overrides({'STATS_NAME_HP': "Health", 'WEAPONS_NAME_0': "Blade", 'ABILITY_NAME_DMG': "Hit"})
+        tables = get_tables()
+        expect(len(errors) == 2, f"expected the two data key overrides to be rejected, got {errors}")
+        expect(tables.stats[0].name == "HP" and tables.weapons[0].name == "Sword", "a data key override was applied")
+        expect(tables.effects[0].name == "Hit", "the ability effect name override was not applied")
+    finally:
+        apply_overrides({})
+
+
+@check
+def shaped_overrides():
+    """Tuple and dictionary overrides must keep the built-in length, keys and element types"""
+    weights = {rank: list(row) for rank, row in config.MONSTER_TIER_SPAWN_WEIGHTS.items()}
+    missing_rank = {rank: row for rank, row in weights.items() if rank != "S"}
+    missing_tier = dict(weights, S=[0, 30])
+    try:
+        errors = apply_overrides({
+            'REVIEW_XP': [],
+            'TUNING_TIER_WIN_RATE_OFFSETS': [0.05, "0", -0.05],
+            'MONSTER_TIER_SPAWN_WEIGHTS': missing_rank
+        })
+        expect(len(errors) == 3, f"expected three malformed overrides to be rejected, got {errors}")
+        expect(config.REVIEW_XP == (1, 2, 3, 4), f"REVIEW_XP is {config.REVIEW_XP}")
+        errors = apply_overrides({'MONSTER_TIER_SPAWN_WEIGHTS': missing_tier})
+        expect(len(errors) == 1, f"a rank with two tier weights was accepted: {config.MONSTER_TIER_SPAWN_WEIGHTS}")
+        errors = apply_overrides({'REVIEW_XP': [2, 4, 6, 8], 'MONSTER_TIER_SPAWN_WEIGHTS': dict(weights, F=[90, 10, 0])})
+        expect(not errors, f"well-formed overrides were rejected: {errors}")
+        expect(config.REVIEW_XP == (2, 4, 6, 8), f"REVIEW_XP is {config.REVIEW_XP}")
+        expect(config.MONSTER_TIER_SPAWN_WEIGHTS['F'] == (90, 10, 0), f"F weights are {config.MONSTER_TIER_SPAWN_WEIGHTS['F']}")
+    finally:
+        apply_overrides({})
+
+
+@check
+def locale_switch():
+    """Changing LOCALE changes pack text and the render cache key, and changing it back restores both"""
+    saved_locale = config.LOCALE
+    class_data, monster_data = load_packs()
+    class_name = class_data['Sword']['HP']['class']
+    monster_name = monster_data['HP'][0]['name']['tier1']
+    try:
+        config.LOCALE = SOURCE_LOCALE
+        reload()
+        source_key = get_strings().cache_key()
+        expect(tr(class_name) == class_name, f"{SOURCE_LOCALE} translated {class_name!r}")
+
+        config.LOCALE = "de"
+        expect(tr(class_name) != class_name, f"de did not translate the class name {class_name!r}")
+        expect(tr(monster_name) != monster_name, f"de did not translate the monster name {monster_name!r}")
+        expect(get_strings().cache_key() != source_key, "the render cache key did not change with the locale")
+
+        config.LOCALE = SOURCE_LOCALE
+        expect(tr(class_name) == class_name and get_strings().cache_key() == source_key, "switching back kept the de strings")
+    finally:
+        config.LOCALE = saved_locale
+        reload()
+
+
+@check
+def malformed_pack_lint():
+    """Malformed monster families and abilities are lint problems, not crashes"""
+    with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'monsters.json'), encoding='utf-8') as f:
+        text = f.read()
+    old = json.loads(text, object_hook=intern_object)
+    raw = json.loads(text)
+    families = raw['HP']
+    families[0]['abilities'][0]['baseDamage'] = "10"
+    families[1]['name'] = "Slime"
+    families[2]['abilities'][0]['name'] = 5
+    families[3]['stats']['HP'] = "many"
+    families[4]['abilities'].append("oops")
+    families.append(7)
+    new = json.loads(json.dumps(raw), object_hook=intern_object)
+    diff = diff_packs(old, new, workers=1)
+    expect(len(diff.problems) == 6, f"expected a problem per malformed field, got {diff.problems}")
+    expect(any("baseDamage is not an integer" in problem for problem in diff.problems), "the text baseDamage was not reported")
+    expect(diff.tier_deltas(), "no tier powers were computed")
+
+
+def _random_stats(rng):
+    return (rng.randint(1, 400), rng.randint(0, 60), rng.randint(0, 40), rng.randint(1, 30), rng.randint(0, 30))
+
+
+def _state_snapshot(state):
+    return (
+        [list(column) for column in state.columns],
+        [list(column) for column in (state.buff_entity, state.buff_stat, state.buff_amount, state.buff_turns)]
+    )
+
+
+@check
+def combat_column_systems():
+    """Damage, healing and buff expiry give the same columns looped and through NumPy"""
+    if numpy is None:
+        return "skipped, NumPy is not installed"
+    rng = random.Random(48)
+    looped = CombatState(vector_min=sys.maxsize)
+    vectorized = CombatState(vector_min=1)
+    for _ in range(VECTOR_MIN * 3):
+        team, stats = rng.randint(0, 1), _random_stats(rng)
+        looped.add(team, stats)
+        vectorized.add(team, stats)
+    entities = looped.entities()
+    for step in range(300):
+        chosen = rng.sample(entities, rng.randint(1, len(entities)))
+        amounts = [rng.randint(0, 120) for _ in chosen]
+        kind = step % 4
+        if kind == 0:
+            results = looped.damage(chosen, amounts), vectorized.damage(chosen, amounts)
+            expect(sorted(results[0]) == sorted(results[1]), f"step {step}: defeated entities differ")
+        elif kind == 1:
+            looped.heal(chosen, amounts)
+            vectorized.heal(chosen, amounts)
+        elif kind == 2:
+            for entity, amount in zip(chosen, amounts):
+                stat, turns = rng.randint(2, 4), rng.choice((PERMANENT, 1, 2, 5))
+                looped.add_buff(entity, stat, amount - 60, turns)
+                vectorized.add_buff(entity, stat, amount - 60, turns)
+        else:
+            owner = rng.choice((None, rng.choice(entities)))
+            expect(looped.tick_buffs(owner) == vectorized.tick_buffs(owner), f"step {step}: speed changes differ")
+        expect(_state_snapshot(looped) == _state_snapshot(vectorized), f"step {step}: columns differ")
+
+    try:
+        looped.add_buff(entities[0], 2, 5, 0)
+    except ValueError:
+        pass
+    else:
+        raise CheckFailed("a 0 turn buff was accepted")
+
+
+def _party(class_data, monster_data, rng, players, monsters):
+    definitions = []
+    weapons = [weapon for weapon in class_data if class_data[weapon]]
+    for _ in range(players):
+        weapon = rng.choice(weapons)
+        stat = rng.choice(list(class_data[weapon]))
+        definitions.append((character_combatant_id(weapon, stat), PLAYER_TEAM, (rng.randint(200, 400), 30, rng.randint(5, 25), 10, 60)))
+    for _ in range(monsters):
+        category = rng.choice(list(monster_data))
+        index = rng.randrange(len(monster_data[category]))
+        definitions.append((monster_combatant_id(category, index), MONSTER_TEAM, _random_stats(rng)))
+    return [
+        Combatant(combatant_id, team, stats, resolve_abilities(combatant_id, class_data, monster_data))
+        for combatant_id, team, stats in definitions
+    ]
+
+
+@check
+def timed_buff_party_battles():
+    """Party battles with expiring buffs play out the same looped and through NumPy"""
+    class_data, monster_data = load_packs()
+    rng = random.Random(4)
+    for seed in range(40):
+        party = rng.randint(1, 4), rng.randint(7, 40)
+        results = []
+        for vector_min in (sys.maxsize, 1):
+            battle = Battle(_party(class_data, monster_data, random.Random(seed), *party), seed, buff_turns=2, vector_min=vector_min)
+            results.append((battle.run(), battle.events, battle.end_state()))
+        expect(results[0] == results[1], f"seed {seed} with {party[0]} players and {party[1]} monsters differs")
+
+
+@check
+def batch_kernel_matches_state():
+    """effects.apply_effects_batch applies the same rules as CombatState.apply_effect"""
+    if numpy is None:
+        return "skipped, NumPy is not installed"
+    class_data, monster_data = load_packs()
+    abilities = [ability for families in monster_data.values() for family in families for ability in family['abilities']]
+    rng = random.Random(7)
+    rows = 2000
+    ability_indices = [rng.randrange(len(abilities)) for _ in range(rows)]
+    casters = [_random_stats(rng) for _ in range(rows)]
+    targets = [_random_stats(rng) for _ in range(rows)]
+    rolls = [rng.randint(85, 115) for _ in range(rows)]
+
+    state = CombatState()
+    expected_casters, expected_targets = [], []
+    for index, caster_stats, target_stats, roll in zip(ability_indices, casters, targets, rolls):
+        caster = state.add(PLAYER_TEAM, caster_stats)
+        target = state.add(MONSTER_TEAM, target_stats)
+        state.apply_effect(caster, target, compile_ability(abilities[index]), roll)
+        expected_casters.append(state.row(caster))
+        expected_targets.append(state.row(target))
+
+    caster_array = numpy.array(casters, dtype=numpy.int64)
+    target_array = numpy.array(targets, dtype=numpy.int64)
+    apply_effects_batch(
+        EffectTable(abilities), numpy.array(ability_indices), caster_array, caster_array[:, 0].copy(),
+        target_array, numpy.array(rolls, dtype=numpy.int64)
+    )
+    expect(caster_array.tolist() == expected_casters, "caster stats differ")
+    expect(target_array.tolist() == expected_targets, "target stats differ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Anki Leveling core consistency checks")
+    parser.add_argument('names', nargs='*', help="checks to run (default: all)")
+    args = parser.parse_args()
+
+    failed = 0
+    for func in CHECKS:
+        if args.names and func.__name__ not in args.names:
+            continue
+        try:
+            note = func()
+        except CheckFailed as e:
+            failed += 1
+            print(f"FAIL  {func.__name__}: {e}")
+        else:
+            print(f"ok    {func.__name__}" + (f" ({note})" if note else ""))
+    if failed:
+        print(f"\n{failed} check(s) failed")
+        sys.exit(1)
+    print("\nAll checks passed")
+
+
+if __name__ == '__main__':
+    main()
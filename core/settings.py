@@ -0,0 +1,178 @@
+# settings.py
+# Config constants with user overrides applied, and the style lookup tables
+# derived from them. Tables are built once per load, never per widget.
+from ..data import config
+from .ability import EFFECT_KEYS
+
+# Config name suffix of each stat, in stat vector order (HP, Str, Spd, Def, MP)
+STAT_SUFFIXES = ('HP', 'STR', 'SPD', 'DEF', 'MP')
+# Config name suffix of each effect field, in EFFECT_KEYS order
+EFFECT_SUFFIXES = ('DMG', 'HEAL', 'SPD_UP', 'SPD_DOWN', 'DEF_UP', 'DEF_DOWN', 'STR_UP', 'STR_DOWN', 'MANA_COST')
+MONSTER_TIERS = ('tier1', 'tier2', 'tier3')
+WEAPON_COUNT = 5
+
+# Settings whose values are keys into the data packs (classes.json and
+# monsters.json are keyed by stat and weapon names); renaming them would
+# disconnect the viewers and stat allocation from the data
+DATA_KEY_PREFIXES = ('STATS_NAME_', 'WEAPONS_NAME_')
+
+# Built-in values, captured before any override is applied
+DEFAULTS = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+
+
+class Style:
+    """Display name and colors of one stat, effect, tier or weapon"""
+    __slots__ = ('key', 'name', 'text', 'border', 'background')
+
+    def __init__(self, key, name, text, border, background):
+        self.key = key
+        self.name = name
+        self.text = text
+        self.border = border
+        self.background = background
+
+
+class LookupTables:
+    """Style tables derived from the current config values"""
+
+    def __init__(self):
+        stats = []
+        for suffix in STAT_SUFFIXES:
+            name = getattr(config, f'STATS_NAME_{suffix}')
+            stats.append(Style(
+                name,
+                name,
+                getattr(config, f'STATS_TEXT_COLOR_{suffix}'),
+                getattr(config, f'STATS_BORDER_COLOR_{suffix}'),
+                getattr(config, f'STATS_BACKGROUND_COLOR_{suffix}')
+            ))
+        # In stat vector order, and by stat name
+        self.stats = tuple(stats)
+        self.stat_by_name = {style.name: style for style in stats}
+
+        # In EFFECT_KEYS order, and by effect key
+        self.effects = tuple(
+            Style(
+                key,
+                getattr(config, f'ABILITY_NAME_{suffix}'),
+                getattr(config, f'ABILITY_TEXT_COLOR_{suffix}'),
+                getattr(config, f'ABILITY_BORDER_COLOR_{suffix}'),
+                getattr(config, f'ABILITY_BACKGROUND_COLOR_{suffix}')
+            )
+            for key, suffix in zip(EFFECT_KEYS, EFFECT_SUFFIXES)
+        )
+        self.effect_by_key = {style.key: style for style in self.effects}
+
+        # Tier borders are numbered from 1 and backgrounds from 0 in config
+        self.tiers = tuple(
+            Style(
+                tier,
+                tier,
+                config.FONT_COLOR,
+                getattr(config, f'MONSTER_TIER_BORDER_COLOR_{i + 1}'),
+                getattr(config, f'MONSTER_TIER_BACKGROUND_COLOR_{i}')
+            )
+            for i, tier in enumerate(MONSTER_TIERS)
+        )
+
+        self.weapons = tuple(
+            Style(
+                i,
+                getattr(config, f'WEAPONS_NAME_{i}'),
+                getattr(config, f'WEAPONS_TEXT_COLOR_{i}'),
+                getattr(config, f'WEAPONS_BORDER_COLOR_{i}'),
+                getattr(config, f'WEAPONS_BACKGROUND_COLOR_{i}')
+            )
+            for i in range(WEAPON_COUNT)
+        )
+
+    def displayed_effects(self, ability):
+        """Get (style, value) for each nonzero effect of an ability"""
+        return [(style, ability[style.key]) for style in self.effects if ability[style.key] != 0]
+
+
+def _coerce(default, value):
+    """Check an override against the type and shape of its built-in value
+
+    Tuples must keep their length and dictionaries their keys, with every
+    element checked against the built-in one.
+
+    Returns:
+        The value to set, or None if it does not match
+    """
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+    elif isinstance(default, (int, float)):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return type(default)(value) if isinstance(default, float) or value == int(value) else None
+    elif isinstance(default, tuple):
+        if isinstance(value, list) and len(value) == len(default):
+            items = [_coerce(item_default, item) for item_default, item in zip(default, value)]
+            if None not in items:
+                return tuple(items)
+    elif isinstance(default, dict):
+        if isinstance(value, dict) and set(value) == set(default):
+            items = {key: _coerce(default[key], item) for key, item in value.items()}
+            if None not in items.values():
+                return items
+    elif isinstance(value, type(default)):
+        return value
+    return None
+
+
+def _expected(default):
+    """Describe the values _coerce accepts for a setting"""
+    if isinstance(default, tuple):
+        return f"a list of {len(default)} values like {list(default)!r}"
+    if isinstance(default, dict):
+        example = next(iter(default.values()))
+        example = list(example) if isinstance(example, tuple) else example
+        return f"an object with the keys {', '.join(map(str, default))}, each like {example!r}"
+    return f"a {type(default).__name__}"
+
+
+_tables = None
+
+
+def apply_overrides(overrides):
+    """Reset config to its built-in values, then apply user overrides
+
+    Overrides are keyed by config constant name. Unknown names, data pack
+    keys (DATA_KEY_PREFIXES) and values of the wrong type or shape are
+    skipped.
+
+    Args:
+        overrides (dict): User config, e.g. from the add-on config editor
+
+    Returns:
+        list: Messages describing each skipped override
+    """
+    global _tables
+    for name, value in DEFAULTS.items():
+        setattr(config, name, value)
+
+    errors = []
+    for name, value in (overrides or {}).items():
+        if name not in DEFAULTS:
+            errors.append(f"Unknown setting {name}")
+            continue
+        if name.startswith(DATA_KEY_PREFIXES):
+            errors.append(f"{name} names data pack entries and cannot be changed")
+            continue
+        coerced = _coerce(DEFAULTS[name], value)
+        if coerced is None:
+            errors.append(f"{name} must be {_expected(DEFAULTS[name])}, got {value!r}")
+            continue
+        setattr(config, name, coerced)
+
+    _tables = LookupTables()
+    return errors
+
+
+def get_tables():
+    """Get the lookup tables for the current config"""
+    global _tables
+    if _tables is None:
+        _tables = LookupTables()
+    return _tables
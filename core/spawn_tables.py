@@ -0,0 +1,194 @@
+# spawn_tables.py
+# O(1) weighted monster draws per dungeon rank using Walker/Vose alias tables.
+import random
+from array import array
+
+from ..data import config
+from .dungeon import monster_count
+from .leveling import RANKS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MONSTER_TIERS = ('tier1', 'tier2', 'tier3')
+# Key of the table drawing from every category of a rank
+ALL_CATEGORIES = None
+
+
+class AliasTable:
+    """Walker alias table: O(n) to build, O(1) per weighted draw"""
+    __slots__ = ('outcomes', 'prob', 'alias', '_numpy_tables')
+
+    def __init__(self, outcomes, weights):
+        if len(outcomes) != len(weights) or not outcomes:
+            raise ValueError("Alias table needs one positive weight per outcome")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Alias table weights must sum to a positive value")
+
+        count = len(outcomes)
+        scaled = [weight * count / total for weight in weights]
+        prob = array('d', [1.0] * count)
+        alias = array('l', range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+
+        # Vose's method: pair each under-full column with an over-full one
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            prob[low] = scaled[low]
+            alias[low] = high
+            scaled[high] = scaled[high] + scaled[low] - 1.0
+            if scaled[high] < 1.0:
+                small.append(high)
+            else:
+                large.append(high)
+
+        self.outcomes = tuple(outcomes)
+        self.prob = prob
+        self.alias = alias
+        self._numpy_tables = None
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def draw_index(self, rng=random):
+        """Draw one outcome index"""
+        column = rng.random() * len(self.prob)
+        index = int(column)
+        return index if column - index < self.prob[index] else self.alias[index]
+
+    def draw(self, rng=random):
+        """Draw one outcome"""
+        return self.outcomes[self.draw_index(rng)]
+
+    def draw_indices(self, count, seed=None):
+        """Draw many outcome indices at once
+
+        Uses NumPy when it is installed, otherwise a Python loop.
+
+        Returns:
+            numpy.ndarray or array: Outcome indices
+        """
+        if numpy is None:
+            rng = random.Random(seed)
+            return array('l', (self.draw_index(rng) for _ in range(count)))
+
+        if self._numpy_tables is None:
+            self._numpy_tables = (numpy.frombuffer(self.prob, dtype=numpy.float64),
+                                  numpy.frombuffer(self.alias, dtype=numpy.dtype(f'i{self.alias.itemsize}')))
+        prob, alias = self._numpy_tables
+        columns = numpy.random.default_rng(seed).random(count) * len(prob)
+        indices = columns.astype(numpy.int64)
+        return numpy.where(columns - indices < prob[indices], indices, alias[indices])
+
+    def draw_many(self, count, seed=None):
+        """Draw many outcomes at once"""
+        outcomes = self.outcomes
+        return [outcomes[index] for index in self.draw_indices(count, seed)]
+
+
+def _category_entries(category, families, tier_weights):
+    """Get (outcome, weight) pairs of one category for one rank
+
+    Tiers a family has no name for never spawn.
+    """
+    entries = []
+    for index, family in enumerate(families):
+        family_weight = family.get('spawnWeight', 1)
+        names = family.get('name', {})
+        for tier, tier_weight in zip(MONSTER_TIERS, tier_weights):
+            if not names.get(tier):
+                continue
+            weight = family_weight * tier_weight
+            if weight > 0:
+                entries.append(((category, index, tier), weight))
+    return entries
+
+
+def _family_fingerprint(families):
+    """Summarise the parts of a category that affect spawning"""
+    return tuple(
+        (tuple(family.get('name', {}).get(tier) for tier in MONSTER_TIERS), family.get('spawnWeight', 1))
+        for family in families
+    )
+
+
+class SpawnTables:
+    """Alias tables per (rank, category) plus one per rank across all categories
+
+    Outcomes are (category, family index, tier) tuples.
+    """
+
+    def __init__(self, monster_data=None, tier_weights=None):
+        self.tier_weights = tier_weights or config.MONSTER_TIER_SPAWN_WEIGHTS
+        self.tables = {}
+        self.entries = {}
+        self.fingerprints = {}
+        if monster_data:
+            self.update(monster_data)
+
+    def update(self, monster_data, tier_weights=None):
+        """Rebuild only the tables of categories that changed
+
+        Args:
+            monster_data (dict): The monster pack, e.g. after it was reloaded
+            tier_weights (dict): New tier weights per rank; every category is
+                rebuilt when they differ from the current ones
+
+        Returns:
+            set: (rank, category) keys that were rebuilt
+        """
+        if tier_weights is not None and tier_weights != self.tier_weights:
+            self.tier_weights = tier_weights
+            self.fingerprints = {}
+        rebuilt = set()
+        for category in list(self.fingerprints):
+            if category not in monster_data:
+                del self.fingerprints[category]
+                for rank in RANKS:
+                    self.tables.pop((rank, category), None)
+                    self.entries.pop((rank, category), None)
+                    rebuilt.add((rank, category))
+
+        for category, families in monster_data.items():
+            fingerprint = _family_fingerprint(families)
+            if self.fingerprints.get(category) == fingerprint:
+                continue
+            self.fingerprints[category] = fingerprint
+            for rank in RANKS:
+                key = (rank, category)
+                entries = _category_entries(category, families, self.tier_weights.get(rank, ()))
+                self.entries[key] = entries
+                self.tables[key] = AliasTable(*zip(*entries)) if entries else None
+                rebuilt.add(key)
+
+        # The cross-category table of a rank depends on all its categories
+        for rank in {rank for rank, _ in rebuilt}:
+            entries = [entry for category in self.fingerprints for entry in self.entries.get((rank, category), ())]
+            self.tables[(rank, ALL_CATEGORIES)] = AliasTable(*zip(*entries)) if entries else None
+            rebuilt.add((rank, ALL_CATEGORIES))
+        return rebuilt
+
+    def table(self, rank, category=ALL_CATEGORIES):
+        """Get the alias table for a rank and optional category"""
+        table = self.tables.get((rank, category))
+        if table is None:
+            raise KeyError(f"No monsters can spawn for rank {rank} in {category or 'any category'}")
+        return table
+
+    def draw(self, rank, category=ALL_CATEGORIES, rng=random):
+        """Draw one (category, family index, tier) for a rank"""
+        return self.table(rank, category).draw(rng)
+
+    def draw_encounter(self, rank, rng=random, category=ALL_CATEGORIES):
+        """Draw the monsters of one dungeon: n monsters for the n-th rank"""
+        table = self.table(rank, category)
+        return [table.draw(rng) for _ in range(monster_count(rank))]
+
+    def draw_many(self, rank, count, seed=None, category=ALL_CATEGORIES):
+        """Draw many monsters of a rank at once for simulations"""
+        return self.table(rank, category).draw_many(count, seed)
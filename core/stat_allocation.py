@@ -0,0 +1,185 @@
+# stat_allocation.py
+# Level-up stat points and class changes (gameWiki.txt: "On level, allot 10
+# points to stats. If max stat changes, then change class.")
+from ..data import config
+from .leveling import MAX_LEVEL, apply_xp, rank_for_level
+
+POINTS_PER_LEVEL = 10
+
+# Allocation order used by policies and stat vectors
+STATS = (
+    config.STATS_NAME_HP,
+    config.STATS_NAME_STR,
+    config.STATS_NAME_SPD,
+    config.STATS_NAME_DEF,
+    config.STATS_NAME_MP
+)
+# Stat gained per allocated point (HP and MP gain 10 per point)
+STAT_POINT_VALUES = (10, 1, 1, 1, 10)
+
+
+class ManualPolicy:
+    """Allocates a fixed, user chosen split every level"""
+    constant = True
+
+    def __init__(self, allocation):
+        """Create a manual policy
+
+        Args:
+            allocation (dict): Points per stat name; must total POINTS_PER_LEVEL
+        """
+        points = tuple(allocation.get(stat, 0) for stat in STATS)
+        if sum(points) != POINTS_PER_LEVEL or min(points) < 0:
+            raise ValueError(f"Manual allocation must spend exactly {POINTS_PER_LEVEL} points")
+        self.points = points
+
+    def allocate(self, level):
+        return self.points
+
+
+class BalancedPolicy:
+    """Splits points evenly across all stats, remainder going to the first stats"""
+    constant = True
+
+    def __init__(self):
+        share, remainder = divmod(POINTS_PER_LEVEL, len(STATS))
+        self.points = tuple(share + (1 if i < remainder else 0) for i in range(len(STATS)))
+
+    def allocate(self, level):
+        return self.points
+
+
+class FocusPolicy:
+    """Puts most points into one stat and spreads the rest evenly"""
+    constant = True
+
+    def __init__(self, stat, focus_points=POINTS_PER_LEVEL):
+        if stat not in STATS:
+            raise ValueError(f"Unknown stat {stat!r}")
+        if not 0 <= focus_points <= POINTS_PER_LEVEL:
+            raise ValueError(f"Focus points must be between 0 and {POINTS_PER_LEVEL}")
+        others = len(STATS) - 1
+        share, remainder = divmod(POINTS_PER_LEVEL - focus_points, others)
+        points = []
+        for stat_name in STATS:
+            if stat_name == stat:
+                points.append(focus_points)
+            else:
+                points.append(share + (1 if remainder > 0 else 0))
+                remainder -= 1
+        self.points = tuple(points)
+
+    def allocate(self, level):
+        return self.points
+
+
+def leading_stat(character):
+    """Get the stat a character has the most points in; HP and MP count per 10"""
+    values = (character.hp, character.strength, character.speed, character.defense, character.mp)
+    points = [value / scale for value, scale in zip(values, STAT_POINT_VALUES)]
+    return STATS[max(range(len(STATS)), key=points.__getitem__)]
+
+
+class StatAllocator:
+    """Applies level-up points and detects class changes against classes.json"""
+
+    def __init__(self, class_data):
+        self.set_class_data(class_data)
+
+    def set_class_data(self, class_data):
+        """Resolve class names from a (re)loaded classes pack"""
+        # (weapon, stat) -> class name, resolved once instead of per level
+        self.class_lookup = {
+            (weapon, stat): stat_data.get('class')
+            for weapon, weapon_data in class_data.items()
+            for stat, stat_data in weapon_data.items()
+        }
+
+    def class_for(self, weapon, stat_index):
+        return self.class_lookup.get((weapon, STATS[stat_index]))
+
+    def class_for_stats(self, character):
+        """Get the class of a character's leading stat, or None"""
+        return self.class_lookup.get((character.weapon, leading_stat(character)))
+
+    def level_up(self, character, levels, policy):
+        """Gain levels and allocate their points
+
+        The leading stat (in points) is tracked incrementally, so each level
+        only compares the stats it raised against the current leader.
+
+        Returns:
+            list: (level, old class, new class) for every class change
+        """
+        levels = min(levels, MAX_LEVEL - character.level)
+        if levels <= 0:
+            return []
+
+        values = [character.hp, character.strength, character.speed, character.defense, character.mp]
+        # Compare stats in allocated points so HP/MP's 10x scale doesn't dominate
+        points = [value / scale for value, scale in zip(values, STAT_POINT_VALUES)]
+        leader = max(range(len(STATS)), key=points.__getitem__)
+
+        current_class = character.character_class
+        if current_class is None:
+            current_class = self.class_for(character.weapon, leader)
+        changes = []
+
+        level = character.level
+        target_level = level + levels
+        while level < target_level:
+            allocation = policy.allocate(level + 1)
+
+            # Constant policy whose leader also grows fastest: it can never be
+            # overtaken, so skip straight to the target level
+            if policy.constant and allocation[leader] == max(allocation):
+                remaining = target_level - level
+                for i, gained in enumerate(allocation):
+                    points[i] += gained * remaining
+                level = target_level
+                break
+
+            level += 1
+            for i, gained in enumerate(allocation):
+                points[i] += gained
+            # Only a stat that just grew can overtake the leader
+            new_leader = leader
+            for i, gained in enumerate(allocation):
+                if gained and points[i] > points[new_leader]:
+                    new_leader = i
+            if new_leader == leader:
+                continue
+
+            leader = new_leader
+            new_class = self.class_for(character.weapon, leader)
+            if new_class is not None and new_class != current_class:
+                changes.append((level, current_class, new_class))
+                current_class = new_class
+
+        character.set_stats(*[round(p * scale) for p, scale in zip(points, STAT_POINT_VALUES)])
+        character.level = level
+        character.rank = rank_for_level(level)
+        character.character_class = current_class
+        return changes
+
+    def award_xp(self, character, xp, policy):
+        """Add XP and allocate the points of any levels gained
+
+        Returns:
+            list: Class changes caused by the level ups
+        """
+        level, character.current_xp, gained = apply_xp(character.level, character.current_xp, xp)
+        return self.level_up(character, gained, policy)
+
+    def backfill(self, characters, to_level, policy):
+        """Level many characters up to to_level with the same policy
+
+        Returns:
+            dict: Character name -> class changes, for characters whose class changed
+        """
+        changes = {}
+        for character in characters:
+            character_changes = self.level_up(character, to_level - character.level, policy)
+            if character_changes:
+                changes[character.name] = character_changes
+        return changes
@@ -0,0 +1,112 @@
+# turn_scheduler.py
+# Speed driven turn order backed by a binary heap with lazy invalidation.
+import heapq
+
+# Time units a combatant with 1 Speed waits between actions
+TURN_LENGTH = 1000.0
+# Speed can be debuffed but never to (or below) zero
+MIN_SPEED = 0.1
+
+
+def turn_interval(speed):
+    """Get the time between two actions for a given Speed"""
+    return TURN_LENGTH / max(speed, MIN_SPEED)
+
+
+class TurnScheduler:
+    """Orders combatant turns by next-action time
+
+    Each combatant acts every turn_interval(speed) time units. Taking a turn
+    and changing speed are O(log n); speed changes push a fresh heap entry and
+    leave the old one behind to be skipped when it reaches the top.
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self.heap = []
+        # combatant_id -> [next_time, speed, version, join_order]
+        self.entries = {}
+        self.joined = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, combatant_id):
+        return combatant_id in self.entries
+
+    def add(self, combatant_id, speed, delay=None):
+        """Add a combatant whose first action comes after one full interval (or delay)"""
+        if combatant_id in self.entries:
+            raise ValueError(f"Combatant {combatant_id!r} is already scheduled")
+        next_time = self.time + (turn_interval(speed) if delay is None else delay)
+        entry = [next_time, speed, 0, self.joined]
+        self.joined += 1
+        self.entries[combatant_id] = entry
+        heapq.heappush(self.heap, (next_time, entry[3], 0, combatant_id))
+
+    def remove(self, combatant_id):
+        """Remove a combatant (e.g. on defeat); its heap entry is dropped lazily"""
+        if self.entries.pop(combatant_id, None) is not None:
+            self.stale += 1
+            self._maybe_compact()
+
+    def get_speed(self, combatant_id):
+        return self.entries[combatant_id][1]
+
+    def set_speed(self, combatant_id, speed):
+        """Change a combatant's speed, rescaling the wait until its next action"""
+        entry = self.entries[combatant_id]
+        next_time, old_speed, version, join_order = entry
+        if speed == old_speed:
+            return
+
+        # Keep the fraction of the current wait already elapsed
+        remaining = (next_time - self.time) * max(old_speed, MIN_SPEED) / max(speed, MIN_SPEED)
+        entry[0] = self.time + remaining
+        entry[1] = speed
+        entry[2] = version + 1
+        heapq.heappush(self.heap, (entry[0], join_order, entry[2], combatant_id))
+        self.stale += 1
+        self._maybe_compact()
+
+    def change_speed(self, combatant_id, amount):
+        """Apply a speed buff (positive) or debuff (negative)"""
+        self.set_speed(combatant_id, self.get_speed(combatant_id) + amount)
+
+    def next_turn(self):
+        """Advance time to the next action and return the acting combatant's id"""
+        heap = self.heap
+        entries = self.entries
+        while heap:
+            next_time, join_order, version, combatant_id = heapq.heappop(heap)
+            entry = entries.get(combatant_id)
+            if entry is None or entry[2] != version or entry[3] != join_order:
+                self.stale -= 1
+                continue
+
+            self.time = next_time
+            entry[0] = next_time + turn_interval(entry[1])
+            heapq.heappush(heap, (entry[0], join_order, version, combatant_id))
+            return combatant_id
+        return None
+
+    def upcoming(self, count):
+        """Get the ids of the next count actions without advancing time"""
+        order = []
+        simulated = {combatant_id: entry[0] for combatant_id, entry in self.entries.items()}
+        while simulated and len(order) < count:
+            combatant_id = min(simulated, key=lambda cid: (simulated[cid], self.entries[cid][3]))
+            order.append(combatant_id)
+            simulated[combatant_id] += turn_interval(self.entries[combatant_id][1])
+        return order
+
+    def _maybe_compact(self):
+        """Rebuild the heap once stale entries outnumber live ones"""
+        if self.stale > len(self.entries) + 16:
+            self.heap = [
+                (entry[0], entry[3], entry[2], combatant_id)
+                for combatant_id, entry in self.entries.items()
+            ]
+            heapq.heapify(self.heap)
+            self.stale = 0
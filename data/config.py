@@ -4,18 +4,65 @@
 CLASSES_PATH = "./data/classes.json"
 MONSTERS_PATH = "./data/monsters.json"
 CHARACTERS_PATH = "./data/characters.json"
+# Written by core/balance.py for review; the game does not load it
+TUNED_MONSTERS_PATH = "./data/monsters_tuned.json"
+QUESTS_PATH = "./data/quests.json"
+PROFILE_CHARACTERS_FILE = "anki_leveling_characters.json"
+PROFILE_RUN_HISTORY_FOLDER = "anki_leveling_runs"
+PROFILE_JOURNAL_FILE = "anki_leveling_journal.json"
+PROFILE_QUESTS_FILE = "anki_leveling_quests.jsonl"
 
 # WINDOW
 MAIN_LENGTH = 1000
 MAIN_WIDTH = 600
 VIEWER_LENGTH = 800
 VIEWER_WIDTH = 500
+LEADERBOARD_SIZE = 50
+HISTORY_CHART_DAYS = 90
+HISTORY_CHART_HEIGHT = 160
+# Ability cards built per batch as a viewer list scrolls
+VIEWER_ABILITY_BATCH = 6
+# Level/XP summary on the deck browser; the character is the first of the
+# roster unless one is named here
+QUICK_STATS_ENABLED = True
+QUICK_STATS_CHARACTER = ""
 
 FONT_SIZE_SMALL = "12px"
 FONT_SIZE_MEDIUM = "16px"
 FONT_SIZE_BIG = "20px"
 FONT_COLOR = "#000000"
 
+# DEBUG
+PERF_ENABLED = False
+# Trace allocations around data loading and viewer lifetimes (slows Anki down)
+MEMORY_DIAGNOSTICS_ENABLED = False
+
+# IDLE WORK
+# Time slice given to background game maintenance per timer tick
+IDLE_SLICE_MS = 4
+IDLE_TIMER_INTERVAL_MS = 16
+# Background work resumes in the reviewer after this long without activity
+IDLE_REVIEW_PAUSE_MS = 30000
+
+# CACHE
+CARD_CACHE_ENABLED = True
+CARD_CACHE_PATH = "./user_files/card_cache"
+SUMMARY_CACHE_PATH = "./user_files/summary_cache"
+CARD_CACHE_MAX_BYTES = 20 * 1024 * 1024
+CARD_CACHE_MEMORY_ITEMS = 200
+MONSTER_ABILITY_CARD_WIDTH = 1080
+CLASS_ABILITY_CARD_WIDTH = 700
+# Ability descriptions are laid out once per font and width bucket and reused
+# while a viewer is resized within the bucket
+TEXT_LAYOUT_WIDTH_BUCKET = 32
+TEXT_LAYOUT_CACHE_ITEMS = 2000
+
+# LANGUAGE
+# Data pack text is shown through data/locales/<LOCALE>.json; "en" is the
+# packs' own text
+LOCALE = "en"
+LOCALES_PATH = "./data/locales"
+
 # WEAPONS
 WEAPONS_NAME_0 = "Sword"
 WEAPONS_NAME_1 = "Hammer"
@@ -114,4 +161,46 @@ MONSTER_TIER_BORDER_COLOR_3 = "#F39C12"
 
 MONSTER_TIER_BACKGROUND_COLOR_0 = "#B5EAD7"
 MONSTER_TIER_BACKGROUND_COLOR_1 = "#C7CEEA"
-MONSTER_TIER_BACKGROUND_COLOR_2 = "#F9E79F"
\ No newline at end of file
+MONSTER_TIER_BACKGROUND_COLOR_2 = "#F9E79F"
+
+# Relative spawn weight of each monster tier (tier1, tier2, tier3) per dungeon rank
+MONSTER_TIER_SPAWN_WEIGHTS = {
+    "F": (100, 0, 0),
+    "E": (80, 20, 0),
+    "D": (60, 35, 5),
+    "C": (40, 45, 15),
+    "B": (20, 50, 30),
+    "A": (10, 40, 50),
+    "S": (0, 30, 70)
+}
+
+# BALANCE
+# Player win rate the tuning tool aims for per dungeon rank
+TUNING_TARGET_WIN_RATES = {
+    "F": 0.90,
+    "E": 0.85,
+    "D": 0.80,
+    "C": 0.72,
+    "B": 0.65,
+    "A": 0.58,
+    "S": 0.50
+}
+# Added to the rank's target per monster tier (tier1, tier2, tier3)
+TUNING_TIER_WIN_RATE_OFFSETS = (0.05, 0.0, -0.05)
+# Monster stat multipliers the search stays within
+TUNING_MULTIPLIER_RANGE = (0.25, 4.0)
+# Simulated fights per win rate estimate and bisection steps per search
+TUNING_FIGHTS = 2000
+TUNING_ITERATIONS = 10
+# Searches ending further than this from their target win rate are flagged
+TUNING_WIN_RATE_TOLERANCE = 0.03
+# Points per level a simulated player puts into their class stat
+TUNING_FOCUS_POINTS = 6
+
+# JOURNAL
+# XP the active character earns per review, by answer (Again, Hard, Good, Easy)
+REVIEW_XP = (1, 2, 3, 4)
+# Character changes that can be undone, newest first
+JOURNAL_UNDO_DEPTH = 100
+# Journal entries per device file before it is compacted into a checkpoint
+JOURNAL_CHECKPOINT_INTERVAL = 500
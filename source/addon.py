@@ -0,0 +1,401 @@
+# addon.py
+# Anki adapter layer: menus, hooks and dialogs on top of the pure-Python core
+# import the main window object (mw) from aqt
+from aqt import mw, gui_hooks
+# import the "show info" tool from utils.py
+from aqt.utils import showInfo, qconnect, tooltip
+# import all of the Qt GUI library
+from aqt.qt import *
+import os
+# import config values
+from ..data import config
+# import the ClassViewer and MonsterViewer from the separate modules
+from .class_viewer import ClassViewer
+from .monster_viewer import MonsterViewer
+from .game_viewer import GameViewer
+from .character_viewer import CharacterViewer
+from .perf_viewer import PerfViewer
+from .memory_viewer import MemoryViewer, live_dialogs, delete_pending
+from .leaderboard_viewer import LeaderboardViewer
+from .roster_transfer import exportCharacters, importCharacters
+from .card_cache import get_card_cache
+from .idle_runner import IdleRunner
+# import the pure-Python game core
+from ..core import memory, perf
+from ..core.settings import apply_overrides
+from ..core.character_registry import CharacterRegistry
+from ..core.character_journal import CharacterJournal
+from ..core.stat_allocation import StatAllocator, BalancedPolicy
+from ..core.leaderboard import Leaderboard
+from ..core.run_history import RunHistoryStore
+from ..core.spawn_tables import SpawnTables
+from ..core.dungeon_run import run_dungeon
+from ..core.idle_scheduler import IdleScheduler, PRIORITY_LOW, PRIORITY_NORMAL
+from ..core.data_loader import read_json_data, resolve_path
+from ..core.pack_summary import load_summary
+from ..core.quick_stats import QuickStats, OPEN_COMMAND
+from ..core.quests import QuestBook, QuestTracker
+from ..core.localization import tr
+
+# Global variables to store data
+CLASS_DATA = {}
+MONSTER_DATA = {}
+
+def load_json_data(json_path, default_value):
+    """Generic function to load JSON data from a file
+    
+    Args:
+        json_path (str): Path to the JSON file relative to addon directory
+        default_value: Default value to use if file doesn't exist
+    
+    Returns:
+        dict/list: The loaded JSON data or default value
+    """
+    try:
+        return read_json_data(json_path)
+    except FileNotFoundError:
+        showInfo(f"{os.path.basename(json_path)} not found at:\n{resolve_path(json_path)}\n\nPlease ensure the file exists in the addon directory.")
+        return default_value
+    except Exception as e:
+        showInfo(f"Error loading {os.path.basename(json_path)}: {str(e)}")
+        return default_value
+
+def applyUserConfig(user_config=None):
+    """Apply the add-on config (Tools > Add-ons > Config) on top of data/config.py"""
+    if user_config is None:
+        user_config = mw.addonManager.getConfig(__name__)
+    errors = apply_overrides(user_config)
+    perf.set_enabled(config.PERF_ENABLED)
+    memory.set_enabled(config.MEMORY_DIAGNOSTICS_ENABLED)
+    if errors:
+        showInfo("Some Anki Leveling settings were ignored:\n\n" + "\n".join(errors))
+
+def onConfigUpdated(user_config):
+    """Re-derive the lookup tables after the user edits the add-on config"""
+    applyUserConfig(user_config)
+    get_card_cache().config_changed()
+    QUICK_STATS.invalidate()
+    updateSpawnTables()
+    view_perf_action.setVisible(config.PERF_ENABLED)
+    view_memory_action.setVisible(config.MEMORY_DIAGNOSTICS_ENABLED)
+
+# User overrides must be in place before anything reads the config
+applyUserConfig()
+mw.addonManager.setConfigUpdatedAction(__name__, onConfigUpdated)
+
+# Load data when the module is imported
+with memory.track("load_data"):
+    CLASS_DATA = load_json_data(config.CLASSES_PATH, {})
+    MONSTER_DATA = load_json_data(config.MONSTERS_PATH, {})
+
+def loadPackSummary():
+    """Get the per-class and per-monster summaries, cached per data-pack hash"""
+    try:
+        return load_summary(CLASS_DATA, MONSTER_DATA, resolve_path(config.SUMMARY_CACHE_PATH))
+    except Exception as e:
+        showInfo(f"Error summarising the data packs: {str(e)}")
+        return None
+
+def updateSpawnTables():
+    """Rebuild the spawn tables of the monster categories and tier weights that changed"""
+    try:
+        SPAWN_TABLES.update(MONSTER_DATA, config.MONSTER_TIER_SPAWN_WEIGHTS)
+    except Exception as e:
+        showInfo(f"Error building the monster spawn tables: {str(e)}")
+
+PACK_SUMMARY = loadPackSummary()
+
+# Weighted monster draws per dungeon rank
+SPAWN_TABLES = SpawnTables()
+updateSpawnTables()
+MAIN_CHARACTER = None
+
+# Characters are stored per Anki profile and only loaded while it is open
+CHARACTER_REGISTRY = CharacterRegistry(
+    config.PROFILE_CHARACTERS_FILE,
+    resolve_path(config.CHARACTERS_PATH)
+)
+
+STAT_ALLOCATOR = StatAllocator(CLASS_DATA)
+# Levels gained from reviews and dungeons split their points evenly
+REVIEW_LEVEL_POLICY = BalancedPolicy()
+# Versioned character changes: review XP undo and merging other devices' rosters
+CHARACTER_JOURNAL = CharacterJournal(CHARACTER_REGISTRY, config.PROFILE_JOURNAL_FILE, STAT_ALLOCATOR, REVIEW_LEVEL_POLICY)
+
+# Dungeon run history, one file per character inside the profile folder
+RUN_HISTORY = RunHistoryStore(config.PROFILE_RUN_HISTORY_FOLDER, CHARACTER_JOURNAL)
+
+# Game maintenance runs in short slices on the main loop, never mid-review
+IDLE_RUNNER = IdleRunner(IdleScheduler(), mw)
+IDLE_RUNNER.install_hooks()
+
+def scheduleRosterRefresh(name, steps):
+    """Queue the re-check of a replaced roster as an idle job"""
+    IDLE_RUNNER.submit(name, steps, PRIORITY_NORMAL)
+
+# Leaderboards follow the registry, updating per changed character
+LEADERBOARD = Leaderboard(schedule=scheduleRosterRefresh)
+CHARACTER_REGISTRY.add_listener(LEADERBOARD.on_roster_changed)
+
+def onCharacterChanged(registry, character):
+    """Save changed characters and their run history once the user is idle"""
+    if character is None or not registry.is_open:
+        return
+    IDLE_RUNNER.submit("save_characters", registry.save_steps(), PRIORITY_NORMAL)
+    IDLE_RUNNER.submit("flush_run_history", RUN_HISTORY.flush_steps(), PRIORITY_LOW)
+    IDLE_RUNNER.submit("flush_journal", CHARACTER_JOURNAL.flush_steps(), PRIORITY_LOW)
+
+CHARACTER_REGISTRY.add_listener(onCharacterChanged)
+
+# Deck browser summary of the active character, re-rendered only when it changes
+QUICK_STATS = QuickStats(CHARACTER_REGISTRY)
+
+# Quests indexed by the character field they watch; completions are logged per profile
+try:
+    QUEST_BOOK = QuestBook.from_list(load_json_data(config.QUESTS_PATH, []))
+except ValueError as e:
+    showInfo(f"Error loading {os.path.basename(config.QUESTS_PATH)}: {str(e)}")
+    QUEST_BOOK = QuestBook([])
+QUEST_TRACKER = QuestTracker(QUEST_BOOK, config.PROFILE_QUESTS_FILE, scheduleRosterRefresh)
+CHARACTER_REGISTRY.add_listener(QUEST_TRACKER.on_roster_changed)
+
+def onQuestsCompleted(tracker, character, quests):
+    """Announce completed quests and log them once the user is idle"""
+    names = ", ".join(tr(quest.name) for quest in quests[:3])
+    more = f" and {len(quests) - 3} more" if len(quests) > 3 else ""
+    tooltip(f"{character.name} completed {names}{more}")
+    IDLE_RUNNER.submit("flush_quests", tracker.flush_steps(), PRIORITY_LOW)
+
+QUEST_TRACKER.add_listener(onQuestsCompleted)
+
+def onDeckBrowserWillRenderContent(deck_browser, content):
+    """Append the cached quick-stats block below the deck list"""
+    if config.QUICK_STATS_ENABLED:
+        content.stats += QUICK_STATS.html()
+
+def onWebviewDidReceiveJsMessage(handled, message, context):
+    """Open the character viewer when the quick-stats block is clicked"""
+    if message != OPEN_COMMAND:
+        return handled
+    showCharacterData()
+    return (True, None)
+
+gui_hooks.deck_browser_will_render_content.append(onDeckBrowserWillRenderContent)
+gui_hooks.webview_did_receive_js_message.append(onWebviewDidReceiveJsMessage)
+
+if config.CARD_CACHE_ENABLED:
+    IDLE_RUNNER.submit("scan_card_cache", get_card_cache().refresh_disk_usage_steps(), PRIORITY_LOW)
+
+def onProfileDidOpen():
+    """Load the roster of the profile that was just opened
+
+    Each subsystem opens on its own, so one that fails to load leaves the
+    others working.
+    """
+    profile_folder = mw.pm.profileFolder()
+    subsystems = (
+        ("characters", lambda: CHARACTER_REGISTRY.open_profile(profile_folder)),
+        ("dungeon history", lambda: RUN_HISTORY.open_profile(profile_folder)),
+        ("character journal", lambda: CHARACTER_JOURNAL.open(profile_folder, mw.col.media.dir())),
+        ("quests", lambda: QUEST_TRACKER.open_profile(profile_folder, CHARACTER_REGISTRY.characters))
+    )
+    for name, open_subsystem in subsystems:
+        try:
+            open_subsystem()
+        except Exception as e:
+            showInfo(f"Error loading {name} for this profile: {str(e)}")
+    IDLE_RUNNER.submit("merge_journals", CHARACTER_JOURNAL.merge_steps(), PRIORITY_LOW)
+    IDLE_RUNNER.submit("flush_quests", QUEST_TRACKER.flush_steps(), PRIORITY_LOW)
+
+def onProfileWillClose():
+    """Save and unload the roster of the profile being closed"""
+    # Checkpoints need the roster, so the journal closes first
+    subsystems = (
+        ("character journal", CHARACTER_JOURNAL.close),
+        ("quests", QUEST_TRACKER.close_profile),
+        ("characters", CHARACTER_REGISTRY.close_profile),
+        ("dungeon history", RUN_HISTORY.close_profile)
+    )
+    for name, close_subsystem in subsystems:
+        try:
+            close_subsystem()
+        except Exception as e:
+            showInfo(f"Error saving {name} for this profile: {str(e)}")
+
+def onSyncDidFinish():
+    """Replay character changes other devices synced in"""
+    IDLE_RUNNER.submit("merge_journals", CHARACTER_JOURNAL.merge_steps(), PRIORITY_LOW)
+
+def onReviewerDidAnswerCard(reviewer, card, ease):
+    """Award review XP to the active character, journaled so it can be undone"""
+    character = QUICK_STATS.active_character()
+    if character is None or not CHARACTER_JOURNAL.is_open:
+        return
+    xp = config.REVIEW_XP[min(ease, len(config.REVIEW_XP)) - 1]
+    revlog_id = mw.col.db.scalar("select max(id) from revlog where cid = ?", card.id)
+    with CHARACTER_JOURNAL.change(character, 'review', revlog_id):
+        STAT_ALLOCATOR.award_xp(character, xp, REVIEW_LEVEL_POLICY)
+
+def onStateDidUndo(changes):
+    """Take back the XP of reviews whose revlog entry Anki's undo removed"""
+    entry = CHARACTER_JOURNAL.last_entry()
+    while entry is not None and entry.label == 'review' and not mw.col.db.scalar("select 1 from revlog where id = ?", entry.ref):
+        CHARACTER_JOURNAL.undo()
+        entry = CHARACTER_JOURNAL.last_entry()
+
+gui_hooks.profile_did_open.append(onProfileDidOpen)
+gui_hooks.profile_will_close.append(onProfileWillClose)
+gui_hooks.sync_did_finish.append(onSyncDidFinish)
+gui_hooks.reviewer_did_answer_card.append(onReviewerDidAnswerCard)
+gui_hooks.state_did_undo.append(onStateDidUndo)
+
+def runDialog(create_dialog):
+    """Open a modal dialog that is deleted, with its widget tree, once closed
+
+    Args:
+        create_dialog (callable): Builds the dialog, parented to mw
+    """
+    with memory.track("open_close") as record:
+        dialog = create_dialog()
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        if record is not None:
+            record.label = f"viewer.{type(dialog).__name__}"
+        dialog.exec()
+        del dialog
+        if record is not None:
+            # Flush the deleteLater from closing so the record only shows leaks
+            delete_pending()
+            record.notes['live dialogs'] = sum(live_dialogs(mw).values())
+
+def showClassData():
+    """Function to display the class data in a new window"""
+    if not CLASS_DATA:
+        showInfo("No class data loaded. Please ensure classes.json exists in the addon directory and reload the data.")
+        return
+       
+    # Pass the class data to the ClassViewer
+    runDialog(lambda: ClassViewer(CLASS_DATA, mw, PACK_SUMMARY))
+
+def showMonsterData():
+    """Function to display the monster data in a new window"""
+    if not MONSTER_DATA:
+        showInfo("No monster data loaded. Please ensure monsters.json exists in the addon directory and reload the data.")
+        return
+       
+    # Pass the monster data to the MonsterViewer
+    runDialog(lambda: MonsterViewer(MONSTER_DATA, mw, PACK_SUMMARY))
+
+def showCharacterData():
+    """Function to display the character manager in a new window"""
+    if not CHARACTER_REGISTRY.characters:
+        showInfo("No character data available for this profile.")
+        return
+        
+    runDialog(lambda: CharacterViewer(CHARACTER_REGISTRY.characters, mw, RUN_HISTORY))
+
+def showLeaderboards():
+    """Function to display the character leaderboards in a new window"""
+    if not CHARACTER_REGISTRY.characters:
+        showInfo("No character data available for this profile.")
+        return
+
+    runDialog(lambda: LeaderboardViewer(LEADERBOARD, mw))
+
+def showPerformanceData():
+    """Function to display recorded performance spans in a new window"""
+    runDialog(lambda: PerfViewer(mw))
+
+def showMemoryData():
+    """Function to display memory diagnostics in a new window"""
+    runDialog(lambda: MemoryViewer(mw, mw))
+
+def enterDungeon():
+    """Send the active character into a dungeon of its rank and record the run"""
+    character = QUICK_STATS.active_character()
+    if character is None or not CHARACTER_JOURNAL.is_open:
+        showInfo("No character data available for this profile.")
+        return
+    try:
+        encounter = SPAWN_TABLES.draw_encounter(character.rank)
+        result = run_dungeon(character, character.rank, encounter, CLASS_DATA, MONSTER_DATA)
+    except (KeyError, ValueError) as e:
+        showInfo(f"{character.name} cannot enter a dungeon: {str(e)}")
+        return
+    RUN_HISTORY.record(character, result.rank, result.passed, result.duration, result.monsters_defeated)
+    if result.xp:
+        with CHARACTER_JOURNAL.change(character, 'dungeon', undoable=False):
+            STAT_ALLOCATOR.award_xp(character, result.xp, REVIEW_LEVEL_POLICY)
+    outcome = "cleared" if result.passed else "failed"
+    tooltip(f"{character.name} {outcome} a {result.rank} rank dungeon: {result.monsters_defeated} monsters defeated, {result.xp} XP")
+
+def reloadDataPacks():
+    """Re-read the data packs after they were edited and refresh what is derived from them"""
+    global CLASS_DATA, MONSTER_DATA, PACK_SUMMARY
+    with memory.track("load_data"):
+        CLASS_DATA = load_json_data(config.CLASSES_PATH, {})
+        MONSTER_DATA = load_json_data(config.MONSTERS_PATH, {})
+    PACK_SUMMARY = loadPackSummary()
+    STAT_ALLOCATOR.set_class_data(CLASS_DATA)
+    updateSpawnTables()
+    tooltip("Data packs reloaded")
+
+def startAnkiLeveling():
+    """function to display game in a new window"""
+    runDialog(lambda: GameViewer(mw))
+
+# Add separator for visual organization
+mw.form.menuTools.addSeparator()
+
+# Game-related actions
+start_anki_leveling = QAction("Start Anki Leveling", mw)
+qconnect(start_anki_leveling.triggered, startAnkiLeveling)
+mw.form.menuTools.addAction(start_anki_leveling)
+
+enter_dungeon_action = QAction("Enter Dungeon", mw)
+qconnect(enter_dungeon_action.triggered, enterDungeon)
+mw.form.menuTools.addAction(enter_dungeon_action)
+
+# Class-related actions
+view_class_action = QAction("View Class Data", mw)
+qconnect(view_class_action.triggered, showClassData)
+mw.form.menuTools.addAction(view_class_action)
+
+# Monster-related actions
+view_monster_action = QAction("View Monster Bestiary", mw)
+qconnect(view_monster_action.triggered, showMonsterData)
+mw.form.menuTools.addAction(view_monster_action)
+
+# Character-related actions
+view_character_action = QAction("View Characters", mw)
+qconnect(view_character_action.triggered, showCharacterData)
+mw.form.menuTools.addAction(view_character_action)
+
+view_leaderboard_action = QAction("View Leaderboards", mw)
+qconnect(view_leaderboard_action.triggered, showLeaderboards)
+mw.form.menuTools.addAction(view_leaderboard_action)
+
+export_character_action = QAction("Export Characters...", mw)
+qconnect(export_character_action.triggered, lambda: exportCharacters(CHARACTER_REGISTRY, IDLE_RUNNER))
+mw.form.menuTools.addAction(export_character_action)
+
+import_character_action = QAction("Import Characters...", mw)
+qconnect(import_character_action.triggered, lambda: importCharacters(CHARACTER_REGISTRY, IDLE_RUNNER))
+mw.form.menuTools.addAction(import_character_action)
+
+reload_data_action = QAction("Reload Data Packs", mw)
+qconnect(reload_data_action.triggered, reloadDataPacks)
+mw.form.menuTools.addAction(reload_data_action)
+
+# Debug actions (hidden unless instrumentation is enabled in config)
+view_perf_action = QAction("Performance", mw)
+qconnect(view_perf_action.triggered, showPerformanceData)
+view_perf_action.setVisible(config.PERF_ENABLED)
+mw.form.menuTools.addAction(view_perf_action)
+
+view_memory_action = QAction("Memory", mw)
+qconnect(view_memory_action.triggered, showMemoryData)
+view_memory_action.setVisible(config.MEMORY_DIAGNOSTICS_ENABLED)
+mw.form.menuTools.addAction(view_memory_action)
+
+# Add separator for visual organization
+mw.form.menuTools.addSeparator()
\ No newline at end of file
@@ -0,0 +1,259 @@
+# card_cache.py
+# Ability card sections painted once to a QPixmap and reused across viewers and sessions.
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from aqt.qt import *
+from ..data import config
+from ..core import perf
+from ..core.data_loader import resolve_path
+from ..core.localization import get_strings, tr
+
+# Bump when the card layout changes so stale images are never reused
+CARD_RENDER_VERSION = 3
+# Files measured per idle step of the disk usage scan
+SCAN_CHUNK_SIZE = 200
+
+
+def _config_fingerprint():
+    """Hash every config constant so color/font edits invalidate the cache"""
+    values = {name: repr(getattr(config, name)) for name in dir(config) if name.isupper()}
+    return hashlib.sha1(json.dumps(values, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class AbilityCardCache:
+    """Two level (memory LRU + size capped disk) cache of rendered ability cards"""
+
+    def __init__(self, cache_dir, max_bytes, memory_items):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory = OrderedDict()
+        self.disk_usage = None
+        self.fingerprint = _config_fingerprint()
+
+    def config_changed(self):
+        """Pick up edited config values; cards drawn with the old ones are no longer hit"""
+        self.fingerprint = _config_fingerprint()
+        self.memory.clear()
+
+    def card_key(self, ability, theme, width, ratio, locale=""):
+        """Build the cache key from the ability content, render theme and string table"""
+        content = {key: ability[key] for key in ability.keys()}
+        payload = json.dumps([CARD_RENDER_VERSION, self.fingerprint, theme, width, ratio, locale, content], sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def card_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key, ratio):
+        """Get a cached pixmap from memory or disk, or None on a miss"""
+        pixmap = self.memory.get(key)
+        if pixmap is not None:
+            self.memory.move_to_end(key)
+            perf.count('card_cache.memory_hit')
+            return pixmap
+
+        path = self.card_path(key)
+        if not os.path.exists(path):
+            perf.count('card_cache.miss')
+            return None
+
+        pixmap = QPixmap()
+        if not pixmap.load(path):
+            perf.count('card_cache.miss')
+            return None
+        pixmap.setDevicePixelRatio(ratio)
+
+        # Touch the file so disk eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.remember(key, pixmap)
+        perf.count('card_cache.disk_hit')
+        return pixmap
+
+    def put(self, key, pixmap):
+        """Store a pixmap in memory and on disk, evicting old cards if needed"""
+        self.remember(key, pixmap)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.card_path(key)
+            if pixmap.save(path, "PNG"):
+                if self.disk_usage is None:
+                    self.disk_usage = self.scan_disk_usage()
+                else:
+                    self.disk_usage += os.path.getsize(path)
+                if self.disk_usage > self.max_bytes:
+                    self.evict()
+        except OSError:
+            # Disk cache is best effort; the memory copy is still usable
+            pass
+
+    def remember(self, key, pixmap):
+        self.memory[key] = pixmap
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def list_disk_entries(self):
+        """Get (mtime, size, path) for every card on disk"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.png'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def scan_disk_usage(self):
+        return sum(size for _, size, _ in self.list_disk_entries())
+
+    def refresh_disk_usage_steps(self):
+        """Generator measuring the disk cache ahead of time so the first put() doesn't have to
+
+        For the idle scheduler: each step stats SCAN_CHUNK_SIZE files. A put()
+        in between measures the cache itself, and then the scan stops.
+        """
+        if not os.path.isdir(self.cache_dir):
+            self.disk_usage = 0
+            return
+        usage = 0
+        with os.scandir(self.cache_dir) as entries:
+            for count, entry in enumerate(entries, 1):
+                if entry.is_file() and entry.name.endswith('.png'):
+                    usage += entry.stat().st_size
+                if count % SCAN_CHUNK_SIZE == 0:
+                    yield
+                    if self.disk_usage is not None:
+                        return
+        if self.disk_usage is None:
+            self.disk_usage = usage
+
+    def evict(self):
+        """Delete least recently used cards until the disk cache is under 90% of its cap"""
+        entries = sorted(self.list_disk_entries())
+        usage = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+                usage -= size
+                perf.count('card_cache.evicted')
+            except OSError:
+                pass
+        self.disk_usage = usage
+
+    def clear(self):
+        """Remove every cached card from memory and disk"""
+        self.memory.clear()
+        for _, _, path in self.list_disk_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.disk_usage = 0
+
+    def render_sections(self, build_frame, sections, width, ratio, background):
+        """Lay a whole card out off screen at a fixed width and paint its cached sections
+
+        Sections are painted in place, so they keep the style sheet rules the
+        card frame cascades to them, over the card's background color.
+
+        Returns:
+            list: A pixmap per cached section, None for live ones
+        """
+        frame = build_frame()
+        widgets = [build() for build, _ in sections]
+        for widget in widgets:
+            frame.layout().addWidget(widget)
+        frame.setAttribute(Qt.WidgetAttribute.WA_DontShowOnScreen)
+        frame.setFixedWidth(width)
+        frame.show()
+        frame.adjustSize()
+        pixmaps = []
+        for widget, (_, cached) in zip(widgets, sections):
+            if not cached:
+                pixmaps.append(None)
+                continue
+            pixmap = QPixmap(widget.size() * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(QColor(background))
+            widget.render(pixmap, QPoint(), QRegion(), QWidget.RenderFlag.DrawChildren)
+            pixmaps.append(pixmap)
+        frame.hide()
+        frame.deleteLater()
+        return pixmaps
+
+    def create_card(self, ability, theme, width, build_frame, sections, background):
+        """Get a widget displaying the ability card, painting its static sections only on a cache miss
+
+        Args:
+            ability: Ability record or dictionary
+            theme (str): Identifies the viewer style the card is drawn with
+            width (int): Width in logical pixels the cached sections are laid out at
+            build_frame (callable): Builds the empty, styled card frame with a box layout
+            sections (list): (build, cached) pairs in card order. Cached sections
+                are shown as pixmaps; the others, e.g. a description that has to
+                reflow with the viewer, are built as live widgets every time
+            background (str): Card color behind the cached sections
+
+        Returns:
+            QWidget: The card frame
+        """
+        ratio = QApplication.primaryScreen().devicePixelRatio() if QApplication.primaryScreen() else 1.0
+        locale_key = get_strings().cache_key()
+        keys = [
+            self.card_key(ability, f"{theme}:{index}", width, ratio, locale_key) if cached else None
+            for index, (_, cached) in enumerate(sections)
+        ]
+
+        pixmaps = [self.get(key, ratio) if key else None for key in keys]
+        if any(key and pixmap is None for key, pixmap in zip(keys, pixmaps)):
+            pixmaps = self.render_sections(build_frame, sections, width, ratio, background)
+            for key, pixmap in zip(keys, pixmaps):
+                if key:
+                    self.put(key, pixmap)
+
+        card = build_frame()
+        for (build, cached), pixmap in zip(sections, pixmaps):
+            if cached:
+                section = QLabel()
+                # The card frame's QFrame rules would otherwise frame the label too
+                section.setStyleSheet("border: none; margin: 0px; padding: 0px; background: transparent;")
+                section.setPixmap(pixmap)
+            else:
+                section = build()
+            card.layout().addWidget(section)
+        card.setToolTip(tr(ability['description']))
+        card.setAccessibleName(tr(ability['name']))
+        return card
+
+
+def build_card(build_frame, sections):
+    """Build an ability card with every section as a live widget, for when the cache is off"""
+    card = build_frame()
+    for build, _ in sections:
+        card.layout().addWidget(build())
+    return card
+
+
+_card_cache = None
+
+def get_card_cache():
+    """Get the shared ability card cache"""
+    global _card_cache
+    if _card_cache is None:
+        _card_cache = AbilityCardCache(
+            resolve_path(config.CARD_CACHE_PATH),
+            config.CARD_CACHE_MAX_BYTES,
+            config.CARD_CACHE_MEMORY_ITEMS
+        )
+    return _card_cache
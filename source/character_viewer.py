@@ -1,18 +1,21 @@
 from aqt.qt import *
 from ..data import config
-from .character import Character
+from ..core import perf
+from ..core.settings import get_tables
+from .history_chart import HistoryChart
 
 class CharacterViewer(QDialog):
-    def __init__(self, character_data, parent=None):
+    def __init__(self, characters, parent=None, run_history=None):
         super().__init__(parent)
-        self.character_data = character_data
-        self.characters = [Character(char_data) for char_data in character_data]
+        self.characters = characters
+        self.run_history = run_history
         self.current_character_index = 0
         
         self.setWindowTitle("Character Viewer")
         self.setGeometry(50, 50, config.VIEWER_LENGTH, config.VIEWER_WIDTH)
         self.setupUI()
         
+    @perf.timed()
     def setupUI(self):
         layout = QVBoxLayout()
         
@@ -47,6 +50,8 @@ class CharacterViewer(QDialog):
         self.create_overview_section(scroll_layout)
         self.create_stats_section(scroll_layout)
         self.create_dungeon_section(scroll_layout)
+        if self.run_history is not None:
+            self.create_history_section(scroll_layout)
         
         scroll_widget.setLayout(scroll_layout)
         scroll_area.setWidget(scroll_widget)
@@ -81,6 +86,7 @@ class CharacterViewer(QDialog):
         if self.characters:
             self.update_display()
     
+    @perf.timed()
     def create_overview_section(self, parent_layout):
         """Create the overview section showing basic character info"""
         # Section header
@@ -152,6 +158,7 @@ class CharacterViewer(QDialog):
         parent_layout.addLayout(self.overview_info)
         parent_layout.addSpacing(20)
     
+    @perf.timed()
     def create_stats_section(self, parent_layout):
         """Create the stats section showing character statistics"""
         # Section header
@@ -174,14 +181,8 @@ class CharacterViewer(QDialog):
         self.stats_grid.setSpacing(20)
         
         # Create stat displays
-        self.stat_displays = {}
-        stats_config = [
-            ('HP', config.STATS_BACKGROUND_COLOR_HP, config.STATS_BORDER_COLOR_HP),
-            ('Strength', config.STATS_BACKGROUND_COLOR_STR, config.STATS_BORDER_COLOR_STR),
-            ('Speed', config.STATS_BACKGROUND_COLOR_SPD, config.STATS_BORDER_COLOR_SPD),
-            ('Defense', config.STATS_BACKGROUND_COLOR_DEF, config.STATS_BORDER_COLOR_DEF),
-            ('MP', config.STATS_BACKGROUND_COLOR_MP, config.STATS_BORDER_COLOR_MP)
-        ]
+        self.stat_displays = []
+        stats_config = [(style.name, style.background, style.border) for style in get_tables().stats]
         
         for i, (stat_name, bg_color, border_color) in enumerate(stats_config):
             row = i // 3
@@ -213,11 +214,12 @@ class CharacterViewer(QDialog):
             stat_frame.setLayout(stat_layout)
             
             self.stats_grid.addWidget(stat_frame, row, col)
-            self.stat_displays[stat_name] = stat_value_label
+            self.stat_displays.append(stat_value_label)
         
         parent_layout.addLayout(self.stats_grid)
         parent_layout.addSpacing(20)
     
+    @perf.timed()
     def create_dungeon_section(self, parent_layout):
         """Create the dungeon section showing dungeon records"""
         # Section header
@@ -307,6 +309,28 @@ class CharacterViewer(QDialog):
         parent_layout.addLayout(self.dungeon_grid)
         parent_layout.addSpacing(20)
     
+    @perf.timed()
+    def create_history_section(self, parent_layout):
+        """Create the section charting recent daily dungeon runs"""
+        # Section header
+        section_header = QLabel(f"Dungeon Runs (Last {config.HISTORY_CHART_DAYS} Days)")
+        section_header.setStyleSheet(f"""
+            font-size: {config.FONT_SIZE_MEDIUM}; 
+            font-weight: bold; 
+            color: #2E86AB; 
+            padding: 15px; 
+            background-color: #f8f9fa; 
+            border-radius: 8px; 
+            margin: 20px 0 15px 0;
+            border: 2px solid #e9ecef;
+        """)
+        section_header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        parent_layout.addWidget(section_header)
+        
+        self.history_chart = HistoryChart()
+        parent_layout.addWidget(self.history_chart)
+        parent_layout.addSpacing(20)
+    
     def on_character_changed(self, index):
         """Handle character selection change"""
         self.current_character_index = index
@@ -331,11 +355,10 @@ class CharacterViewer(QDialog):
         self.overview_labels['date_last_adventure'].setText(character.date_last_adventure)
         
         # Update stats section
-        self.stat_displays['HP'].setText(str(character.hp))
-        self.stat_displays['Strength'].setText(str(character.strength))
-        self.stat_displays['Speed'].setText(str(character.speed))
-        self.stat_displays['Defense'].setText(str(character.defense))
-        self.stat_displays['MP'].setText(str(character.mp))
+        # Labels follow the stat vector order of the lookup tables
+        values = (character.hp, character.strength, character.speed, character.defense, character.mp)
+        for label, value in zip(self.stat_displays, values):
+            label.setText(str(value))
         
         # Update dungeon section
         self.total_passes_label.setText(f"Total Passes: {character.get_total_dungeon_passes()}")
@@ -345,4 +368,9 @@ class CharacterViewer(QDialog):
         for rank in ['F', 'E', 'D', 'C', 'B', 'A', 'S']:
             record = character.get_dungeon_record(rank)
             self.dungeon_displays[rank]['passes'].setText(f"Passes: {record['pass']}")
-            self.dungeon_displays[rank]['fails'].setText(f"Fails: {record['fail']}")
\ No newline at end of file
+            self.dungeon_displays[rank]['fails'].setText(f"Fails: {record['fail']}")
+        
+        # Update history chart from the precomputed daily rollups
+        if self.run_history is not None:
+            history = self.run_history.get(character.name)
+            self.history_chart.set_totals(history.recent_daily_totals(config.HISTORY_CHART_DAYS))
\ No newline at end of file
@@ -1,15 +1,23 @@
 # character_viewer.py
 from aqt.qt import *
 from ..data import config
+from ..core import perf
+from ..core.localization import tr
+from ..core.settings import get_tables
+from .card_cache import build_card, get_card_cache
+from .lazy_widgets import LazyTabWidget, LazyScrollArea
+from .text_layout import StaticTextLabel
 
 class ClassViewer(QDialog):
-    def __init__(self, character_data, parent=None):
+    def __init__(self, character_data, parent=None, summary=None):
         super().__init__(parent)
         self.character_data = character_data
+        self.summary = summary
         self.setWindowTitle("Character Data Viewer")
         self.setGeometry(50, 50, config.VIEWER_LENGTH, config.VIEWER_WIDTH)
         self.setupUI()
         
+    @perf.timed()
     def setupUI(self):
         layout = QVBoxLayout()
         
@@ -19,8 +27,8 @@ class ClassViewer(QDialog):
         title.setStyleSheet(f"font-size: {config.FONT_SIZE_MEDIUM}; font-weight: bold; padding: 10px; color: {config.FONT_COLOR};")
         layout.addWidget(title)
         
-        # Main tab widget for weapons
-        self.main_tab_widget = QTabWidget()
+        # Main tab widget for weapons; each weapon is built when first opened
+        self.main_tab_widget = LazyTabWidget()
         self.main_tab_widget.setStyleSheet("""
             QTabWidget::pane {
                 border: 2px solid #c0c0c0;
@@ -61,13 +69,13 @@ class ClassViewer(QDialog):
         ]
         
         for weapon in weapons:
-            weapon_tab = self.create_weapon_tab(weapon)
-            self.main_tab_widget.addTab(weapon_tab, weapon)
+            self.main_tab_widget.addLazyTab(lambda weapon=weapon: self.create_weapon_tab(weapon), weapon)
         
         layout.addWidget(self.main_tab_widget)
         
         self.setLayout(layout)
     
+    @perf.timed()
     def create_weapon_tab(self, weapon):
         """Create a tab widget for a specific weapon with stat sub-tabs"""
         weapon_widget = QWidget()
@@ -83,7 +91,7 @@ class ClassViewer(QDialog):
             return weapon_widget
         
         # Create sub-tab widget for stats
-        stat_tab_widget = QTabWidget()
+        stat_tab_widget = LazyTabWidget()
         stat_tab_widget.setStyleSheet("""
             QTabWidget::pane {
                 border: 1px solid #a0a0a0;
@@ -114,19 +122,15 @@ class ClassViewer(QDialog):
         """)
         
         # Use config stats
-        stats = [
-            config.STATS_NAME_HP,
-            config.STATS_NAME_STR,
-            config.STATS_NAME_SPD,
-            config.STATS_NAME_DEF,
-            config.STATS_NAME_MP
-        ]
+        stats = [style.name for style in get_tables().stats]
         weapon_data = self.character_data[weapon]
         
         for stat in stats:
             if stat in weapon_data:
-                stat_tab = self.create_stat_tab(weapon, stat, weapon_data[stat])
-                stat_tab_widget.addTab(stat_tab, stat)
+                stat_tab_widget.addLazyTab(
+                    lambda stat=stat: self.create_stat_tab(weapon, stat, weapon_data[stat]),
+                    stat
+                )
             else:
                 # Create empty tab if stat doesn't exist
                 empty_tab = QWidget()
@@ -142,13 +146,14 @@ class ClassViewer(QDialog):
         weapon_widget.setLayout(weapon_layout)
         return weapon_widget
     
+    @perf.timed()
     def create_stat_tab(self, weapon, stat, class_data):
         """Create a tab for a specific stat showing the class details"""
         stat_widget = QWidget()
         stat_layout = QVBoxLayout()
         
         # Class header
-        class_header = QLabel(f"{weapon} - {stat} - {class_data['class']}")
+        class_header = QLabel(f"{weapon} - {stat} - {tr(class_data['class'])}")
         class_header.setAlignment(Qt.AlignmentFlag.AlignCenter)
         class_header.setStyleSheet(f"""
             font-size: {config.FONT_SIZE_MEDIUM}; 
@@ -162,27 +167,50 @@ class ClassViewer(QDialog):
         """)
         stat_layout.addWidget(class_header)
         
-        # Scroll area for abilities
-        scroll_area = QScrollArea()
-        scroll_widget = QWidget()
-        scroll_layout = QVBoxLayout()
-        
-        # Abilities
-        for ability_type, ability in class_data['abilities'].items():
-            ability_frame = self.create_ability_display(ability_type, ability)
-            scroll_layout.addWidget(ability_frame)
+        # Ability totals from the precomputed pack summary
+        class_summary = self.summary.class_summary(weapon, stat) if self.summary else None
+        if class_summary is not None:
+            totals_label = QLabel(
+                f"{class_summary['abilities']} abilities · Damage {class_summary['damage']} · "
+                f"Heal {class_summary['heal']} · Utility {class_summary['utility']} · Mana {class_summary['mana']}"
+            )
+            totals_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            totals_label.setStyleSheet(f"font-size: {config.FONT_SIZE_SMALL}; color: #6c757d; padding-bottom: 5px;")
+            stat_layout.addWidget(totals_label)
         
-        scroll_layout.addStretch()
-        scroll_widget.setLayout(scroll_layout)
-        scroll_area.setWidget(scroll_widget)
-        scroll_area.setWidgetResizable(True)
+        # Scroll area for abilities, built as they scroll into view
+        builders = [
+            lambda ability_type=ability_type, ability=ability: self.create_ability_display(ability_type, ability)
+            for ability_type, ability in class_data['abilities'].items()
+        ]
+        scroll_area = LazyScrollArea(builders, config.VIEWER_ABILITY_BATCH)
         stat_layout.addWidget(scroll_area)
         
         stat_widget.setLayout(stat_layout)
         return stat_widget
     
+    @perf.timed()
     def create_ability_display(self, ability_type, ability):
         """Create a display widget for a single ability"""
+        # The description reflows with the viewer; the header and stats are fixed width
+        sections = [
+            (lambda: self.build_ability_header(ability_type, ability), True),
+            (lambda: self.build_ability_description(ability), False),
+            (lambda: self.build_ability_stats(ability), True)
+        ]
+        if not config.CARD_CACHE_ENABLED:
+            return build_card(self.build_ability_frame, sections)
+        return get_card_cache().create_card(
+            ability,
+            f"class:{ability_type}",
+            config.CLASS_ABILITY_CARD_WIDTH,
+            self.build_ability_frame,
+            sections,
+            "white"
+        )
+    
+    def build_ability_frame(self):
+        """Build the empty frame of an ability card"""
         ability_frame = QFrame()
         ability_frame.setFrameStyle(QFrame.Shape.Box)
         ability_frame.setStyleSheet("""
@@ -195,12 +223,18 @@ class ClassViewer(QDialog):
         """)
         ability_layout = QVBoxLayout()
         ability_layout.setSpacing(8)
-        
+        ability_frame.setLayout(ability_layout)
+        return ability_frame
+    
+    @perf.timed()
+    def build_ability_header(self, ability_type, ability):
+        """Build an ability card's name and type badge"""
         # Ability header with type badge
+        header = QWidget()
         header_layout = QHBoxLayout()
         
         # Ability name
-        ability_name = QLabel(ability['name'])
+        ability_name = QLabel(tr(ability['name']))
         ability_name.setStyleSheet(f"font-weight: bold; font-size: {config.FONT_SIZE_SMALL}; color: #2E86AB;")
         header_layout.addWidget(ability_name)
         
@@ -217,11 +251,13 @@ class ClassViewer(QDialog):
         type_badge.setAlignment(Qt.AlignmentFlag.AlignCenter)
         header_layout.addWidget(type_badge)
         header_layout.addStretch()
-        
-        ability_layout.addLayout(header_layout)
-        
-        # Description
-        desc_label = QLabel(ability['description'])
+        header_layout.setContentsMargins(0, 0, 0, 0)
+        header.setLayout(header_layout)
+        return header
+    
+    def build_ability_description(self, ability):
+        """Build an ability card's description"""
+        desc_label = StaticTextLabel(tr(ability['description']))
         desc_label.setStyleSheet("""
             font-style: italic; 
             color: #6c757d; 
@@ -230,29 +266,18 @@ class ClassViewer(QDialog):
             border-radius: 5px; 
             border-left: 4px solid #007bff;
         """)
-        desc_label.setWordWrap(True)
-        ability_layout.addWidget(desc_label)
-        
-        # Stats in a more organized grid using config values
+        return desc_label
+    
+    @perf.timed()
+    def build_ability_stats(self, ability):
+        """Build an ability card's grid of effect values"""
         stats_frame = QFrame()
         stats_frame.setStyleSheet("QFrame { border: 1px solid #e9ecef; border-radius: 5px; background-color: #f8f9fa; }")
         stats_layout = QGridLayout()
         stats_layout.setSpacing(8)
         stats_layout.setContentsMargins(10, 10, 10, 10)
         
-        stats = [
-            (config.ABILITY_NAME_DMG, ability['baseDamage'], config.ABILITY_BACKGROUND_COLOR_DMG),
-            (config.ABILITY_NAME_HEAL, ability['heal'], config.ABILITY_BACKGROUND_COLOR_HEAL),
-            (config.ABILITY_NAME_SPD_UP, ability['speedBuff'], config.ABILITY_BACKGROUND_COLOR_SPD_UP),
-            (config.ABILITY_NAME_SPD_DOWN, ability['speedDebuff'], config.ABILITY_BACKGROUND_COLOR_SPD_DOWN),
-            (config.ABILITY_NAME_DEF_UP, ability['defenseBuff'], config.ABILITY_BACKGROUND_COLOR_DEF_UP),
-            (config.ABILITY_NAME_DEF_DOWN, ability['defenseDebuff'], config.ABILITY_BACKGROUND_COLOR_DEF_DOWN),
-            (config.ABILITY_NAME_STR_UP, ability['strengthBuff'], config.ABILITY_BACKGROUND_COLOR_STR_UP),
-            (config.ABILITY_NAME_STR_DOWN, ability['strengthDebuff'], config.ABILITY_BACKGROUND_COLOR_STR_DOWN),
-            (config.ABILITY_NAME_MANA_COST, ability['manaCost'], config.ABILITY_BACKGROUND_COLOR_MANA_COST)
-        ]
-        
-        displayed_stats = [(name, value, color) for name, value, color in stats if value != 0]
+        displayed_stats = [(style.name, value, style.background) for style, value in get_tables().displayed_effects(ability)]
         
         for i, (stat_name, stat_value, color) in enumerate(displayed_stats):
             row = i // 3
@@ -285,7 +310,4 @@ class ClassViewer(QDialog):
             stats_layout.addWidget(stat_container, row, col)
         
         stats_frame.setLayout(stats_layout)
-        ability_layout.addWidget(stats_frame)
-        
-        ability_frame.setLayout(ability_layout)
-        return ability_frame
\ No newline at end of file
+        return stats_frame
\ No newline at end of file
@@ -0,0 +1,43 @@
+# history_chart.py
+from aqt.qt import *
+from ..data import config
+
+class HistoryChart(QWidget):
+    """Stacked daily pass/fail bars painted directly from precomputed rollups"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.totals = []
+        self.setMinimumHeight(config.HISTORY_CHART_HEIGHT)
+
+    def set_totals(self, totals):
+        """Show (day, passes, fails) rows, oldest first"""
+        self.totals = totals
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect().adjusted(4, 4, -4, -4)
+        painter.fillRect(self.rect(), QColor("#ffffff"))
+
+        peak = max((passes + fails for _, passes, fails in self.totals), default=0)
+        if not self.totals or peak == 0:
+            painter.setPen(QColor("#999999"))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "No dungeon runs in this period")
+            painter.end()
+            return
+
+        bar_width = rect.width() / len(self.totals)
+        scale = rect.height() / peak
+        pass_color = QColor("#28a745")
+        fail_color = QColor("#dc3545")
+        for i, (_, passes, fails) in enumerate(self.totals):
+            x = rect.left() + i * bar_width
+            pass_height = passes * scale
+            fail_height = fails * scale
+            painter.fillRect(QRectF(x, rect.bottom() - pass_height, max(bar_width - 1, 1), pass_height), pass_color)
+            painter.fillRect(QRectF(x, rect.bottom() - pass_height - fail_height, max(bar_width - 1, 1), fail_height), fail_color)
+
+        painter.setPen(QColor("#dee2e6"))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        painter.end()
@@ -0,0 +1,65 @@
+# idle_runner.py
+# Drives the core idle scheduler from Anki's main loop with a QTimer.
+from aqt import gui_hooks
+from aqt.qt import *
+from aqt.utils import showInfo
+from ..data import config
+from ..core import perf
+
+
+class IdleRunner(QObject):
+    """Runs scheduler slices on a timer that only ticks while there is runnable work"""
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(config.IDLE_TIMER_INTERVAL_MS)
+        self.timer.timeout.connect(self.tick)
+
+        # Re-checks once the reviewer has been quiet long enough to resume work
+        self.resume_timer = QTimer(self)
+        self.resume_timer.setSingleShot(True)
+        self.resume_timer.timeout.connect(self.wake)
+
+    def install_hooks(self):
+        """Follow Anki's state and reviewer hooks to tell idle time from reviewing"""
+        gui_hooks.state_did_change.append(self.on_state_did_change)
+        gui_hooks.reviewer_did_show_question.append(self.on_review_activity)
+        gui_hooks.reviewer_did_show_answer.append(self.on_review_activity)
+        gui_hooks.reviewer_did_answer_card.append(self.on_review_activity)
+
+    def submit(self, name, job, priority):
+        """Queue a job (see IdleScheduler.submit) and start ticking if it can run"""
+        self.scheduler.submit(name, job, priority)
+        self.wake()
+
+    def wake(self):
+        if self.scheduler.has_runnable():
+            if not self.timer.isActive():
+                self.timer.start()
+        elif len(self.scheduler):
+            # Work is waiting for the reviewer to go quiet
+            self.resume_timer.start(config.IDLE_REVIEW_PAUSE_MS)
+
+    def tick(self):
+        try:
+            with perf.span('idle.slice'):
+                steps = self.scheduler.run_slice()
+            perf.count('idle.steps', steps)
+        except Exception as e:
+            showInfo(f"Anki Leveling background task failed: {str(e)}")
+        if not self.scheduler.has_runnable():
+            self.timer.stop()
+            self.wake()
+
+    def on_state_did_change(self, new_state, old_state):
+        self.scheduler.set_state(new_state)
+        self.wake()
+
+    def on_review_activity(self, *args):
+        self.scheduler.note_activity()
+        if not self.scheduler.has_runnable():
+            self.timer.stop()
+            self.wake()
@@ -0,0 +1,94 @@
+# lazy_widgets.py
+# Containers that build their content only when it is about to be seen.
+from aqt.qt import *
+from ..core import perf
+
+
+class LazyTabWidget(QTabWidget):
+    """QTabWidget whose pages are built on first view instead of up front
+
+    Opening a viewer then costs one page no matter how many tabs the data
+    pack has.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.builders = {}
+        self.currentChanged.connect(self.build_page)
+
+    def addLazyTab(self, build_page, label):
+        """Add a tab whose content comes from build_page() when first selected"""
+        placeholder = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        placeholder.setLayout(layout)
+        self.builders[placeholder] = build_page
+        index = self.addTab(placeholder, label)
+        if index == self.currentIndex():
+            self.build_page(index)
+        return index
+
+    def build_page(self, index):
+        page = self.widget(index)
+        build_page = self.builders.pop(page, None)
+        if build_page is not None:
+            perf.count('lazy_widgets.tab_built')
+            page.layout().addWidget(build_page())
+
+    def pending_count(self):
+        """Get the number of tabs not built yet"""
+        return len(self.builders)
+
+
+class LazyScrollArea(QScrollArea):
+    """Scrollable column of widgets built a batch at a time as the user scrolls
+
+    Only enough items to fill the viewport (at least one batch) exist until
+    the user scrolls toward the bottom.
+    """
+
+    def __init__(self, builders, batch_size, header_widgets=(), parent=None):
+        """Create the area and build the first batch
+
+        Args:
+            builders (list): Callables each returning one item widget
+            batch_size (int): Items built per batch
+            header_widgets (tuple): Widgets shown above the items
+        """
+        super().__init__(parent)
+        self.builders = builders
+        self.batch_size = batch_size
+        self.built = 0
+
+        content = QWidget()
+        self.content_layout = QVBoxLayout()
+        for widget in header_widgets:
+            self.content_layout.addWidget(widget)
+        self.content_layout.addStretch()
+        content.setLayout(self.content_layout)
+        self.setWidget(content)
+        self.setWidgetResizable(True)
+
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self.check_bottom)
+        # Items added by a batch change the range; keep going until the viewport is full
+        scroll_bar.rangeChanged.connect(self.check_bottom)
+        self.build_batch()
+
+    def build_batch(self):
+        end = min(self.built + self.batch_size, len(self.builders))
+        for builder in self.builders[self.built:end]:
+            # Keep the trailing stretch last
+            self.content_layout.insertWidget(self.content_layout.count() - 1, builder())
+        self.built = end
+
+    def check_bottom(self, *args):
+        if self.built >= len(self.builders):
+            return
+        scroll_bar = self.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.build_batch()
+
+    def pending_count(self):
+        """Get the number of items not built yet"""
+        return len(self.builders) - self.built
@@ -0,0 +1,91 @@
+# leaderboard_viewer.py
+from aqt.qt import *
+from ..data import config
+from ..core import perf
+from ..core.leaderboard import METRICS, ALL_RANKS
+from ..core.leveling import RANKS
+
+class LeaderboardViewer(QDialog):
+    def __init__(self, leaderboard, parent=None):
+        super().__init__(parent)
+        self.leaderboard = leaderboard
+        self.tables = {}
+        self.rank_selectors = {}
+        self.setWindowTitle("Leaderboards")
+        self.setGeometry(50, 50, config.VIEWER_LENGTH, config.VIEWER_WIDTH)
+        self.setupUI()
+
+    @perf.timed()
+    def setupUI(self):
+        layout = QVBoxLayout()
+
+        # Title
+        title = QLabel("Leaderboards")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setStyleSheet(f"font-size: {config.FONT_SIZE_BIG}; font-weight: bold; padding: 10px; color: {config.FONT_COLOR};")
+        layout.addWidget(title)
+
+        # One tab per metric
+        self.main_tab_widget = QTabWidget()
+        for metric, (metric_name, _) in METRICS.items():
+            self.main_tab_widget.addTab(self.create_metric_tab(metric), metric_name)
+        layout.addWidget(self.main_tab_widget)
+
+        # Close button
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    @perf.timed()
+    def create_metric_tab(self, metric):
+        """Create a tab showing the top characters for one metric"""
+        metric_widget = QWidget()
+        metric_layout = QVBoxLayout()
+
+        # Rank filter
+        selector_layout = QHBoxLayout()
+        selector_label = QLabel("Rank:")
+        selector_label.setStyleSheet(f"font-size: {config.FONT_SIZE_SMALL}; font-weight: bold;")
+        rank_selector = QComboBox()
+        rank_selector.addItem("All Ranks", ALL_RANKS)
+        for rank in RANKS:
+            rank_selector.addItem(f"Rank {rank}", rank)
+        rank_selector.currentIndexChanged.connect(lambda _, metric=metric: self.refresh_metric(metric))
+        selector_layout.addWidget(selector_label)
+        selector_layout.addWidget(rank_selector)
+        selector_layout.addStretch()
+        metric_layout.addLayout(selector_layout)
+
+        # Top-K table
+        table = QTableWidget()
+        table.setColumnCount(3)
+        table.setHorizontalHeaderLabels(["#", "Character", METRICS[metric][0]])
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        metric_layout.addWidget(table)
+
+        self.tables[metric] = table
+        self.rank_selectors[metric] = rank_selector
+        self.refresh_metric(metric)
+
+        metric_widget.setLayout(metric_layout)
+        return metric_widget
+
+    def refresh_metric(self, metric):
+        """Fill a metric's table straight from the maintained board"""
+        table = self.tables[metric]
+        rank = self.rank_selectors[metric].currentData()
+        rows = self.leaderboard.top(metric, config.LEADERBOARD_SIZE, rank)
+
+        table.setRowCount(len(rows))
+        for row, (name, score) in enumerate(rows):
+            score_text = f"{score:.1f}%" if metric == 'success_rate' else str(score)
+            for col, value in enumerate([str(row + 1), name, score_text]):
+                table.setItem(row, col, QTableWidgetItem(value))
+        table.resizeColumnsToContents()
@@ -0,0 +1,113 @@
+# memory_viewer.py
+import gc
+
+from aqt.qt import *
+from ..data import config
+from ..core import memory
+
+
+# Top-level package of the add-on; its viewers' classes are defined below it
+_ADDON_PACKAGE = __name__.split('.')[0]
+
+
+def live_dialogs(parent):
+    """Count this add-on's dialogs still parented to a window, by class name
+
+    Anki's own dialogs (and other add-ons') share the main window as parent
+    and are left out.
+    """
+    counts = {}
+    for dialog in parent.findChildren(QDialog, options=Qt.FindChildOption.FindDirectChildrenOnly):
+        if not type(dialog).__module__.startswith(_ADDON_PACKAGE + '.'):
+            continue
+        name = type(dialog).__name__
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def delete_pending():
+    """Run pending deleteLater() calls so only leaked objects remain"""
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+class MemoryViewer(QDialog):
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self.setWindowTitle("Memory")
+        self.setGeometry(50, 50, config.VIEWER_LENGTH, config.VIEWER_WIDTH)
+        self.setupUI()
+        self.refresh()
+
+    def setupUI(self):
+        layout = QVBoxLayout()
+
+        # Title
+        title = QLabel("Memory Diagnostics")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setStyleSheet(f"font-size: {config.FONT_SIZE_MEDIUM}; font-weight: bold; padding: 10px; color: {config.FONT_COLOR};")
+        layout.addWidget(title)
+
+        # Tracing toggle
+        self.enabled_checkbox = QCheckBox("Trace allocations")
+        self.enabled_checkbox.setChecked(memory.is_enabled())
+        self.enabled_checkbox.toggled.connect(self.on_toggled)
+        layout.addWidget(self.enabled_checkbox)
+
+        # Live dialogs
+        self.dialogs_label = QLabel()
+        self.dialogs_label.setStyleSheet(f"font-size: {config.FONT_SIZE_SMALL}; color: #333; padding: 5px;")
+        self.dialogs_label.setWordWrap(True)
+        layout.addWidget(self.dialogs_label)
+
+        # Records
+        self.report_text = QPlainTextEdit()
+        self.report_text.setReadOnly(True)
+        self.report_text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        layout.addWidget(self.report_text)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        for text, handler in [("Refresh", self.refresh), ("Collect Garbage", self.on_collect), ("Reset", self.on_reset)]:
+            button = QPushButton(text)
+            button.clicked.connect(handler)
+            button_layout.addWidget(button)
+        button_layout.addStretch()
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        """Reload the live dialog counts and the tracked records"""
+        # This dialog is itself a child of the main window while open
+        counts = live_dialogs(self.main_window)
+        counts[type(self).__name__] = counts.get(type(self).__name__, 1) - 1
+        leaked = {name: count for name, count in counts.items() if count}
+        if leaked:
+            self.dialogs_label.setText("Live dialogs: " + ", ".join(f"{name}={count}" for name, count in sorted(leaked.items())))
+        else:
+            self.dialogs_label.setText("Live dialogs: none")
+
+        if memory.is_enabled():
+            self.report_text.setPlainText(memory.format_report())
+        else:
+            self.report_text.setPlainText("Allocation tracing is off. Enable it, then open a viewer to record it.")
+
+    def on_toggled(self, enabled):
+        memory.set_enabled(enabled)
+        self.refresh()
+
+    def on_collect(self):
+        """Free unreachable objects and pending Qt deletions, then refresh"""
+        delete_pending()
+        gc.collect()
+        self.refresh()
+
+    def on_reset(self):
+        """Forget tracked records"""
+        memory.reset()
+        self.refresh()
@@ -1,15 +1,23 @@
 # monster_viewer.py
 from aqt.qt import *
 from ..data import config
+from ..core import perf
+from ..core.localization import tr
+from ..core.settings import get_tables
+from .card_cache import build_card, get_card_cache
+from .lazy_widgets import LazyTabWidget, LazyScrollArea
+from .text_layout import StaticTextLabel
 
 class MonsterViewer(QDialog):
-    def __init__(self, monster_data, parent=None):
+    def __init__(self, monster_data, parent=None, summary=None):
         super().__init__(parent)
         self.monster_data = monster_data
+        self.summary = summary
         self.setWindowTitle("Monster Data Viewer")
         self.setGeometry(200, 200, 1200, 900)
         self.setupUI()
         
+    @perf.timed()
     def setupUI(self):
         layout = QVBoxLayout()
         
@@ -19,15 +27,11 @@ class MonsterViewer(QDialog):
         title.setStyleSheet(f"font-size: {config.FONT_SIZE_BIG}; font-weight: bold; padding: 15px; color: {config.FONT_COLOR};")
         layout.addWidget(title)
         
-        # Main tab widget for stat focus categories
-        self.main_tab_widget = QTabWidget()
+        # Main tab widget for stat focus categories; each is built when first opened
+        self.main_tab_widget = LazyTabWidget()
         
         # Get monster tier border colors from config
-        tier_colors = [
-            config.MONSTER_TIER_BORDER_COLOR_1, 
-            config.MONSTER_TIER_BORDER_COLOR_2,
-            config.MONSTER_TIER_BORDER_COLOR_3
-        ]
+        tier_colors = [style.border for style in get_tables().tiers]
         
         self.main_tab_widget.setStyleSheet(f"""
             QTabWidget::pane {{
@@ -61,22 +65,23 @@ class MonsterViewer(QDialog):
         """)
         
         # Stat focus categories using config stat names and colors
+        roles = ('Tanks', 'Attackers', 'Agile', 'Guardians', 'Magical')
         categories = [
-            (config.STATS_NAME_HP, f"{config.STATS_NAME_HP}-Focused (Tanks)", config.STATS_TEXT_COLOR_HP),
-            (config.STATS_NAME_STR, f"{config.STATS_NAME_STR}-Focused (Attackers)", config.STATS_TEXT_COLOR_STR),
-            (config.STATS_NAME_SPD, f"{config.STATS_NAME_SPD}-Focused (Agile)", config.STATS_TEXT_COLOR_SPD),
-            (config.STATS_NAME_DEF, f"{config.STATS_NAME_DEF}-Focused (Guardians)", config.STATS_TEXT_COLOR_DEF),
-            (config.STATS_NAME_MP, f"{config.STATS_NAME_MP}-Focused (Magical)", config.STATS_TEXT_COLOR_MP)
+            (style.name, f"{style.name}-Focused ({role})", style.text)
+            for style, role in zip(get_tables().stats, roles)
         ]
         
         for category_key, category_name, category_color in categories:
-            category_tab = self.create_category_tab(category_key, category_name, category_color)
-            self.main_tab_widget.addTab(category_tab, category_name.split(" ")[0])
+            self.main_tab_widget.addLazyTab(
+                lambda key=category_key, name=category_name, color=category_color: self.create_category_tab(key, name, color),
+                category_name.split(" ")[0]
+            )
         
         layout.addWidget(self.main_tab_widget)
         
         self.setLayout(layout)
     
+    @perf.timed()
     def create_category_tab(self, category_key, category_name, category_color):
         """Create a tab widget for a specific stat category with monster sub-tabs"""
         category_widget = QWidget()
@@ -106,7 +111,7 @@ class MonsterViewer(QDialog):
             return category_widget
         
         # Create sub-tab widget for individual monsters in this category
-        monster_tab_widget = QTabWidget()
+        monster_tab_widget = LazyTabWidget()
         monster_tab_widget.setStyleSheet(f"""
             QTabWidget::pane {{
                 border: 1px solid {category_color};
@@ -140,16 +145,26 @@ class MonsterViewer(QDialog):
         monsters = self.monster_data[category_key]
         
         for i, monster in enumerate(monsters):
-            monster_tab = self.create_monster_tab(monster, category_color)
-            tab_name = monster['name']['base']
-            monster_tab_widget.addTab(monster_tab, f"{i+1}. {tab_name}")
+            tab_name = tr(monster['name']['base'])
+            monster_tab_widget.addLazyTab(
+                lambda monster=monster, i=i: self.create_monster_tab(
+                    monster, category_color, self.summary.monster_summary(category_key, i) if self.summary else None
+                ),
+                f"{i+1}. {tab_name}"
+            )
         
         category_layout.addWidget(monster_tab_widget)
         category_widget.setLayout(category_layout)
         return category_widget
     
-    def create_monster_tab(self, monster, category_color):
-        """Create a tab for a specific monster showing its evolution line and abilities"""
+    @perf.timed()
+    def create_monster_tab(self, monster, category_color, monster_summary=None):
+        """Create a tab for a specific monster showing its evolution line and abilities
+
+        Args:
+            monster_summary (dict): Precomputed PackSummary entry; when given, the
+                evolution line shows each tier's stats and power from it
+        """
         monster_widget = QWidget()
         monster_layout = QVBoxLayout()
         
@@ -165,14 +180,10 @@ class MonsterViewer(QDialog):
         evolution_layout = QHBoxLayout()
         
         # Display all three tiers using config monster tier colors
-        tiers = ['tier1', 'tier2', 'tier3']
-        tier_colors = [
-            config.MONSTER_TIER_BACKGROUND_COLOR_0,
-            config.MONSTER_TIER_BACKGROUND_COLOR_1, 
-            config.MONSTER_TIER_BACKGROUND_COLOR_2
-        ]
-        
-        for tier, tier_color in zip(tiers, tier_colors):
+        names = monster_summary['names'] if monster_summary is not None else monster['name']
+        for tier_style in get_tables().tiers:
+            tier = tier_style.key
+            tier_color = tier_style.background
             tier_frame = QFrame()
             tier_frame.setStyleSheet(f"""
                 QFrame {{ 
@@ -184,12 +195,27 @@ class MonsterViewer(QDialog):
             """)
             tier_layout = QVBoxLayout()
             
-            name_label = QLabel(monster['name'][tier])
+            name_label = QLabel(tr(names[tier]))
             name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             name_label.setStyleSheet(f"font-size: {config.FONT_SIZE_SMALL}; font-weight: bold; color: white;")
             name_label.setWordWrap(True)
             
             tier_layout.addWidget(name_label)
+            
+            if monster_summary is not None and tier in monster_summary['stats']:
+                # Stats at the level the tier typically spawns at
+                tier_stats = monster_summary['stats'][tier]
+                stats_label = QLabel(
+                    f"Lv {self.summary.tier_levels[tier]} · " + " · ".join(f"{stat} {value}" for stat, value in tier_stats.items())
+                )
+                stats_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                stats_label.setStyleSheet("font-size: 10px; color: white;")
+                stats_label.setWordWrap(True)
+                tier_layout.addWidget(stats_label)
+                power_label = QLabel(f"Power {monster_summary['power'][tier]:,.0f}")
+                power_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                power_label.setStyleSheet("font-size: 10px; color: white;")
+                tier_layout.addWidget(power_label)
             tier_frame.setLayout(tier_layout)
             evolution_layout.addWidget(tier_frame)
         
@@ -217,19 +243,15 @@ class MonsterViewer(QDialog):
         stats_data = monster['stats']
         
         # Use config stat colors
-        stat_colors = {
-            config.STATS_NAME_HP: config.STATS_TEXT_COLOR_HP,
-            config.STATS_NAME_STR: config.STATS_TEXT_COLOR_STR, 
-            config.STATS_NAME_SPD: config.STATS_TEXT_COLOR_SPD,
-            config.STATS_NAME_DEF: config.STATS_TEXT_COLOR_DEF,
-            config.STATS_NAME_MP: config.STATS_TEXT_COLOR_MP
-        }
+        stat_styles = get_tables().stat_by_name
         
         for stat_name, stat_value in stats_data.items():
+            stat_style = stat_styles.get(stat_name)
+            stat_color = stat_style.text if stat_style is not None else '#666'
             stat_container = QFrame()
             stat_container.setStyleSheet(f"""
                 QFrame {{ 
-                    border: 2px solid {stat_colors.get(stat_name, '#666')}; 
+                    border: 2px solid {stat_color}; 
                     border-radius: 6px; 
                     background-color: white; 
                     padding: 8px;
@@ -239,7 +261,7 @@ class MonsterViewer(QDialog):
             stat_container_layout = QVBoxLayout()
             
             stat_name_label = QLabel(stat_name)
-            stat_name_label.setStyleSheet(f"font-size: 11px; font-weight: bold; color: {stat_colors.get(stat_name, '#666')};")
+            stat_name_label.setStyleSheet(f"font-size: 11px; font-weight: bold; color: {stat_color};")
             stat_name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             
             stat_value_label = QLabel(str(stat_value))
@@ -256,31 +278,44 @@ class MonsterViewer(QDialog):
         stats_frame.setLayout(stats_layout)
         monster_layout.addWidget(stats_frame)
         
-        # Abilities section
-        abilities_scroll = QScrollArea()
-        abilities_widget = QWidget()
-        abilities_layout = QVBoxLayout()
-        
+        # Abilities section, built as they scroll into view
         abilities_title = QLabel("Abilities")
         abilities_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         abilities_title.setStyleSheet(f"font-size: {config.FONT_SIZE_MEDIUM}; font-weight: bold; color: {config.FONT_COLOR}; padding: 10px;")
-        abilities_layout.addWidget(abilities_title)
         
-        for ability in monster['abilities']:
-            ability_frame = self.create_ability_display(ability, category_color)
-            abilities_layout.addWidget(ability_frame)
-        
-        abilities_layout.addStretch()
-        abilities_widget.setLayout(abilities_layout)
-        abilities_scroll.setWidget(abilities_widget)
-        abilities_scroll.setWidgetResizable(True)
+        builders = [
+            lambda ability=ability: self.create_ability_display(ability, category_color)
+            for ability in monster['abilities']
+        ]
+        abilities_scroll = LazyScrollArea(builders, config.VIEWER_ABILITY_BATCH, (abilities_title,))
         monster_layout.addWidget(abilities_scroll)
         
         monster_widget.setLayout(monster_layout)
         return monster_widget
     
+    @perf.timed()
     def create_ability_display(self, ability, category_color):
         """Create a display widget for a single ability"""
+        # The description reflows with the viewer; the header and stats are fixed width
+        build_frame = lambda: self.build_ability_frame(category_color)
+        sections = [
+            (lambda: self.build_ability_header(ability, category_color), True),
+            (lambda: self.build_ability_description(ability, category_color), False),
+            (lambda: self.build_ability_stats(ability), True)
+        ]
+        if not config.CARD_CACHE_ENABLED:
+            return build_card(build_frame, sections)
+        return get_card_cache().create_card(
+            ability,
+            f"monster:{category_color}",
+            config.MONSTER_ABILITY_CARD_WIDTH,
+            build_frame,
+            sections,
+            "#FFFEF7"
+        )
+    
+    def build_ability_frame(self, category_color):
+        """Build the empty frame of an ability card"""
         ability_frame = QFrame()
         ability_frame.setFrameStyle(QFrame.Shape.Box)
         ability_frame.setStyleSheet(f"""
@@ -293,20 +328,28 @@ class MonsterViewer(QDialog):
         """)
         ability_layout = QVBoxLayout()
         ability_layout.setSpacing(10)
-        
+        ability_frame.setLayout(ability_layout)
+        return ability_frame
+    
+    @perf.timed()
+    def build_ability_header(self, ability, category_color):
+        """Build an ability card's name"""
         # Ability header
+        header = QWidget()
         header_layout = QHBoxLayout()
         
         # Ability name
-        ability_name = QLabel(ability['name'])
+        ability_name = QLabel(tr(ability['name']))
         ability_name.setStyleSheet(f"font-weight: bold; font-size: {config.FONT_SIZE_MEDIUM}; color: {category_color};")
         header_layout.addWidget(ability_name)
         header_layout.addStretch()
-        
-        ability_layout.addLayout(header_layout)
-        
-        # Description
-        desc_label = QLabel(ability['description'])
+        header_layout.setContentsMargins(0, 0, 0, 0)
+        header.setLayout(header_layout)
+        return header
+    
+    def build_ability_description(self, ability, category_color):
+        """Build an ability card's description"""
+        desc_label = StaticTextLabel(tr(ability['description']))
         desc_label.setStyleSheet(f"""
             font-style: italic; 
             color: #8B4513; 
@@ -315,29 +358,18 @@ class MonsterViewer(QDialog):
             border-radius: 6px; 
             border-left: 4px solid {category_color};
         """)
-        desc_label.setWordWrap(True)
-        ability_layout.addWidget(desc_label)
-        
-        # Stats in a grid using config ability colors
+        return desc_label
+    
+    @perf.timed()
+    def build_ability_stats(self, ability):
+        """Build an ability card's grid of effect values"""
         stats_frame = QFrame()
         stats_frame.setStyleSheet("QFrame { border: 1px solid #DDD; border-radius: 6px; background-color: #FAFAFA; }")
         stats_layout = QGridLayout()
         stats_layout.setSpacing(6)
         stats_layout.setContentsMargins(8, 8, 8, 8)
         
-        stats = [
-            (config.ABILITY_NAME_DMG, ability['baseDamage'], config.ABILITY_BACKGROUND_COLOR_DMG),
-            (config.ABILITY_NAME_HEAL, ability['heal'], config.ABILITY_BACKGROUND_COLOR_HEAL),
-            (config.ABILITY_NAME_SPD_UP, ability['speedBuff'], config.ABILITY_BACKGROUND_COLOR_SPD_UP),
-            (config.ABILITY_NAME_SPD_DOWN, ability['speedDebuff'], config.ABILITY_BACKGROUND_COLOR_SPD_DOWN),
-            (config.ABILITY_NAME_DEF_UP, ability['defenseBuff'], config.ABILITY_BACKGROUND_COLOR_DEF_UP),
-            (config.ABILITY_NAME_DEF_DOWN, ability['defenseDebuff'], config.ABILITY_BACKGROUND_COLOR_DEF_DOWN),
-            (config.ABILITY_NAME_STR_UP, ability['strengthBuff'], config.ABILITY_BACKGROUND_COLOR_STR_UP),
-            (config.ABILITY_NAME_STR_DOWN, ability['strengthDebuff'], config.ABILITY_BACKGROUND_COLOR_STR_DOWN),
-            (config.ABILITY_NAME_MANA_COST, ability['manaCost'], config.ABILITY_BACKGROUND_COLOR_MANA_COST)
-        ]
-        
-        displayed_stats = [(name, value, color) for name, value, color in stats if value != 0]
+        displayed_stats = [(style.name, value, style.background) for style, value in get_tables().displayed_effects(ability)]
         
         for i, (stat_name, stat_value, color) in enumerate(displayed_stats):
             row = i // 4
@@ -370,7 +402,4 @@ class MonsterViewer(QDialog):
             stats_layout.addWidget(stat_container, row, col)
         
         stats_frame.setLayout(stats_layout)
-        ability_layout.addWidget(stats_frame)
-        
-        ability_frame.setLayout(ability_layout)
-        return ability_frame
\ No newline at end of file
+        return stats_frame
\ No newline at end of file
@@ -0,0 +1,100 @@
+# perf_viewer.py
+from aqt.qt import *
+from ..data import config
+from ..core import perf
+
+class PerfViewer(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+        self.setGeometry(50, 50, config.VIEWER_LENGTH, config.VIEWER_WIDTH)
+        self.setupUI()
+        self.refresh()
+
+    def setupUI(self):
+        layout = QVBoxLayout()
+
+        # Title
+        title = QLabel("Performance Spans")
+        title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title.setStyleSheet(f"font-size: {config.FONT_SIZE_MEDIUM}; font-weight: bold; padding: 10px; color: {config.FONT_COLOR};")
+        layout.addWidget(title)
+
+        # Recording toggle
+        self.enabled_checkbox = QCheckBox("Record timings")
+        self.enabled_checkbox.setChecked(perf.is_enabled())
+        self.enabled_checkbox.toggled.connect(perf.set_enabled)
+        layout.addWidget(self.enabled_checkbox)
+
+        # Span table
+        self.span_table = QTableWidget()
+        self.span_table.setColumnCount(6)
+        self.span_table.setHorizontalHeaderLabels(["Span", "Count", "Mean (ms)", "Min (ms)", "Max (ms)", "Histogram"])
+        self.span_table.horizontalHeader().setStretchLastSection(True)
+        self.span_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.span_table)
+
+        # Counters
+        self.counters_label = QLabel()
+        self.counters_label.setStyleSheet(f"font-size: {config.FONT_SIZE_SMALL}; color: #333; padding: 5px;")
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        for text, handler in [("Refresh", self.refresh), ("Reset", self.on_reset), ("Export JSON", self.on_export)]:
+            button = QPushButton(text)
+            button.clicked.connect(handler)
+            button_layout.addWidget(button)
+        button_layout.addStretch()
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def format_histogram(self, buckets, bounds):
+        """Render bucket counts as a compact text histogram"""
+        peak = max(buckets) or 1
+        bars = " ▁▂▃▄▅▆▇█"
+        labels = [f"≤{bound}" for bound in bounds] + [f">{bounds[-1]}"]
+        cells = [f"{label}:{bars[round(value / peak * (len(bars) - 1))]}" for label, value in zip(labels, buckets) if value]
+        return "  ".join(cells)
+
+    def refresh(self):
+        """Reload the table from the current perf snapshot"""
+        data = perf.snapshot()
+        spans = data['spans']
+
+        self.span_table.setRowCount(len(spans))
+        for row, (name, stats) in enumerate(spans.items()):
+            values = [
+                name,
+                str(stats['count']),
+                f"{stats['meanMs']:.3f}",
+                f"{stats['minMs']:.3f}",
+                f"{stats['maxMs']:.3f}",
+                self.format_histogram(stats['buckets'], data['bucketBoundsMs'])
+            ]
+            for col, value in enumerate(values):
+                self.span_table.setItem(row, col, QTableWidgetItem(value))
+        self.span_table.resizeColumnsToContents()
+
+        counters = data['counters']
+        if counters:
+            self.counters_label.setText("Counters: " + ", ".join(f"{name}={value}" for name, value in counters.items()))
+        else:
+            self.counters_label.setText("Counters: none recorded")
+
+    def on_reset(self):
+        """Clear recorded spans and counters"""
+        perf.reset()
+        self.refresh()
+
+    def on_export(self):
+        """Export the current snapshot to a JSON file"""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Performance Data", "anki_leveling_perf.json", "JSON (*.json)")
+        if path:
+            perf.export_json(path)
@@ -0,0 +1,158 @@
+# render_bench.py
+# Offscreen render budgets for the viewers: python -m <addon package>.source.render_bench
+#
+# Builds each viewer against data packs scaled up from the shipped ones, counts
+# the QObjects it created and times construction and the first paint. Exits
+# with status 1 when a budget is exceeded or object counts grow linearly with
+# the data.
+import argparse
+import math
+import os
+import sys
+import time
+
+import aqt
+from aqt.qt import *
+from ..core.character import Character
+from ..core.data_loader import load_packs, read_json_data
+from ..core.settings import apply_overrides
+from ..data import config
+from .character_viewer import CharacterViewer
+from .class_viewer import ClassViewer
+from .monster_viewer import MonsterViewer
+
+# Pack size multipliers measured by default
+SCALES = (1, 4, 16)
+# Object counts may grow at most like scale ** MAX_GROWTH_EXPONENT
+MAX_GROWTH_EXPONENT = 0.5
+
+# viewer -> (max QObjects, max construction ms, max first paint ms), at every scale
+BUDGETS = {
+    'ClassViewer': (500, 400.0, 400.0),
+    'MonsterViewer': (600, 400.0, 400.0),
+    'CharacterViewer': (300, 300.0, 300.0)
+}
+
+
+def scale_class_data(class_data, scale):
+    """Give every class scale times as many abilities"""
+    return {
+        weapon: {
+            stat: {
+                'class': class_info['class'],
+                'abilities': {
+                    f"{key}{copy}" if copy else key: ability
+                    for copy in range(scale)
+                    for key, ability in class_info['abilities'].items()
+                }
+            }
+            for stat, class_info in stats.items()
+        }
+        for weapon, stats in class_data.items()
+    }
+
+
+def scale_monster_data(monster_data, scale):
+    """Give every category scale times as many monster families"""
+    return {category: families * scale for category, families in monster_data.items()}
+
+
+def scale_characters(character_data, scale):
+    """Build scale copies of the sample roster with unique names"""
+    characters = []
+    for copy in range(scale):
+        for record in character_data:
+            character = Character(record)
+            if copy:
+                character.name = f"{character.name} {copy + 1}"
+            characters.append(character)
+    return characters
+
+
+def measure(app, build_viewer):
+    """Build, paint and tear down one viewer
+
+    Returns:
+        tuple: (QObjects created, construction ms, first paint ms)
+    """
+    start = time.perf_counter()
+    dialog = build_viewer()
+    construct_ms = (time.perf_counter() - start) * 1000
+    objects = len(dialog.findChildren(QObject)) + 1
+
+    start = time.perf_counter()
+    dialog.show()
+    app.processEvents()
+    dialog.grab()
+    paint_ms = (time.perf_counter() - start) * 1000
+
+    dialog.close()
+    dialog.deleteLater()
+    app.processEvents()
+    return objects, construct_ms, paint_ms
+
+
+def growth_exponent(low_scale, low_objects, high_scale, high_objects):
+    """Exponent k such that objects grow like scale ** k between two scales"""
+    return math.log(high_objects / low_objects) / math.log(high_scale / low_scale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Anki Leveling viewer render budgets offscreen")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES), help="data pack size multipliers")
+    parser.add_argument('--card-cache', action='store_true', help="draw ability cards through the card cache")
+    args = parser.parse_args()
+    scales = sorted(set(args.scales))
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication.instance() or QApplication(sys.argv)
+    # Viewers are parented to Anki's main window; stand in an empty one
+    aqt.mw = QMainWindow()
+    # Without the cache every ability card is a full widget tree, the worst case
+    apply_overrides({'CARD_CACHE_ENABLED': args.card_cache})
+
+    class_data, monster_data = load_packs()
+    character_data = read_json_data(config.CHARACTERS_PATH)
+    viewers = {
+        'ClassViewer': lambda scale: (
+            lambda data=scale_class_data(class_data, scale): ClassViewer(data, aqt.mw)
+        ),
+        'MonsterViewer': lambda scale: (
+            lambda data=scale_monster_data(monster_data, scale): MonsterViewer(data, aqt.mw)
+        ),
+        'CharacterViewer': lambda scale: (
+            lambda characters=scale_characters(character_data, scale): CharacterViewer(characters, aqt.mw)
+        )
+    }
+
+    failures = []
+    print(f"{'viewer':<18}{'scale':>6}{'objects':>10}{'build ms':>11}{'paint ms':>11}")
+    for name, make_builder in viewers.items():
+        max_objects, max_construct_ms, max_paint_ms = BUDGETS[name]
+        counts = []
+        for scale in scales:
+            objects, construct_ms, paint_ms = measure(app, make_builder(scale))
+            counts.append(objects)
+            print(f"{name:<18}{scale:>6}{objects:>10}{construct_ms:>11.1f}{paint_ms:>11.1f}")
+            if objects > max_objects:
+                failures.append(f"{name} x{scale}: {objects} QObjects (budget {max_objects})")
+            if construct_ms > max_construct_ms:
+                failures.append(f"{name} x{scale}: built in {construct_ms:.1f} ms (budget {max_construct_ms:.0f})")
+            if paint_ms > max_paint_ms:
+                failures.append(f"{name} x{scale}: first paint in {paint_ms:.1f} ms (budget {max_paint_ms:.0f})")
+
+        if len(scales) > 1:
+            exponent = growth_exponent(scales[0], counts[0], scales[-1], counts[-1])
+            if exponent > MAX_GROWTH_EXPONENT:
+                failures.append(f"{name}: QObjects grow like scale^{exponent:.2f} (limit {MAX_GROWTH_EXPONENT})")
+
+    if failures:
+        print("\nBudget exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll viewers within budget")
+
+
+if __name__ == '__main__':
+    main()
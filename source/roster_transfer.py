@@ -0,0 +1,120 @@
+# roster_transfer.py
+# Export/import of character rosters on Anki's background task machinery.
+# The roster is only read and changed on the main thread, in idle slices;
+# parsing, merging and encoding run in the background.
+from aqt import mw
+from aqt.operations import QueryOp
+from aqt.qt import *
+from aqt.utils import showInfo, tooltip
+
+from ..core.character_registry import SAVE_CHUNK_SIZE
+from ..core.idle_scheduler import PRIORITY_HIGH, PRIORITY_NORMAL
+from ..core.roster_io import (
+    ROSTER_FORMATS, OperationCancelled, export_roster, import_roster, merge_records, merge_rosters
+)
+
+# Characters copied per idle step before an export or import
+SNAPSHOT_CHUNK_SIZE = 200
+
+def _file_filter():
+    return ";;".join(f"{label} (*{extension})" for extension, label in ROSTER_FORMATS)
+
+def _report_progress(label):
+    """Build a progress callback that updates Anki's progress dialog from a background thread"""
+    def report(done, total):
+        mw.taskman.run_on_main(lambda: mw.progress.update(label=label, value=done, max=total))
+    return report
+
+def _on_failure(action):
+    def on_failure(error):
+        if isinstance(error, OperationCancelled):
+            tooltip(f"Character {action} cancelled")
+        else:
+            showInfo(f"Error during character {action}: {str(error)}")
+    return on_failure
+
+def _snapshot_steps(characters, records):
+    """Generator appending the characters' to_dict() records a chunk per step
+
+    Records share nothing with their characters, so the background task can
+    read them while reviews keep changing the roster.
+    """
+    for start in range(0, len(characters), SNAPSHOT_CHUNK_SIZE):
+        records.extend(character.to_dict() for character in characters[start:start + SNAPSHOT_CHUNK_SIZE])
+        yield
+
+def exportCharacters(registry, runner, parent=None):
+    """Ask for a destination and export the open profile's roster in the background"""
+    parent = parent or mw
+    if not registry.characters:
+        showInfo("No characters to export for this profile.")
+        return
+
+    path, _ = QFileDialog.getSaveFileName(parent, "Export Characters", "characters.jsonl.gz", _file_filter())
+    if not path:
+        return
+
+    characters = list(registry.characters)
+
+    def export_steps():
+        records = []
+        yield from _snapshot_steps(characters, records)
+        op = QueryOp(
+            parent=parent,
+            op=lambda col: export_roster(records, path, _report_progress("Exporting characters..."), mw.progress.want_cancel),
+            success=lambda count: tooltip(f"Exported {count} characters")
+        )
+        op.without_collection().failure(_on_failure("export")).with_progress("Exporting characters...").run_in_background()
+
+    tooltip("Preparing the export...")
+    runner.submit("export_characters", export_steps(), PRIORITY_HIGH)
+
+def importCharacters(registry, runner, parent=None):
+    """Ask for a roster file and merge it into the open profile in the background"""
+    parent = parent or mw
+    if not registry.is_open:
+        showInfo("Open a profile before importing characters.")
+        return
+
+    path, _ = QFileDialog.getOpenFileName(parent, "Import Characters", "", _file_filter())
+    if not path:
+        return
+
+    profile_folder = registry.profile_folder
+    roster = registry.characters
+    characters = list(roster)
+    version = registry.version
+
+    def import_steps():
+        records = []
+        yield from _snapshot_steps(characters, records)
+        op = QueryOp(parent=parent, op=lambda col: do_import(records), success=on_success)
+        op.without_collection().failure(_on_failure("import")).with_progress("Importing characters...").run_in_background()
+
+    def do_import(records):
+        imported = import_roster(path, _report_progress("Importing characters..."), mw.progress.want_cancel)
+        return imported, merge_records(characters, records, imported)
+
+    def on_success(result):
+        imported, (merged, lines, added, replaced) = result
+        if registry.profile_folder != profile_folder:
+            showInfo("The profile was closed during the import; no characters were imported.")
+            return
+        if registry.version != version:
+            # Characters changed during the import. In-place changes live in
+            # the shared character objects, so the merge holds but its
+            # encoded records are stale; a roster grown or replaced in the
+            # meantime is merged again (rare, and linear in the roster)
+            lines = None
+            if registry.characters is not roster or len(roster) != len(characters):
+                merged, added, replaced = merge_rosters(registry.characters, imported)
+        registry.replace_characters(merged)
+        if lines is None:
+            steps = registry.save_steps()
+        else:
+            steps = registry.write_steps(lines[start:start + SAVE_CHUNK_SIZE] for start in range(0, len(lines), SAVE_CHUNK_SIZE))
+        runner.submit("save_characters", steps, PRIORITY_NORMAL)
+        tooltip(f"Imported characters: {added} added, {replaced} replaced")
+
+    tooltip("Preparing the import...")
+    runner.submit("import_characters", import_steps(), PRIORITY_HIGH)
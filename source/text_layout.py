@@ -0,0 +1,105 @@
+# text_layout.py
+# Word-wrapped text laid out once per (text, font, width bucket) as a
+# QStaticText and reused by every widget showing it, instead of QLabel
+# re-measuring the text on each layout pass.
+from collections import OrderedDict
+
+from aqt.qt import *
+from ..data import config
+from ..core import perf
+
+
+def width_bucket(width):
+    """Round a text width down to its layout bucket (at least one bucket wide)"""
+    bucket = config.TEXT_LAYOUT_WIDTH_BUCKET
+    return max(bucket, width // bucket * bucket)
+
+
+class StaticTextCache:
+    """LRU cache of prepared QStaticText layouts"""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.layouts = OrderedDict()
+
+    def get(self, text, font, width):
+        """Get the layout of text wrapped to the bucket of width in font"""
+        bucket = width_bucket(width)
+        key = (text, font.key(), bucket)
+        static_text = self.layouts.get(key)
+        if static_text is not None:
+            self.layouts.move_to_end(key)
+            perf.count('text_layout.hit')
+            return static_text
+
+        perf.count('text_layout.miss')
+        static_text = QStaticText(text)
+        static_text.setTextFormat(Qt.TextFormat.PlainText)
+        static_text.setTextWidth(bucket)
+        static_text.prepare(QTransform(), font)
+        self.layouts[key] = static_text
+        while len(self.layouts) > self.max_items:
+            self.layouts.popitem(last=False)
+        return static_text
+
+    def clear(self):
+        self.layouts.clear()
+
+
+_layout_cache = None
+
+def get_layout_cache():
+    """Get the shared text layout cache"""
+    global _layout_cache
+    if _layout_cache is None:
+        _layout_cache = StaticTextCache(config.TEXT_LAYOUT_CACHE_ITEMS)
+    return _layout_cache
+
+
+class StaticTextLabel(QFrame):
+    """Word-wrapped read-only text drawn from the shared layout cache
+
+    A drop-in for a word-wrapped QLabel: style sheets still set the font,
+    color, padding, border and background.
+    """
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.text = text
+        policy = QSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
+        policy.setHeightForWidth(True)
+        self.setSizePolicy(policy)
+
+    def setText(self, text):
+        self.text = text
+        self.updateGeometry()
+        self.update()
+
+    def layout_for(self, width):
+        margins = self.contentsMargins()
+        return get_layout_cache().get(self.text, self.font(), max(1, width - margins.left() - margins.right()))
+
+    def hasHeightForWidth(self):
+        return True
+
+    def heightForWidth(self, width):
+        margins = self.contentsMargins()
+        height = self.layout_for(width).size().height()
+        return int(height + 0.999) + margins.top() + margins.bottom()
+
+    def sizeHint(self):
+        width = config.TEXT_LAYOUT_WIDTH_BUCKET * 10
+        return QSize(width, self.heightForWidth(width))
+
+    def minimumSizeHint(self):
+        # The real height comes from heightForWidth; never squash below one line
+        margins = self.contentsMargins()
+        return QSize(config.TEXT_LAYOUT_WIDTH_BUCKET, self.fontMetrics().height() + margins.top() + margins.bottom())
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        painter = QPainter(self)
+        painter.setFont(self.font())
+        painter.setPen(self.palette().color(QPalette.ColorRole.WindowText))
+        painter.drawStaticText(self.contentsRect().topLeft(), self.layout_for(self.width()))
+        painter.end()